@@ -0,0 +1 @@
+"""Performance benchmarks for the UPN Calculator (not part of the package)."""
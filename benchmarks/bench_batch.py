@@ -0,0 +1,53 @@
+"""Benchmark: per-row evaluate() versus columnar evaluate_batch().
+
+Run with: python -m benchmarks.bench_batch
+"""
+
+import random
+from array import array
+
+from upn_calculator import UPNCalculator
+from upn_calculator.batch import evaluate_batch
+
+from .common import best_of, print_table
+
+EXPRESSION = "x y + z * x /"
+ROWS = 100_000
+
+
+def main() -> None:
+    """Compare throughput of row-wise and columnar evaluation."""
+    rng = random.Random(42)
+    data = {
+        name: array("d", (rng.uniform(1, 100) for _ in range(ROWS)))
+        for name in ("x", "y", "z")
+    }
+    calc = UPNCalculator()
+
+    def row_wise():
+        for x, y, z in zip(data["x"], data["y"], data["z"]):
+            calc.evaluate(f"{x!r} {y!r} + {z!r} * {x!r} /")
+
+    cases = [
+        ("evaluate per row", row_wise),
+        ("evaluate_batch (array)", lambda: evaluate_batch(EXPRESSION, data)),
+    ]
+    try:
+        import numpy
+    except ImportError:
+        pass
+    else:
+        arrays = {name: numpy.asarray(column) for name, column in data.items()}
+        cases.append(
+            ("evaluate_batch (numpy)", lambda: evaluate_batch(EXPRESSION, arrays))
+        )
+
+    rows = []
+    for name, func in cases:
+        seconds = best_of(func, number=1, repeat=3)
+        rows.append([name, f"{seconds * 1e3:.1f}", f"{ROWS / seconds:,.0f}"])
+    print_table(["mode", "time [ms]", "rows/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
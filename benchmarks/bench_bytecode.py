@@ -0,0 +1,88 @@
+"""Benchmark: loading a bytecode catalogue versus compiling the sources.
+
+Run with: python -m benchmarks.bench_bytecode
+"""
+
+import os
+import tempfile
+import time
+
+from upn_calculator import compile_expression
+from upn_calculator.bytecode import dump, load
+
+from .common import print_table
+
+
+def catalogue_sources(count: int) -> list:
+    """Build distinct formulas of 8 to 40 tokens over a few variables."""
+    sources = []
+    for index in range(count):
+        tokens = ["x", str(index), "+"]
+        for step in range(index % 16 + 2):
+            tokens += ["y" if step % 3 else f"{step}.5", "+-*/"[step % 4]]
+        sources.append(" ".join(tokens))
+    return sources
+
+
+def timed(func) -> float:
+    """Return the best wall time of a few calls in seconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Compare cold-start costs for catalogues of different sizes."""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (1_000, 10_000, 50_000):
+            sources = catalogue_sources(count)
+            path = os.path.join(directory, f"catalogue-{count}.upnb")
+            dump([compile_expression(s, ["x", "y"]) for s in sources], path)
+
+            def compile_all():
+                for source in sources:
+                    compile_expression(source, ["x", "y"])
+
+            def open_only():
+                load(path).close()
+
+            def open_lazy():
+                load(path, verify=False).close()
+
+            def decode_all():
+                with load(path) as catalogue:
+                    for _ in catalogue:
+                        pass
+
+            compile_time = timed(compile_all)
+            rows.append(
+                [
+                    count,
+                    f"{os.path.getsize(path) / 1024:.0f}",
+                    f"{compile_time * 1e3:.1f}",
+                    f"{timed(open_lazy) * 1e3:.3f}",
+                    f"{timed(open_only) * 1e3:.2f}",
+                    f"{timed(decode_all) * 1e3:.1f}",
+                    f"{compile_time / timed(decode_all):.1f}x",
+                ]
+            )
+    print_table(
+        [
+            "programs",
+            "KiB",
+            "compile [ms]",
+            "open [ms]",
+            "open+crc [ms]",
+            "decode all [ms]",
+            "speedup",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark: evaluate() with and without the expression cache.
+
+Run with: python -m benchmarks.bench_cache
+"""
+
+import random
+
+from upn_calculator import ExpressionCache, UPNCalculator
+
+from .common import best_of, chain_expression, print_table
+
+DISTINCT = 500
+CALLS = 20_000
+
+
+def main() -> None:
+    """Replay a skewed workload against cached and uncached calculators."""
+    rng = random.Random(7)
+    pool = [f"{i} {chain_expression(rng.randint(2, 12))} +" for i in range(DISTINCT)]
+    # About 95% of the calls use the 500 hot expressions.
+    workload = [
+        rng.choice(pool) if rng.random() < 0.95 else f"{i} 1 +" for i in range(CALLS)
+    ]
+
+    rows = []
+    for name, cache in [
+        ("no cache", ExpressionCache(maxsize=0)),
+        ("LRU 1024", ExpressionCache(maxsize=1024)),
+    ]:
+        calc = UPNCalculator(cache=cache)
+
+        def replay():
+            for expression in workload:
+                calc.evaluate(expression)
+
+        seconds = best_of(replay, number=1, repeat=3)
+        stats = cache.stats()
+        hit_rate = stats.hits / max(stats.hits + stats.misses, 1)
+        rows.append(
+            [name, f"{CALLS / seconds:,.0f}", f"{hit_rate:.1%}", stats.evictions]
+        )
+    print_table(["cache", "evals/s", "hit rate", "evictions"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: generated Python functions versus the interpreter loop.
+
+Runs a mix of formulas over variables with CompiledExpression.run() and
+with the function generate_function() produces for the same program, and
+compares UPNCalculator.evaluate() with the default engine and with
+CodegenEngine.
+
+Run with: python -m benchmarks.bench_codegen
+"""
+
+from upn_calculator import (
+    CodegenEngine,
+    UPNCalculator,
+    UPNEngine,
+    compile_expression,
+    generate_function,
+)
+
+from .common import best_of, print_table
+
+# (name, expression) pairs; all variables are bound by VALUES.
+FORMULAS = [
+    ("sum", "x y +"),
+    ("product", "x y + z *"),
+    ("ratio", "a b * c d * + e /"),
+    ("polynomial", "x x * 3 * x 2 * + 1 +"),
+    ("weighted mean", "a x * b y * + c z * + a b + c + /"),
+    (
+        "horner 8",
+        "x 2 * 3 + x * 4 + x * 5 + x * 6 + x * 7 + x * 8 + x * 9 +",
+    ),
+    ("chain 32", " ".join(["x"] + ["y +", "z *", "a -", "b /"] * 8)),
+]
+VALUES = {
+    "a": 1.5,
+    "b": 2.5,
+    "c": 3.5,
+    "d": 4.5,
+    "e": 5.5,
+    "x": 1.1,
+    "y": 2.2,
+    "z": 0.9,
+}
+
+
+def main() -> None:
+    """Compare per-call latency of interpreted and generated programs."""
+    interpreted = UPNCalculator(engine=UPNEngine())
+    generated = UPNCalculator(engine=CodegenEngine())
+    rows = []
+    for name, expression in FORMULAS:
+        program = compile_expression(expression, VALUES)
+        function = generate_function(program)
+        assert function.run(VALUES) == program.run(VALUES)
+        run = best_of(lambda: program.run(VALUES), number=20_000)
+        native = best_of(lambda: function.run(VALUES), number=20_000)
+        slow = best_of(lambda: interpreted.evaluate(expression, VALUES), 20_000)
+        fast = best_of(lambda: generated.evaluate(expression, VALUES), 20_000)
+        rows.append(
+            [
+                name,
+                len(expression.split()),
+                f"{run * 1e6:.2f}",
+                f"{native * 1e6:.2f}",
+                f"{run / native:.1f}x",
+                f"{slow * 1e6:.2f}",
+                f"{fast * 1e6:.2f}",
+                f"{slow / fast:.1f}x",
+            ]
+        )
+    print_table(
+        [
+            "formula",
+            "tokens",
+            "run [us]",
+            "generated [us]",
+            "speedup",
+            "evaluate [us]",
+            "codegen engine [us]",
+            "speedup",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
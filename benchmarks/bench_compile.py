@@ -0,0 +1,32 @@
+"""Benchmark: UPNCalculator.evaluate() versus CompiledExpression.run().
+
+Run with: python -m benchmarks.bench_compile
+"""
+
+from upn_calculator import UPNCalculator, compile_expression
+
+from .common import best_of, chain_expression, print_table
+
+
+def main() -> None:
+    """Compare per-call latency for typical expression lengths."""
+    calc = UPNCalculator()
+    rows = []
+    for operands in (2, 4, 8, 16, 32):
+        expression = chain_expression(operands)
+        program = compile_expression(expression)
+        evaluate = best_of(lambda: calc.evaluate(expression), number=20_000)
+        run = best_of(program.run, number=20_000)
+        rows.append(
+            [
+                len(expression.split()),
+                f"{evaluate * 1e6:.2f}",
+                f"{run * 1e6:.2f}",
+                f"{evaluate / run:.1f}x",
+            ]
+        )
+    print_table(["tokens", "evaluate [us]", "run [us]", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
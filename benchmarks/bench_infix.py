@@ -0,0 +1,95 @@
+"""Benchmark: converting batches of infix formulas into programs.
+
+Turns generated UPN expressions into infix formulas with as few
+parentheses as possible and converts a batch of them in three ways:
+to_upn() followed by compile_expression() (the string round trip),
+compile_infix() (tokens straight into the compiler), and
+InfixConverter.compile() on a feed where every formula repeats ten times.
+
+Run with: python -m benchmarks.bench_infix
+"""
+
+from typing import List
+
+from upn_calculator import (
+    ExpressionCache,
+    InfixConverter,
+    compile_expression,
+    compile_infix,
+    to_upn,
+)
+from upn_calculator.infix import PRECEDENCE
+
+from .common import best_of, print_table
+from .suite import generate_expressions
+
+BATCH = 20_000
+
+
+def to_infix(expression: str) -> str:
+    """
+    Write a UPN expression of binary operators as an infix formula.
+
+    Args:
+        expression: A valid UPN expression.
+
+    Returns:
+        The formula, parenthesized only where precedence requires it.
+    """
+    stack = []
+    for token in expression.split():
+        if token not in PRECEDENCE:
+            stack.append((token, 9))
+            continue
+        level = PRECEDENCE[token][0]
+        right, right_level = stack.pop()
+        left, left_level = stack.pop()
+        if left_level < level:
+            left = f"({left})"
+        if right_level <= level:
+            right = f"({right})"
+        stack.append((f"{left} {token} {right}", level))
+    return stack[0][0]
+
+
+def round_trip(formulas: List[str]) -> None:
+    """Convert every formula to a UPN string and compile that."""
+    for formula in formulas:
+        compile_expression(to_upn(formula))
+
+
+def direct(formulas: List[str]) -> None:
+    """Compile every formula from its converted tokens."""
+    for formula in formulas:
+        compile_infix(formula)
+
+
+def cached(formulas: List[str]) -> None:
+    """Compile every formula with a fresh converter and a large cache."""
+    compile = InfixConverter(cache=ExpressionCache(maxsize=BATCH)).compile
+    for formula in formulas:
+        compile(formula)
+
+
+def main() -> None:
+    """Report formulas per second for each way of converting a batch."""
+    rows = []
+    for length in (3, 10, 30):
+        formulas = [
+            to_infix(expression)
+            for expression in generate_expressions(BATCH, length, seed=length)
+        ]
+        feed = formulas[: BATCH // 10] * 10
+        cases = [
+            ("to_upn + compile", lambda: round_trip(formulas)),
+            ("compile_infix", lambda: direct(formulas)),
+            ("InfixConverter, 10x repeats", lambda: cached(feed)),
+        ]
+        for label, func in cases:
+            seconds = best_of(func, number=1, repeat=5) / BATCH
+            rows.append([length, label, f"{1 / seconds:,.0f}"])
+    print_table(["operands", "conversion", "formulas/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
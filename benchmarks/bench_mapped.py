@@ -0,0 +1,100 @@
+"""Benchmark: evaluating column files via mmap versus loading them.
+
+Writes two float64 column files and evaluates "x y * x y + /" over them:
+by loading the columns into lists and calling evaluate() row by row, and
+with evaluate_mapped() in pure Python and with NumPy. Each case runs in a
+fresh process, which reports its time and how far its peak resident
+memory grew during the run (Unix only; "-" elsewhere).
+
+Run with: python -m benchmarks.bench_mapped [ROWS]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+from upn_calculator import UPNCalculator, evaluate_mapped, write_column
+
+from .common import print_table
+
+EXPRESSION = "x y * x y + /"
+CASES = ("lists + evaluate", "evaluate_mapped", "evaluate_mapped, NumPy")
+
+
+def _peak_rss() -> int:
+    """Return the peak resident memory of this process in bytes, or -1."""
+    try:
+        import resource
+    except ImportError:
+        return -1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(case: str, folder: str) -> None:
+    """Run one case and print its seconds and peak memory growth as JSON."""
+    inputs = {"x": os.path.join(folder, "x"), "y": os.path.join(folder, "y")}
+    output = os.path.join(folder, "out")
+    before = _peak_rss()
+    start = time.perf_counter()
+    if case == CASES[0]:
+        columns = {}
+        for name, path in inputs.items():
+            with open(path, "rb") as file:
+                columns[name] = array("d", file.read()).tolist()
+        evaluate = UPNCalculator().evaluate
+        results = [
+            evaluate(EXPRESSION, {"x": x, "y": y})
+            for x, y in zip(columns["x"], columns["y"])
+        ]
+        write_column(output, results)
+    else:
+        evaluate_mapped(EXPRESSION, inputs, output, use_numpy=case == CASES[2])
+    seconds = time.perf_counter() - start
+    after = _peak_rss()
+    grown = after - before if before >= 0 else -1
+    print(json.dumps({"seconds": seconds, "grown": grown}))
+
+
+def main() -> None:
+    """Compare throughput and memory growth for each case."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    table = []
+    with tempfile.TemporaryDirectory() as folder:
+        write_column(os.path.join(folder, "x"), (1.0 + i % 97 for i in range(rows)))
+        write_column(os.path.join(folder, "y"), (2.0 + i % 89 for i in range(rows)))
+        for case in CASES:
+            if case == CASES[2]:
+                try:
+                    import numpy  # noqa: F401
+                except ImportError:
+                    continue
+            process = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_mapped", "--case", case],
+                input=folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(process.stdout)
+            grown = result["grown"]
+            table.append(
+                [
+                    case,
+                    f"{rows / result['seconds']:,.0f}",
+                    "-" if grown < 0 else f"{grown / 1e6:.1f}",
+                ]
+            )
+    print(f"{rows:,} rows, {rows * 8 / 1e6:.0f} MB per column")
+    print_table(["case", "rows/s", "peak RSS growth [MB]"], table)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--case":
+        run_case(sys.argv[2], sys.stdin.read())
+    else:
+        main()
@@ -0,0 +1,43 @@
+"""Benchmark: evaluation cost of the float, decimal and fraction backends.
+
+Run with: python -m benchmarks.bench_numeric
+"""
+
+from upn_calculator import DecimalBackend, FractionBackend, UPNCalculator
+
+from .common import best_of, chain_expression, print_table
+
+
+def price_expression(items: int) -> str:
+    """Build a sum of price times quantity with a tax rate, like an invoice."""
+    tokens = ["0"]
+    for index in range(items):
+        tokens += [f"{index + 1}.95", str(index % 4 + 1), "*", "+"]
+    return " ".join(tokens + ["rate", "*"])
+
+
+def main() -> None:
+    """Compare cached evaluation in each numeric backend."""
+    backends = [
+        ("float", None),
+        ("decimal", DecimalBackend()),
+        ("fraction", FractionBackend()),
+    ]
+    rows = []
+    for name, expression, values in [
+        ("chain 8", chain_expression(8), None),
+        ("chain 64", chain_expression(64), None),
+        ("invoice 16", price_expression(16), {"rate": 1.19}),
+        ("invoice 128", price_expression(128), {"rate": 1.19}),
+    ]:
+        base = None
+        for label, numeric in backends:
+            calc = UPNCalculator(numeric=numeric)
+            seconds = best_of(lambda: calc.evaluate(expression, values), number=500)
+            base = base or seconds
+            rows.append([name, label, f"{seconds * 1e6:.2f}", f"{seconds / base:.1f}x"])
+    print_table(["program", "backend", "evaluate [us]", "vs float"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Benchmark: compile and run cost with few versus many registered operators.
+
+Run with: python -m benchmarks.bench_operators
+"""
+
+import operator
+
+from upn_calculator import OPERATORS, Operator, compile_expression
+
+from .common import best_of, chain_expression, print_table
+
+
+def main() -> None:
+    """Show that dispatch cost does not grow with the size of the registry."""
+    expression = chain_expression(32)
+    rows = []
+    for extra in (0, 100, 10_000):
+        registry = OPERATORS.copy()
+        for index in range(extra):
+            registry.register(Operator(f"op{index}", 2, operator.add))
+        program = compile_expression(expression, operators=registry)
+        compile_time = best_of(
+            lambda: compile_expression(expression, operators=registry), 5_000
+        )
+        run_time = best_of(program.run, 5_000)
+        rows.append(
+            [len(registry), f"{compile_time * 1e6:.2f}", f"{run_time * 1e6:.2f}"]
+        )
+    print_table(["operators", "compile [us]", "run [us]"], rows)
+
+
+if __name__ == "__main__":
+    main()
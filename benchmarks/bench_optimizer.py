@@ -0,0 +1,45 @@
+"""Benchmark: CompiledExpression.run() before and after optimize().
+
+Run with: python -m benchmarks.bench_optimizer
+"""
+
+from upn_calculator import compile_expression, optimize
+
+from .common import best_of, print_table
+
+
+def constant_heavy_expression(groups: int) -> str:
+    """Build an expression with a constant subexpression per variable use."""
+    tokens = ["x"]
+    for index in range(groups):
+        tokens += [str(index + 2), "3", "+", "4", "*", "x", "*", "1", "*", "+"]
+    return " ".join(tokens)
+
+
+def main() -> None:
+    """Compare run time of unoptimized and optimized programs."""
+    rows = []
+    values = {"x": 1.5}
+    for groups in (1, 4, 16, 64):
+        program = compile_expression(constant_heavy_expression(groups), ["x"])
+        optimized, removed = optimize(program)
+        before = best_of(lambda: program.run(values), number=5_000)
+        after = best_of(lambda: optimized.run(values), number=5_000)
+        rows.append(
+            [
+                len(program.code),
+                len(optimized.code),
+                removed,
+                f"{before * 1e6:.2f}",
+                f"{after * 1e6:.2f}",
+                f"{before / after:.1f}x",
+            ]
+        )
+    print_table(
+        ["instr", "optimized", "removed", "run [us]", "optimized [us]", "speedup"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
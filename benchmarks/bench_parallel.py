@@ -0,0 +1,46 @@
+"""Benchmark: evaluate_many() throughput for 1 to N worker processes.
+
+Run with: python -m benchmarks.bench_parallel
+"""
+
+import os
+import random
+import time
+
+from upn_calculator import ParallelEvaluator
+
+from .common import chain_expression, print_table
+
+COUNT = 200_000
+
+
+def main() -> None:
+    """Report throughput and scaling efficiency per worker count."""
+    rng = random.Random(3)
+    expressions = [
+        f"{rng.randint(1, 10**6)} {chain_expression(rng.randint(2, 10))} +"
+        for _ in range(COUNT)
+    ]
+    rows = []
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        with ParallelEvaluator(workers, chunk_size=2048) as pool:
+            pool.evaluate(expressions[:workers])  # start the worker processes
+            start = time.perf_counter()
+            pool.evaluate(expressions)
+            seconds = time.perf_counter() - start
+        rate = COUNT / seconds
+        baseline = baseline or rate
+        rows.append(
+            [
+                workers,
+                f"{rate:,.0f}",
+                f"{rate / baseline:.2f}x",
+                f"{rate / baseline / workers:.0%}",
+            ]
+        )
+    print_table(["workers", "expr/s", "speedup", "efficiency"], rows)
+
+
+if __name__ == "__main__":
+    main()
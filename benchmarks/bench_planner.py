@@ -0,0 +1,66 @@
+"""Benchmark: ExpressionPlan versus independent evaluation of related formulas.
+
+Run with: python -m benchmarks.bench_planner
+"""
+
+from upn_calculator import ExpressionPlan, UPNCalculator, compile_expression
+
+from .common import best_of, print_table
+
+
+def report_formulas(count: int, core_operands: int) -> list:
+    """Build formulas sharing one core, each with its own short suffix."""
+    core = ["a", "b", "+"]
+    for index in range(core_operands - 2):
+        core += ["c" if index % 2 else str(index + 2), "*+-"[index % 3]]
+    return [
+        " ".join(core + [str(index + 1), "+-*/"[index % 4]]) for index in range(count)
+    ]
+
+
+def main() -> None:
+    """Compare evaluate(), per-expression run() and a shared plan."""
+    calc = UPNCalculator()
+    values = {"a": 1.5, "b": 2.5, "c": 0.5}
+    rows = []
+    for count, core_operands in ((10, 8), (100, 8), (100, 32), (1000, 32)):
+        formulas = report_formulas(count, core_operands)
+        literal = [
+            f.replace("a", "1.5").replace("b", "2.5").replace("c", "0.5")
+            for f in formulas
+        ]
+        programs = [compile_expression(f, ["a", "b", "c"]) for f in formulas]
+        plan = ExpressionPlan(formulas, ["a", "b", "c"])
+        number = max(1, 2_000 // count)
+        evaluate = best_of(lambda: [calc.evaluate(f) for f in literal], number)
+        run = best_of(lambda: [p.run(values) for p in programs], number)
+        shared = best_of(lambda: plan.run(values), number)
+        rows.append(
+            [
+                count,
+                core_operands,
+                f"{plan.dedup_ratio:.1f}",
+                f"{evaluate * 1e3:.3f}",
+                f"{run * 1e3:.3f}",
+                f"{shared * 1e3:.3f}",
+                f"{evaluate / shared:.1f}x",
+                f"{run / shared:.1f}x",
+            ]
+        )
+    print_table(
+        [
+            "formulas",
+            "core",
+            "dedup",
+            "evaluate [ms]",
+            "run [ms]",
+            "plan [ms]",
+            "vs evaluate",
+            "vs run",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
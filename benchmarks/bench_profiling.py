@@ -0,0 +1,38 @@
+"""Benchmark: cost of evaluation with profiling disabled and enabled.
+
+A calculator without a profiler runs on the plain UPNEngine, so it must be
+as fast as a calculator given a UPNEngine explicitly; the enabled rows show
+what instrumentation costs.
+
+Run with: python -m benchmarks.bench_profiling
+"""
+
+from upn_calculator import Profiler, UPNCalculator, UPNEngine
+
+from .common import best_of, chain_expression, print_table
+
+
+def main() -> None:
+    """Compare evaluate() with and without a profiler."""
+    rows = []
+    for operands in (2, 8, 32):
+        expression = chain_expression(operands)
+        cases = [
+            ("plain engine", UPNCalculator(engine=UPNEngine())),
+            ("profiling off", UPNCalculator()),
+            ("profiling on", UPNCalculator(profiler=Profiler())),
+        ]
+        base = None
+        for label, evaluator in cases:
+            seconds = best_of(
+                lambda: evaluator.evaluate(expression), number=20_000, repeat=7
+            )
+            base = base or seconds
+            rows.append(
+                [operands, label, f"{seconds * 1e6:.3f}", f"{seconds / base:.2f}x"]
+            )
+    print_table(["operands", "calculator", "evaluate [us]", "vs plain"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: full versus incremental recompute of many live formulas.
+
+Run with: python -m benchmarks.bench_reactive
+"""
+
+import random
+
+from upn_calculator import ReactiveEnvironment
+
+from .common import best_of, print_table
+
+
+def live_formulas(count: int, inputs: int, seed: int = 1) -> list:
+    """Build formulas that each combine three random inputs."""
+    rng = random.Random(seed)
+    formulas = []
+    for _ in range(count):
+        a, b, c = (f"v{rng.randrange(inputs)}" for _ in range(3))
+        formulas.append(f"{a} {b} + {c} * 2 /")
+    return formulas
+
+
+def main() -> None:
+    """Compare one tick with a few changed inputs against a full recompute."""
+    inputs = 500
+    values = {f"v{index}": float(index) for index in range(inputs)}
+    rows = []
+    for count, changes in ((1000, 1), (1000, 10), (5000, 1), (5000, 10)):
+        env = ReactiveEnvironment(values)
+        for formula in live_formulas(count, inputs):
+            env.register(formula)
+        env.results()
+        plan = env.plan
+        names = [f"v{index}" for index in range(changes)]
+
+        def tick():
+            for name in names:
+                env[name] += 1.0
+            return env.results()
+
+        bindings = dict(env)
+        full = best_of(lambda: plan.run(bindings), number=20)
+        incremental = best_of(tick, number=20)
+        rows.append(
+            [
+                count,
+                changes,
+                env.recomputed,
+                f"{full * 1e3:.3f}",
+                f"{incremental * 1e3:.3f}",
+                f"{full / incremental:.1f}x",
+            ]
+        )
+    print_table(
+        ["formulas", "changed", "recomputed", "full [ms]", "tick [ms]", "speedup"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: exception-driven token classification versus scan().
+
+Run with: python -m benchmarks.bench_scanner
+"""
+
+from upn_calculator.parser import is_operator, scan, tokenize
+
+from .common import best_of, print_table
+
+
+def legacy_is_number(token: str) -> bool:
+    """The former is_number(): try float() and catch ValueError."""
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def legacy_classify(expression: str) -> list:
+    """Classify tokens the way evaluate() used to (float() twice per number)."""
+    result = []
+    for token in tokenize(expression):
+        if legacy_is_number(token):
+            result.append(float(token))
+        elif is_operator(token):
+            result.append(token)
+        else:
+            result.append(None)
+    return result
+
+
+def main() -> None:
+    """Compare classification throughput for different operator shares."""
+    rows = []
+    for label, unit in [
+        ("numbers only", "1.5 2 3e4 -7 "),
+        ("balanced", "1.5 2 + 3 * "),
+        ("operator-heavy", "1 2 3 4 + + + "),
+    ]:
+        expression = (unit * 20).strip()
+        tokens = len(expression.split())
+        legacy = best_of(lambda: legacy_classify(expression), number=2_000, repeat=15)
+        single = best_of(lambda: list(scan(expression)), number=2_000, repeat=15)
+        rows.append(
+            [
+                label,
+                f"{tokens / legacy / 1e6:.2f}",
+                f"{tokens / single / 1e6:.2f}",
+                f"{legacy / single:.1f}x",
+            ]
+        )
+    print_table(["mix", "legacy [Mtok/s]", "scan [Mtok/s]", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Load generator: latency percentiles against throughput for the server.
+
+Run with: python -m benchmarks.bench_server
+"""
+
+import asyncio
+import time
+
+from upn_calculator.server import MicroBatcher, start_server
+
+from .common import chain_expression, print_table
+
+REQUESTS_PER_CLIENT = 500
+
+
+async def client(port: int, latencies: list) -> None:
+    """Send requests one at a time and record each round-trip time."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        writer.write(f"{i} {chain_expression(6)} +\n".encode())
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(clients: int, window: float) -> tuple:
+    """Run one load level and return (requests/s, p50, p99)."""
+    server = await start_server(port=0, batcher=MicroBatcher(window=window))
+    port = server.sockets[0].getsockname()[1]
+    latencies: list = []
+    async with server:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, latencies) for _ in range(clients)))
+        seconds = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / seconds, p50, p99
+
+
+def main() -> None:
+    """Report throughput and latency for increasing concurrency."""
+    rows = []
+    for window in (0.0005, 0.002):
+        for clients in (1, 8, 32, 128):
+            rate, p50, p99 = asyncio.run(run_load(clients, window))
+            rows.append(
+                [
+                    f"{window * 1000:g}",
+                    clients,
+                    f"{rate:,.0f}",
+                    f"{p50 * 1000:.2f}",
+                    f"{p99 * 1000:.2f}",
+                ]
+            )
+    print_table(["window [ms]", "clients", "req/s", "p50 [ms]", "p99 [ms]"], rows)
+
+
+if __name__ == "__main__":
+    main()
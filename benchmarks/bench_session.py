@@ -0,0 +1,87 @@
+"""Benchmark: undo by copying the stack versus UPNSession's persistent stack.
+
+Fills a stack to a given depth and then applies a series of changes
+(push a value, add the top two), keeping what is needed to undo each of
+them: once with UPNCalculator and a get_stack() copy per change, once
+with UPNSession. Reports the time per change and the memory of the
+history; the cost of filling the stack is subtracted from both.
+
+Run with: python -m benchmarks.bench_session
+"""
+
+import tracemalloc
+from typing import Callable, Tuple
+
+from upn_calculator import UPNCalculator, UPNSession
+
+from .common import best_of, print_table
+
+CHANGES = 1_000
+
+
+def _copying(depth: int, changes: int) -> object:
+    """Fill a UPNCalculator and copy its stack after every change."""
+    calc = UPNCalculator()
+    for i in range(depth):
+        calc.push(float(i))
+    history = [calc.get_stack()]
+    for i in range(changes // 2):
+        calc.push(float(i))
+        history.append(calc.get_stack())
+        calc.push(calc.pop() + calc.pop())
+        history.append(calc.get_stack())
+    return history
+
+
+def _session(depth: int, changes: int) -> object:
+    """Fill a UPNSession and apply the same changes to it."""
+    session = UPNSession()
+    for i in range(depth):
+        session.push(float(i))
+    for i in range(changes // 2):
+        session.push(float(i))
+        session.apply("+")
+    return session
+
+
+def _measure(run: Callable[[int, int], object], depth: int) -> Tuple[float, float]:
+    """
+    Measure the changes of a run without the initial fill.
+
+    Returns:
+        Microseconds per change and megabytes of history.
+    """
+    total = best_of(lambda: run(depth, CHANGES), 1, 3)
+    fill = best_of(lambda: run(depth, 0), 1, 3)
+    sizes = []
+    for changes in (0, CHANGES):
+        tracemalloc.start()
+        kept = run(depth, changes)
+        sizes.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        del kept
+    return (total - fill) / CHANGES * 1e6, (sizes[1] - sizes[0]) / 1e6
+
+
+def main() -> None:
+    """Compare time and memory per change for increasing stack depths."""
+    rows = []
+    for depth in (10, 1_000, 10_000):
+        copy_time, copy_memory = _measure(_copying, depth)
+        session_time, session_memory = _measure(_session, depth)
+        rows.append(
+            [
+                depth,
+                f"{copy_time:.2f}",
+                f"{session_time:.2f}",
+                f"{copy_memory:.2f}",
+                f"{session_memory:.2f}",
+            ]
+        )
+    print_table(
+        ["depth", "copy [us]", "session [us]", "copy [MB]", "session [MB]"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
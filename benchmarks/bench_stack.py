@@ -0,0 +1,90 @@
+"""Benchmark: operand stack allocations per evaluation.
+
+Compares CompiledExpression.run(), which reuses a pooled operand buffer,
+with a run loop that builds a new list per call (the previous
+implementation), and reports the peak memory tracemalloc sees allocated
+while evaluating.
+
+Run with: python -m benchmarks.bench_stack
+"""
+
+import tracemalloc
+from typing import Callable
+
+from upn_calculator import UPNCalculator, compile_expression
+from upn_calculator.compiler import BINARY, LOAD, PUSH, UNARY, apply_instruction
+
+from .common import best_of, chain_expression, print_table
+
+RUNS = 20_000
+
+
+def list_run(program, values=None):
+    """Run a program on a new list, like run() did before the shared buffer."""
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for opcode, arg, _ in program.code:
+        if opcode == PUSH:
+            push(arg)
+        elif opcode == BINARY:
+            b = pop()
+            stack[-1] = arg(stack[-1], b)
+        elif opcode == LOAD:
+            push(values[arg])
+        elif opcode == UNARY:
+            stack[-1] = arg(stack[-1])
+        else:
+            apply_instruction(stack, arg)
+    return stack[0]
+
+
+def deep_expression(operands: int) -> str:
+    """Build a right-deep expression whose stack depth equals `operands`."""
+    return " ".join(["1.5"] * operands + ["+"] * (operands - 1))
+
+
+def peak_allocation(func: Callable[[], object]) -> int:
+    """Return the peak bytes allocated while calling `func` RUNS times."""
+    func()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for _ in range(RUNS):
+        func()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Compare per-call list stacks with the reused buffer."""
+    rows = []
+    for name, expression in [
+        ("chain 8", chain_expression(8)),
+        ("chain 64", chain_expression(64)),
+        ("deep 64", deep_expression(64)),
+        ("deep 512", deep_expression(512)),
+    ]:
+        program = compile_expression(expression)
+        calc = UPNCalculator()
+        cases = [
+            ("list", lambda: list_run(program)),
+            ("buffer", program.run),
+            ("calculator", lambda: calc.evaluate(expression)),
+        ]
+        for label, func in cases:
+            seconds = best_of(func, number=2_000)
+            rows.append(
+                [
+                    name,
+                    program.max_depth,
+                    label,
+                    f"{seconds * 1e6:.2f}",
+                    peak_allocation(func),
+                ]
+            )
+    print_table(["program", "depth", "stack", "run [us]", "peak [B]"], rows)
+
+
+if __name__ == "__main__":
+    main()
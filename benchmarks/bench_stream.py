@@ -0,0 +1,64 @@
+"""Benchmark: peak memory of evaluate() versus evaluate_stream().
+
+Run with: python -m benchmarks.bench_stream
+"""
+
+import io
+import time
+import tracemalloc
+
+from upn_calculator import ExpressionCache, UPNCalculator
+
+from .common import print_table
+
+
+def program_bytes(additions: int) -> bytes:
+    """Build the program "1 1 + 1 + ..." with the given number of additions."""
+    return b"1" + b" 1 +" * additions
+
+
+def measure(func) -> tuple:
+    """Return (seconds, peak traced bytes) of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    """Compare peak memory for growing program sizes."""
+    calc = UPNCalculator(cache=ExpressionCache(maxsize=0))
+    rows = []
+    for additions in (10_000, 100_000, 1_000_000):
+        data = program_bytes(additions)
+        text = data.decode()
+        eval_time, eval_peak = measure(lambda: calc.evaluate(text))
+        stream_time, stream_peak = measure(
+            lambda: calc.evaluate_stream(io.BytesIO(data))
+        )
+        rows.append(
+            [
+                f"{len(data) / 1e6:.2f}",
+                f"{eval_peak / 1e6:.2f}",
+                f"{stream_peak / 1e6:.2f}",
+                f"{eval_time:.2f}",
+                f"{stream_time:.2f}",
+            ]
+        )
+    print_table(
+        [
+            "input [MB]",
+            "evaluate peak [MB]",
+            "stream peak [MB]",
+            "eval [s]",
+            "stream [s]",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark: thread scaling of one shared UPNEngine.
+
+Run with the regular build and with a free-threaded build (python3.13t):
+    python -m benchmarks.bench_threads
+"""
+
+import os
+import sys
+import sysconfig
+import threading
+import time
+
+from upn_calculator import UPNEngine
+
+from .common import chain_expression, print_table
+
+CALLS_PER_THREAD = 50_000
+
+
+def main() -> None:
+    """Report total throughput for 1 to N threads sharing one engine."""
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"free-threaded build: {free_threaded}, GIL enabled: {gil_enabled}")
+
+    engine = UPNEngine()
+    expressions = [chain_expression(n) for n in range(2, 12)]
+    max_threads = max(2, os.cpu_count() or 1)
+    rows = []
+    baseline = None
+    for count in sorted({1, 2, 4, max_threads}):
+        barrier = threading.Barrier(count + 1)
+
+        def work():
+            barrier.wait()
+            for i in range(CALLS_PER_THREAD):
+                engine.evaluate(expressions[i % len(expressions)])
+
+        threads = [threading.Thread(target=work) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        rate = count * CALLS_PER_THREAD / (time.perf_counter() - start)
+        baseline = baseline or rate
+        rows.append([count, f"{rate:,.0f}", f"{rate / baseline:.2f}x"])
+    print_table(["threads", "evals/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
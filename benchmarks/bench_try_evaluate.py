@@ -0,0 +1,46 @@
+"""Benchmark: try_evaluate_many() versus evaluate() with try/except.
+
+Evaluates batches of generated expressions with increasing shares of
+invalid ones, once by calling evaluate() and catching its errors (like
+evaluate_chunk()) and once with try_evaluate_many(), and reports the time
+per expression. Every distinct expression is evaluated twice per batch, so
+valid expressions are also served from the cache.
+
+Run with: python -m benchmarks.bench_try_evaluate
+"""
+
+from upn_calculator import ExpressionCache, UPNCalculator
+from upn_calculator.parallel import evaluate_chunk
+
+from .common import best_of, print_table
+from .suite import generate_expressions
+
+BATCH = 10_000
+
+
+def main() -> None:
+    """Compare raising and non-raising batch evaluation per error rate."""
+    rows = []
+    for error_rate in (0.0, 0.1, 0.3, 0.5):
+        expressions = generate_expressions(
+            BATCH // 2, 10, error_rate=error_rate, seed=3
+        )
+        expressions = expressions * 2
+        calc = UPNCalculator(cache=ExpressionCache(maxsize=BATCH))
+        raising = best_of(lambda: evaluate_chunk(expressions, calc), 1, 7) / BATCH
+        status = best_of(lambda: calc.try_evaluate_many(expressions), 1, 7) / BATCH
+        rows.append(
+            [
+                f"{error_rate:.0%}",
+                f"{raising * 1e6:.2f}",
+                f"{status * 1e6:.2f}",
+                f"{raising / status:.1f}x",
+            ]
+        )
+    print_table(
+        ["errors", "evaluate+except [us]", "try_evaluate_many [us]", "speedup"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
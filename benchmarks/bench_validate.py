@@ -0,0 +1,72 @@
+"""Benchmark: validate-only throughput versus compiling and evaluating.
+
+Checks a batch of generated formulas (10 % of them invalid) with
+validate_many(), and compares the throughput with compile_expression() and
+UPNCalculator.evaluate() on the same batch, both uncached.
+
+Run with: python -m benchmarks.bench_validate
+"""
+
+from upn_calculator import (
+    ExpressionCache,
+    UPNCalculator,
+    UPNCalculatorError,
+    compile_expression,
+    validate_many,
+)
+
+from .common import best_of, print_table
+from .suite import generate_expressions
+
+BATCH = 20_000
+
+
+def compile_all(expressions):
+    """Compile every expression, ignoring errors."""
+    for expression in expressions:
+        try:
+            compile_expression(expression)
+        except UPNCalculatorError:
+            pass
+
+
+def evaluate_all(calc, expressions):
+    """Evaluate every expression, ignoring errors."""
+    for expression in expressions:
+        try:
+            calc.evaluate(expression)
+        except UPNCalculatorError:
+            pass
+
+
+def main() -> None:
+    """Report formulas per second for each way of checking a formula."""
+    calc = UPNCalculator(cache=ExpressionCache(maxsize=0))
+    rows = []
+    for length in (3, 10, 30):
+        expressions = generate_expressions(BATCH, length, error_rate=0.1, seed=length)
+        cases = [
+            ("validate_many", lambda: validate_many(expressions)),
+            ("compile", lambda: compile_all(expressions)),
+            ("evaluate", lambda: evaluate_all(calc, expressions)),
+        ]
+        baseline = None
+        for label, func in cases:
+            seconds = best_of(func, number=1, repeat=5) / BATCH
+            baseline = baseline or seconds
+            rows.append(
+                [
+                    length,
+                    label,
+                    f"{seconds * 1e6:.2f}",
+                    f"{1 / seconds:,.0f}",
+                    f"{seconds / baseline:.1f}x",
+                ]
+            )
+    print_table(
+        ["operands", "method", "per formula [us]", "formulas/s", "relative"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
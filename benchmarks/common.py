@@ -0,0 +1,51 @@
+"""Shared helpers for the benchmark scripts."""
+
+import timeit
+from typing import Callable, List, Sequence
+
+
+def best_of(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """
+    Time a callable and return the best per-call duration in seconds.
+
+    Args:
+        func: The zero-argument callable to time.
+        number: Calls per timing run.
+        repeat: Number of timing runs; the fastest one is reported.
+
+    Returns:
+        Seconds per call of the fastest run.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def print_table(headers: Sequence[str], rows: List[Sequence[object]]) -> None:
+    """
+    Print rows as a right-aligned plain-text table.
+
+    Args:
+        headers: Column titles.
+        rows: Table rows, one value per column.
+    """
+    cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for row in cells:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def chain_expression(operands: int) -> str:
+    """
+    Build a left-deep expression with the given number of operands.
+
+    Args:
+        operands: Number of numeric literals in the expression (>= 1).
+
+    Returns:
+        An expression like "1 2 + 3 - 4 * 5 /".
+    """
+    ops = "+-*/"
+    parts = ["1.5"]
+    for i in range(1, operands):
+        parts.append(str(i + 1))
+        parts.append(ops[(i - 1) % len(ops)])
+    return " ".join(parts)
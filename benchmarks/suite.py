@@ -0,0 +1,336 @@
+"""Benchmark suite for catching performance regressions.
+
+Runs a fixed set of cases over synthetic expressions from a seeded
+generator, so two runs on the same machine measure the same work:
+
+- latency of tokenize(), is_number(), apply_operator() and evaluate(),
+- batch throughput (seconds per expression of evaluate_chunk() and of
+  validate_many()),
+- peak memory of evaluating a batch and a deep expression.
+
+Results are written as JSON. With --compare, every case is checked against
+an earlier result file, and the run fails (exit code 1) if any case got
+slower or bigger by more than --threshold.
+
+Run with:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from upn_calculator import (
+    ExpressionCache,
+    UPNCalculator,
+    UPNCalculatorError,
+    apply_operator,
+    is_number,
+    tokenize,
+    validate_many,
+)
+from upn_calculator.parallel import evaluate_chunk
+
+from .common import print_table
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+
+# Literal formats the generator can produce.
+NUMBER_FORMATS = ("int", "decimal", "exponent", "mixed")
+# Kinds of invalid expressions the generator mixes in.
+ERROR_KINDS = ("token", "operands", "leftover", "zero")
+
+
+def _number(rng: random.Random, number_format: str) -> str:
+    """Generate a non-zero literal in the given format."""
+    if number_format == "mixed":
+        number_format = rng.choice(NUMBER_FORMATS[:-1])
+    if number_format == "int":
+        return str(rng.randint(1, 999))
+    if number_format == "decimal":
+        return f"{rng.uniform(0.5, 999):.{rng.randint(1, 4)}f}"
+    return f"{rng.uniform(1, 9):.2f}e{rng.randint(-5, 5)}"
+
+
+def generate_expressions(
+    count: int,
+    length: int,
+    operators: str = "+-*/",
+    number_format: str = "mixed",
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Generate random expressions.
+
+    Valid expressions never divide by zero. Of the invalid ones, each has
+    one of ERROR_KINDS: an unknown token, an operator without enough
+    operands, a leftover operand, or a division by zero.
+
+    Args:
+        count: Number of expressions.
+        length: Number of operands per expression (>= 2).
+        operators: Operator symbols to draw from.
+        number_format: One of NUMBER_FORMATS.
+        error_rate: Fraction of invalid expressions, between 0 and 1.
+        seed: Seed of the random generator.
+
+    Returns:
+        The expressions; the same arguments always give the same list.
+    """
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        tokens = [_number(rng, number_format)]
+        pending = 0
+        for _ in range(length - 1):
+            tokens.append(_number(rng, number_format))
+            pending += 1
+            # Close some operators right away and defer the others, so the
+            # stack depth varies between expressions.
+            while pending and rng.random() < 0.6:
+                tokens.append(rng.choice(operators))
+                pending -= 1
+        tokens.extend(rng.choice(operators) for _ in range(pending))
+        if rng.random() < error_rate:
+            kind = rng.choice(ERROR_KINDS)
+            if kind == "token":
+                tokens[rng.randrange(len(tokens))] = "x?"
+            elif kind == "operands":
+                tokens.insert(1, rng.choice(operators))
+            elif kind == "leftover":
+                tokens.append(_number(rng, number_format))
+            else:
+                tokens += ["0", "/"]
+        expressions.append(" ".join(tokens))
+    return expressions
+
+
+def measure(func: Callable[[], object], min_time: float, repeat: int = 7) -> float:
+    """
+    Time a callable with enough calls per run to smooth out timer noise.
+
+    Args:
+        func: The zero-argument callable to time.
+        min_time: Minimum duration of one timing run in seconds.
+        repeat: Number of timing runs; the fastest one is reported.
+
+    Returns:
+        Seconds per call of the fastest run.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak bytes tracemalloc sees allocated during one call."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return peak
+
+
+def _evaluate_all(calc: UPNCalculator, expressions: Sequence[str]) -> None:
+    """Evaluate expressions, ignoring their errors."""
+    evaluate = calc.evaluate
+    for expression in expressions:
+        try:
+            evaluate(expression)
+        except UPNCalculatorError:
+            pass
+
+
+def run_suite(quick: bool = False) -> Dict[str, Dict[str, object]]:
+    """
+    Run every benchmark case.
+
+    Args:
+        quick: Use fewer iterations and smaller batches (for smoke tests;
+            the results are noisier).
+
+    Returns:
+        {case name: {"value": number, "unit": "s" or "B"}}, where lower
+        values are better for every case.
+    """
+    min_time = 0.005 if quick else 0.05
+    batch_size = 1_000 if quick else 10_000
+    results: Dict[str, Dict[str, object]] = {}
+
+    def timed(name: str, func: Callable[[], object]) -> None:
+        results[name] = {"value": measure(func, min_time), "unit": "s"}
+
+    for length in (3, 20, 100):
+        expression = generate_expressions(1, length, seed=length)[0]
+        timed(f"tokenize/len={length}", lambda: tokenize(expression))
+
+    for number_format in NUMBER_FORMATS[:-1]:
+        literals = generate_expressions(1, 50, "+", number_format)[0].split()[::2]
+        timed(
+            f"is_number/{number_format}",
+            lambda: [is_number(literal) for literal in literals],
+        )
+    timed("is_number/words", lambda: [is_number(t) for t in ("x", "+", "ab")])
+
+    for symbol in "+-*/":
+        timed(f"apply_operator/{symbol}", lambda: apply_operator(7.5, 2.5, symbol))
+
+    for length, operators in [(3, "+-*/"), (20, "+-*/"), (20, "+*"), (100, "+-*/")]:
+        expression = generate_expressions(1, length, operators, seed=length)[0]
+        warm = UPNCalculator(cache=ExpressionCache())
+        cold = UPNCalculator(cache=ExpressionCache(maxsize=0))
+        suffix = f"len={length}/ops={operators}"
+        timed(f"evaluate/warm/{suffix}", lambda: warm.evaluate(expression))
+        timed(f"evaluate/cold/{suffix}", lambda: cold.evaluate(expression))
+
+    for error_rate in (0.0, 0.1, 0.5):
+        expressions = generate_expressions(
+            batch_size, 10, error_rate=error_rate, seed=7
+        )
+        calc = UPNCalculator(cache=ExpressionCache(maxsize=0))
+        seconds = measure(lambda: evaluate_chunk(expressions, calc), min_time, 5)
+        results[f"batch/errors={error_rate:.0%}"] = {
+            "value": seconds / batch_size,
+            "unit": "s",
+        }
+
+    expressions = generate_expressions(batch_size, 10, error_rate=0.1, seed=11)
+    seconds = measure(lambda: validate_many(expressions), min_time, 5)
+    results["validate/errors=10%"] = {"value": seconds / batch_size, "unit": "s"}
+    results["memory/batch"] = {
+        "value": peak_memory(
+            lambda: _evaluate_all(UPNCalculator(cache=ExpressionCache()), expressions)
+        ),
+        "unit": "B",
+    }
+    deep = " ".join(["1.5"] * 2_000 + ["+"] * 1_999)
+    results["memory/deep"] = {
+        "value": peak_memory(
+            lambda: UPNCalculator(cache=ExpressionCache(maxsize=0)).evaluate(deep)
+        ),
+        "unit": "B",
+    }
+    return results
+
+
+def compare(
+    baseline: Dict[str, Dict[str, object]],
+    current: Dict[str, Dict[str, object]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[List[object]]:
+    """
+    Compare two result sets case by case.
+
+    Args:
+        baseline: Results of the earlier run.
+        current: Results of this run.
+        threshold: Allowed relative increase, e.g. 0.1 for 10 %.
+
+    Returns:
+        One row per case in both sets: [name, old, new, ratio, status],
+        where status is "REGRESSION" if new > old * (1 + threshold).
+    """
+    rows = []
+    for name, entry in current.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], entry["value"]
+        ratio = new / old if old else float("inf") if new else 1.0
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        rows.append([name, old, new, ratio, status])
+    return rows
+
+
+def _format(value: object, unit: object) -> str:
+    """Format a result value for the table."""
+    if unit == "s":
+        return f"{float(value) * 1e6:.3f} us"
+    return f"{int(value):,} B"
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    Run the suite from the command line.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        0, or 1 if a comparison found a regression.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Run the benchmark suite and compare against a baseline.",
+    )
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline JSON to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed relative slowdown per case (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer iterations (noisier)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(quick=args.quick)
+    if args.output:
+        document = {
+            "version": FORMAT_VERSION,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if not args.compare:
+        print_table(
+            ["case", "value"],
+            [[name, _format(e["value"], e["unit"])] for name, e in results.items()],
+        )
+        return 0
+
+    with open(args.compare, encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("version") != FORMAT_VERSION:
+        print(f"{args.compare}: unsupported result format", file=sys.stderr)
+        return 2
+    rows = compare(baseline["results"], results, args.threshold)
+    print_table(
+        ["case", "baseline", "current", "ratio", "status"],
+        [
+            [
+                name,
+                _format(old, results[name]["unit"]),
+                _format(new, results[name]["unit"]),
+                f"{ratio:.2f}x",
+                status,
+            ]
+            for name, old, new, ratio, status in rows
+        ],
+    )
+    regressions = sum(1 for row in rows if row[4] == "REGRESSION")
+    if regressions:
+        print(f"\n{regressions} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
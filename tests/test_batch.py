@@ -0,0 +1,140 @@
+"""Unit tests for columnar batch evaluation and variables."""
+
+import math
+from array import array
+
+import pytest
+
+from upn_calculator import (
+    InvalidTokenError,
+    UnboundVariableError,
+    ZeroDivisionError,
+    compile_expression,
+)
+from upn_calculator.batch import evaluate_batch
+
+
+def columns(**values):
+    """Build array('d') columns from keyword lists."""
+    return {name: array("d", column) for name, column in values.items()}
+
+
+class TestVariables:
+    """Tests for variables in compiled expressions."""
+
+    def test_run_with_values(self):
+        """Test binding variables when running a program."""
+        program = compile_expression("x y + z *", variables=["x", "y", "z"])
+        assert program.run({"x": 2.0, "y": 3.0, "z": 4.0}) == 20.0
+        assert program.variables == ("x", "y", "z")
+
+    def test_undeclared_name_is_invalid_token(self):
+        """Test that undeclared names are still rejected."""
+        with pytest.raises(InvalidTokenError):
+            compile_expression("x 1 +")
+
+    def test_unbound_variable(self):
+        """Test error when a variable has no value."""
+        program = compile_expression("x 1 +", variables=["x"])
+        with pytest.raises(UnboundVariableError):
+            program.run({})
+
+    def test_invalid_variable_name(self):
+        """Test that numbers and operators cannot be variable names."""
+        for name in ["nan", "+", "1x"]:
+            with pytest.raises(ValueError):
+                compile_expression("1", variables=[name])
+
+
+class TestEvaluateBatch:
+    """Tests for evaluate_batch() with array('d') columns."""
+
+    def test_columns(self):
+        """Test: x y + z * over three rows."""
+        data = columns(x=[1, 2, 3], y=[3, 4, 5], z=[10, 100, 1000])
+        result = evaluate_batch("x y + z *", data)
+        assert list(result.values) == [40.0, 600.0, 8000.0]
+        assert result.mask is None
+
+    def test_matches_row_wise_run(self):
+        """Test that batch results equal running the program per row."""
+        data = columns(a=[0.1, -2.5, 1e10], b=[0.2, 3.0, 7.0])
+        expr = "a b - 3 / b a * +"
+        program = compile_expression(expr, variables=["a", "b"])
+        expected = [program.run({"a": a, "b": b}) for a, b in zip(data["a"], data["b"])]
+        assert list(evaluate_batch(expr, data).values) == expected
+
+    def test_constant_expression_is_broadcast(self):
+        """Test that a result without variables fills every row."""
+        result = evaluate_batch("2 3 +", columns(x=[1, 2]))
+        assert list(result.values) == [5.0, 5.0]
+
+    def test_single_variable_is_copied(self):
+        """Test that the input column is not returned as the result."""
+        data = columns(x=[1, 2])
+        result = evaluate_batch("x", data)
+        assert result.values is not data["x"]
+        assert list(result.values) == [1.0, 2.0]
+
+    def test_zero_division_raise(self):
+        """Test the default policy raises with the failing row."""
+        with pytest.raises(ZeroDivisionError) as exc_info:
+            evaluate_batch("x y /", columns(x=[1, 2, 3], y=[1, 0, 1]))
+        assert "row 1" in str(exc_info.value)
+
+    def test_zero_division_nan(self):
+        """Test the "nan" policy."""
+        result = evaluate_batch(
+            "x y /", columns(x=[1, 2, 3], y=[1, 0, 2]), on_zero_division="nan"
+        )
+        assert result.values[0] == 1.0
+        assert math.isnan(result.values[1])
+        assert result.values[2] == 1.5
+        assert result.mask is None
+
+    def test_zero_division_mask(self):
+        """Test the "mask" policy marks failing rows."""
+        result = evaluate_batch(
+            "x y / 1 +", columns(x=[1, 2, 3], y=[1, 0, 2]), on_zero_division="mask"
+        )
+        assert list(result.mask) == [0, 1, 0]
+        assert math.isnan(result.values[1])
+
+    def test_missing_column(self):
+        """Test error when a variable has no column."""
+        program = compile_expression("x y +", variables=["x", "y"])
+        with pytest.raises(UnboundVariableError):
+            evaluate_batch(program, columns(x=[1.0]))
+
+    def test_unequal_lengths(self):
+        """Test error when columns differ in length."""
+        with pytest.raises(ValueError):
+            evaluate_batch("x y +", columns(x=[1, 2], y=[1]))
+
+    def test_unknown_policy(self):
+        """Test error for an unknown division-by-zero policy."""
+        with pytest.raises(ValueError):
+            evaluate_batch("x", columns(x=[1]), on_zero_division="ignore")
+
+
+class TestEvaluateBatchNumPy:
+    """Tests for evaluate_batch() with NumPy arrays."""
+
+    def test_numpy_columns(self):
+        """Test that NumPy input gives NumPy output with equal values."""
+        numpy = pytest.importorskip("numpy")
+        data = {"x": numpy.array([1.0, 2.0]), "y": numpy.array([3.0, 4.0])}
+        result = evaluate_batch("x y + 2 *", data)
+        assert isinstance(result.values, numpy.ndarray)
+        assert result.values.tolist() == [8.0, 12.0]
+
+    def test_numpy_zero_division_policies(self):
+        """Test division-by-zero policies with NumPy arrays."""
+        numpy = pytest.importorskip("numpy")
+        data = {"x": numpy.array([1.0, 2.0]), "y": numpy.array([0.0, 4.0])}
+        with pytest.raises(ZeroDivisionError):
+            evaluate_batch("x y /", data)
+        result = evaluate_batch("x y /", data, on_zero_division="mask")
+        assert result.mask.tolist() == [True, False]
+        assert numpy.isnan(result.values[0])
+        assert result.values[1] == 0.5
@@ -0,0 +1,125 @@
+"""Unit tests for bytecode catalogues."""
+
+import math
+import struct
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    BytecodeError,
+    Catalogue,
+    Environment,
+    ExpressionCache,
+    Operator,
+    UPNEngine,
+    compile_expression,
+    optimize,
+)
+from upn_calculator.bytecode import FORMAT_VERSION, dump, dumps, load, loads
+
+EXPRESSIONS = ["2 3 +", "10 3 - 4 *", "x y * 1.5 /", "-0 1e308 +", "7"]
+
+
+def compile_all():
+    """Compile the sample expressions with variables x and y."""
+    return [compile_expression(e, ["x", "y"]) for e in EXPRESSIONS]
+
+
+class TestRoundTrip:
+    """Tests for writing and reading catalogues."""
+
+    def test_programs_equal(self):
+        """Test that decoded programs equal the originals."""
+        programs = compile_all()
+        catalogue = loads(dumps(programs))
+        assert isinstance(catalogue, Catalogue)
+        assert len(catalogue) == len(programs)
+        assert list(catalogue) == programs
+        assert catalogue[-1] == programs[-1]
+        assert catalogue[1:3] == programs[1:3]
+
+    def test_file(self, tmp_path):
+        """Test a memory-mapped catalogue file."""
+        path = tmp_path / "formulas.upnb"
+        dump(compile_all(), path)
+        with load(path) as catalogue:
+            assert catalogue.find("x y * 1.5 /").run({"x": 3.0, "y": 1.0}) == 2.0
+            assert catalogue.find("1 1 +") is None
+
+    def test_special_constants(self):
+        """Test that constants keep their exact bits."""
+        program = compile_expression("nan -0 + inf +")
+        decoded = loads(dumps([program]))[0]
+        assert math.isnan(decoded.code[0][1])
+        assert math.copysign(1.0, decoded.code[1][1]) == -1.0
+        assert decoded.code[3][1] == math.inf
+
+    def test_optimized_programs(self):
+        """Test that optimized programs can be stored."""
+        program, _ = optimize(compile_expression("2 3 + x *", ["x"]))
+        assert loads(dumps([program]))[0] == program
+
+    def test_custom_operators(self):
+        """Test programs with unary, multi-output and variadic operators."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("sqrt", 1, math.sqrt))
+        registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+        registry.register(Operator("sum", None, lambda *xs: math.fsum(xs)))
+        program = compile_expression("1 2 16 sqrt dup sum", operators=registry)
+        decoded = loads(dumps([program]), registry)[0]
+        assert decoded == program
+        assert decoded.run() == 11.0
+        with pytest.raises(BytecodeError, match="'sqrt'"):
+            loads(dumps([program]))[0]
+
+    def test_preload(self):
+        """Test warming an engine's cache from a catalogue."""
+        engine = UPNEngine(ExpressionCache())
+        assert loads(dumps(compile_all())).preload(engine.cache) == len(EXPRESSIONS)
+        assert engine.evaluate("10 3 - 4 *") == 28.0
+        assert engine.evaluate("x y * 1.5 /", {"x": 3.0, "y": 1.0}) == 2.0
+        # The entry serves any bindings that include x and y.
+        env = Environment({"x": 6.0, "y": 1.0, "z": 0.0})
+        assert engine.evaluate("x y * 1.5 /", env) == 4.0
+        assert engine.try_evaluate("x y * 1.5 /", {"x": 3.0, "w": 1.0}).ok is False
+        assert engine.cache.stats().hits == 4
+        assert len(engine.cache) == len(EXPRESSIONS) + 2
+
+
+class TestValidation:
+    """Tests for rejecting invalid catalogues."""
+
+    def test_checksum(self):
+        """Test that corruption is detected."""
+        data = bytearray(dumps(compile_all()))
+        data[-1] ^= 0xFF
+        with pytest.raises(BytecodeError, match="checksum"):
+            loads(data)
+        assert len(loads(data, verify=False)) == len(EXPRESSIONS)
+
+    def test_magic(self):
+        """Test that other files are rejected."""
+        with pytest.raises(BytecodeError, match="magic"):
+            loads(b"NOPE" + dumps([])[4:])
+        with pytest.raises(BytecodeError, match="too short"):
+            loads(b"UPNB")
+
+    def test_version(self):
+        """Test that other format versions are rejected."""
+        data = bytearray(dumps([]))
+        struct.pack_into("=H", data, 4, FORMAT_VERSION + 1)
+        with pytest.raises(BytecodeError, match="version"):
+            loads(data)
+
+    def test_truncated(self):
+        """Test that a truncated file is rejected."""
+        with pytest.raises(BytecodeError, match="size"):
+            loads(dumps(compile_all())[:-3])
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file is rejected."""
+        path = tmp_path / "empty.upnb"
+        path.write_bytes(b"")
+        with pytest.raises(BytecodeError):
+            load(path)
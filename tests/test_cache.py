@@ -0,0 +1,113 @@
+"""Unit tests for the compiled-expression cache."""
+
+import threading
+
+import pytest
+
+from upn_calculator import (
+    ExpressionCache,
+    InvalidTokenError,
+    UPNCalculator,
+    compile_expression,
+)
+
+
+class TestExpressionCache:
+    """Tests for ExpressionCache on its own."""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses."""
+        cache = ExpressionCache()
+        assert cache.get("2 3 +") is None
+        program = compile_expression("2 3 +")
+        cache.put("2 3 +", program)
+        assert cache.get("2 3 +") is program
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = ExpressionCache(maxsize=2)
+        for expr in ["1", "2"]:
+            cache.put(expr, compile_expression(expr))
+        cache.get("1")  # "2" is now least recently used
+        cache.put("3", compile_expression("3"))
+        assert cache.get("2") is None
+        assert cache.get("1") is not None
+        assert cache.stats().evictions == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test that entries expire after the TTL."""
+        now = [100.0]
+        monkeypatch.setattr("upn_calculator.cache.time.monotonic", lambda: now[0])
+        cache = ExpressionCache(ttl=10)
+        cache.put("1", compile_expression("1"))
+        now[0] = 105.0
+        assert cache.get("1") is not None
+        now[0] = 111.0
+        assert cache.get("1") is None
+        assert cache.stats().expirations == 1
+        assert len(cache) == 0
+
+    def test_disabled_cache(self):
+        """Test that maxsize=0 stores nothing."""
+        cache = ExpressionCache(maxsize=0)
+        cache.put("1", compile_expression("1"))
+        assert cache.get("1") is None
+
+    def test_clear(self):
+        """Test that clear() drops entries and counters."""
+        cache = ExpressionCache()
+        cache.put("1", compile_expression("1"))
+        cache.get("1")
+        cache.clear()
+        assert cache.stats() == (0, 0, 0, 0, 0, cache.maxsize)
+
+    def test_invalid_arguments(self):
+        """Test validation of maxsize and ttl."""
+        with pytest.raises(ValueError):
+            ExpressionCache(maxsize=-1)
+        with pytest.raises(ValueError):
+            ExpressionCache(ttl=0)
+
+    def test_concurrent_access(self):
+        """Test that concurrent use keeps the counters consistent."""
+        cache = ExpressionCache(maxsize=8)
+        calc = UPNCalculator(cache=cache)
+        expressions = [f"{i} 1 +" for i in range(16)]
+
+        def work():
+            for _ in range(50):
+                for i, expr in enumerate(expressions):
+                    assert calc.compile(expr).run() == i + 1
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        assert stats.hits + stats.misses == 4 * 50 * 16
+        assert stats.size <= 8
+
+
+class TestCalculatorCache:
+    """Tests for the cache inside UPNCalculator.evaluate()."""
+
+    def test_evaluate_uses_cache(self):
+        """Test that repeated evaluation hits the cache."""
+        cache = ExpressionCache()
+        calc = UPNCalculator(cache=cache)
+        assert calc.evaluate("2 3 +") == 5.0
+        assert calc.evaluate("2 3 +") == 5.0
+        assert cache.stats().hits == 1
+        assert cache.stats().misses == 1
+
+    def test_errors_are_not_cached(self):
+        """Test that invalid expressions raise on every call."""
+        cache = ExpressionCache()
+        calc = UPNCalculator(cache=cache)
+        for _ in range(2):
+            with pytest.raises(InvalidTokenError):
+                calc.evaluate("2 xyz +")
+        assert len(cache) == 0
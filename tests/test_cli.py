@@ -0,0 +1,153 @@
+"""Tests for the upn command-line interface."""
+
+import io
+import math
+from array import array
+
+import pytest
+
+from upn_calculator import write_column
+from upn_calculator.cli import main
+
+
+def run_cli(argv, stdin="", monkeypatch=None):
+    """Run main() with the given arguments and stdin."""
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    return main(argv)
+
+
+class TestCLI:
+    """Tests for bulk evaluation from files and stdin."""
+
+    def test_stdin(self, monkeypatch, capsys):
+        """Test one output line per input line from stdin."""
+        assert run_cli([], "2 3 +\n10 4 -\n", monkeypatch) == 0
+        assert capsys.readouterr().out == "5.0\t\n6.0\t\n"
+
+    def test_files_and_output(self, tmp_path, capsys):
+        """Test reading several files and writing to an output file."""
+        first = tmp_path / "a.upn"
+        second = tmp_path / "b.upn"
+        first.write_text("1 1 +\n")
+        second.write_text("2 2 *\n3 3 *")
+        output = tmp_path / "out.tsv"
+        assert main([str(first), str(second), "-o", str(output)]) == 0
+        assert output.read_text() == "2.0\t\n4.0\t\n9.0\t\n"
+
+    def test_error_column_message(self, monkeypatch, capsys):
+        """Test that failures keep their line with the error message."""
+        run_cli([], "2 3 +\n10 0 /\n4\n", monkeypatch)
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == ["5.0\t", "\tDivision by zero", "4.0\t"]
+
+    def test_error_column_type(self, monkeypatch, capsys):
+        """Test the error type column with a custom delimiter."""
+        run_cli(["--error-column", "type", "-d", ","], "2 xyz +\n", monkeypatch)
+        assert capsys.readouterr().out == ",InvalidTokenError\n"
+
+    def test_error_column_none(self, monkeypatch, capsys):
+        """Test that failed lines stay empty without an error column."""
+        run_cli(["--error-column", "none"], "2 +\n1 2 +\n", monkeypatch)
+        assert capsys.readouterr().out == "\n3.0\n"
+
+    def test_stats(self, monkeypatch, capsys):
+        """Test that --stats reports throughput and percentiles on stderr."""
+        run_cli(["--stats"], "2 3 +\n1 0 /\n", monkeypatch)
+        err = capsys.readouterr().err
+        assert "2 expressions (1 errors)" in err
+        assert "expressions/s" in err
+        assert "p50=" in err and "p99=" in err
+
+    def test_invalid_utf8(self, tmp_path, monkeypatch, capsys):
+        """Test that a line with invalid UTF-8 fails on its own."""
+        data = b"2 3 +\n1 \xff +\n4\n"
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data)))
+        assert main(["--error-column", "type"]) == 0
+        expected = "5.0\t\n\tInvalidTokenError\n4.0\t\n"
+        assert capsys.readouterr().out == expected
+        source = tmp_path / "in.upn"
+        source.write_bytes(data)
+        assert main([str(source), "--error-column", "type"]) == 0
+        assert capsys.readouterr().out == expected
+
+    def test_missing_file(self, tmp_path, capsys):
+        """Test the exit code for an unreadable input file."""
+        assert main([str(tmp_path / "missing.upn")]) == 1
+        assert "upn:" in capsys.readouterr().err
+
+    def test_unwritable_output(self, tmp_path, capsys):
+        """Test the exit code for an output file that cannot be created."""
+        source = tmp_path / "in.upn"
+        source.write_text("1 1 +\n")
+        output = tmp_path / "missing" / "out.tsv"
+        assert main([str(source), "-o", str(output), "--workers", "2"]) == 1
+        assert "upn:" in capsys.readouterr().err
+
+    def test_invalid_option(self):
+        """Test that an invalid choice is a usage error."""
+        with pytest.raises(SystemExit):
+            main(["--error-column", "bogus"])
+
+    def test_workers(self, tmp_path, capsys):
+        """Test that worker processes keep the input order."""
+        source = tmp_path / "in.upn"
+        source.write_text("".join(f"{i} 1 +\n" for i in range(50)) + "1 0 /\n")
+        assert main([str(source), "--workers", "2", "--chunk-size", "7"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[:50] == [f"{i + 1.0}\t" for i in range(50)]
+        assert lines[50] == "\tDivision by zero"
+
+    def test_invalid_workers(self):
+        """Test that a worker count below 1 is a usage error."""
+        with pytest.raises(SystemExit):
+            main(["--workers", "0"])
+
+
+class TestColumnMode:
+    """Tests for evaluating an expression over column files."""
+
+    def test_columns(self, tmp_path, capsys):
+        """Test binding column files and writing the result file."""
+        write_column(tmp_path / "x.f64", [1.0, 2.0, 3.0])
+        write_column(tmp_path / "y.f64", [4.0, 5.0, 6.0])
+        output = tmp_path / "out.f64"
+        argv = [
+            "-e",
+            "x y *",
+            "-c",
+            f"x={tmp_path / 'x.f64'}",
+            "--column",
+            f"y={tmp_path / 'y.f64'}",
+            "-o",
+            str(output),
+            "--stats",
+        ]
+        assert main(argv) == 0
+        assert array("d", output.read_bytes()) == array("d", [4.0, 10.0, 18.0])
+        assert "3 rows" in capsys.readouterr().err
+
+    def test_zero_division(self, tmp_path, capsys):
+        """Test that a division by zero fails the run unless NaN is asked."""
+        write_column(tmp_path / "x.f64", [1.0, 0.0])
+        argv = ["-e", "1 x /", "-c", f"x={tmp_path / 'x.f64'}"]
+        argv += ["-o", str(tmp_path / "out.f64")]
+        assert main(argv) == 1
+        assert "row 1" in capsys.readouterr().err
+        assert main(argv + ["--on-zero-division", "nan"]) == 0
+        values = array("d", (tmp_path / "out.f64").read_bytes())
+        assert values[0] == 1.0 and math.isnan(values[1])
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["-e", "x 1 +", "-o", "out.f64"],
+            ["-c", "x=x.f64", "-o", "out.f64"],
+            ["-e", "x", "-c", "x=x.f64"],
+            ["-e", "x", "-c", "x", "-o", "out.f64"],
+            ["-e", "x", "-c", "x=x.f64", "-o", "out.f64", "in.upn"],
+        ],
+    )
+    def test_usage_errors(self, argv):
+        """Test that incomplete column mode arguments are usage errors."""
+        with pytest.raises(SystemExit):
+            main(argv)
@@ -0,0 +1,199 @@
+"""Unit tests for code generation of Python functions."""
+
+import builtins
+import math
+import random
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    CodegenEngine,
+    DecimalBackend,
+    GeneratedExpression,
+    InvalidTokenError,
+    Operator,
+    UnboundVariableError,
+    UPNCalculator,
+    ZeroDivisionError,
+    compile_expression,
+    generate_function,
+    optimize,
+)
+from upn_calculator.codegen import MAX_NESTING
+
+
+def _outcome(program, values=None):
+    """Run a program and return its result or the type of its error."""
+    try:
+        return program.run(values)
+    except Exception as exc:
+        return type(exc)
+
+
+def _same(a, b):
+    """Compare outcomes, treating NaN as equal to NaN."""
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+
+@pytest.fixture
+def registry():
+    """A registry with operators of every shape."""
+    registry = OPERATORS.copy()
+    registry.register(Operator("neg", 1, lambda x: -x))
+    registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+    registry.register(Operator("swap", 2, lambda a, b: (b, a), outputs=2))
+    registry.register(Operator("sum", None, lambda *xs: sum(xs)))
+    registry.register(Operator("pi", 0, lambda: math.pi))
+    return registry
+
+
+class TestGeneratedSource:
+    """Tests for the generated Python code."""
+
+    def test_nested_expression(self):
+        """Test that operands become nested Python expressions."""
+        generated = generate_function(compile_expression("x y + z *", "xyz"))
+        assert "((values['x'] + values['y']) * values['z'])" in generated.python
+        assert generated.run({"x": 1.0, "y": 2.0, "z": 3.0}) == 9.0
+
+    def test_constant_divisor(self):
+        """Test that dividing by a non-zero constant needs no check."""
+        generated = generate_function(compile_expression("x 4 /", ["x"]))
+        assert "raise" not in generated.python.split("except")[0]
+        assert generated.run({"x": 2.0}) == 0.5
+
+    def test_compiled_expression(self):
+        """Test that the generated program keeps its instructions."""
+        program = compile_expression("2 3 +")
+        generated = generate_function(program)
+        assert isinstance(generated, GeneratedExpression)
+        assert generated.code == program.code
+        assert generated.max_depth == program.max_depth
+
+    def test_deep_nesting(self):
+        """Test that deep expressions are split into locals."""
+        left = " ".join(["1"] + ["2 +"] * 500)
+        right = " ".join(["1"] * 501 + ["+"] * 500)
+        for expression in (left, right):
+            generated = generate_function(compile_expression(expression))
+            assert generated.python.count(" = ") >= 500 // MAX_NESTING
+            assert generated.run() == compile_expression(expression).run()
+
+    def test_non_finite_constants(self):
+        """Test constants that have no Python literal."""
+        generated = generate_function(compile_expression("inf -inf + nan +"))
+        assert math.isnan(generated.run())
+
+    def test_optimized_program(self):
+        """Test generating a function for an optimized program."""
+        program, _ = optimize(compile_expression("2 3 + x *", ["x"]))
+        assert generate_function(program).run({"x": 2.0}) == 10.0
+
+
+class TestSemantics:
+    """Tests that generated functions behave like the interpreter."""
+
+    def test_division_by_zero(self):
+        """Test that zero divisors raise the calculator's error."""
+        for expression, values in [
+            ("1 0 /", None),
+            ("x y /", {"x": 1.0, "y": 0.0}),
+            ("x y /", {"x": 1, "y": 0}),
+            ("x 0 y - /", {"x": 1.0, "y": -0.0}),
+        ]:
+            generated = generate_function(compile_expression(expression, "xy"))
+            with pytest.raises(ZeroDivisionError, match="Division by zero"):
+                generated.run(values)
+
+    def test_custom_operator_error_passes_through(self):
+        """Test that a custom operator's own errors are not translated."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("inv", 1, lambda x: 1 / x))
+        generated = generate_function(compile_expression("0 inv", operators=registry))
+        with pytest.raises(builtins.ZeroDivisionError):
+            generated.run()
+
+    def test_unbound_variable(self):
+        """Test that missing variables raise UnboundVariableError."""
+        generated = generate_function(compile_expression("x y +", ["x", "y"]))
+        with pytest.raises(UnboundVariableError, match="'y'"):
+            generated.run({"x": 1.0})
+        with pytest.raises(UnboundVariableError):
+            generated.run()
+
+    def test_error_order(self):
+        """Test that the first failing operation raises, as when interpreted."""
+        generated = generate_function(compile_expression("1 0 / x +", ["x"]))
+        with pytest.raises(ZeroDivisionError):
+            generated.run()
+        generated = generate_function(compile_expression("x 1 0 / +", ["x"]))
+        with pytest.raises(UnboundVariableError):
+            generated.run()
+
+    def test_operator_shapes(self, registry):
+        """Test unary, multi-output, variadic and nullary operators."""
+        for expression in [
+            "x neg",
+            "x dup *",
+            "1 x swap /",
+            "1 2 x sum",
+            "pi x *",
+            "x dup 1 + swap / 2 3 sum",
+        ]:
+            program = compile_expression(expression, ["x"], registry)
+            assert generate_function(program).run({"x": 3.0}) == program.run({"x": 3.0})
+
+    def test_random_programs(self, registry):
+        """Test random programs against the interpreter, errors included."""
+        rng = random.Random(0)
+        effects = {"+": -1, "-": -1, "*": -1, "/": -1, "neg": 0, "dup": 1, "swap": 0}
+        for _ in range(300):
+            tokens = [rng.choice(["x", "y", "0", "1.5", "-2"])]
+            depth = 1
+            for _ in range(rng.randint(1, 30)):
+                if depth >= 2 and rng.random() < 0.5:
+                    symbol = rng.choice(list(effects))
+                    tokens.append(symbol)
+                    depth += effects[symbol]
+                else:
+                    tokens.append(rng.choice(["x", "y", "0", "3", "-0.5"]))
+                    depth += 1
+            tokens += ["+"] * (depth - 1)
+            program = compile_expression(" ".join(tokens), ["x", "y"], registry)
+            generated = generate_function(program)
+            for values in ({"x": 2.0, "y": 0.0}, {"x": -1.0, "y": 4.0}, {"x": 1.0}):
+                assert _same(_outcome(generated, values), _outcome(program, values))
+
+
+class TestCodegenEngine:
+    """Tests for evaluating through generated functions."""
+
+    def test_calculator(self):
+        """Test a calculator using the code generating engine."""
+        calc = UPNCalculator(engine=CodegenEngine())
+        assert calc.evaluate("2 3 + 4 *") == 20.0
+        assert calc.evaluate("x y *", {"x": 6.0, "y": 7.0}) == 42.0
+        with pytest.raises(ZeroDivisionError):
+            calc.evaluate("1 0 /")
+        with pytest.raises(InvalidTokenError):
+            calc.evaluate("2 x? +")
+
+    def test_cached(self):
+        """Test that each expression is generated once."""
+        engine = CodegenEngine()
+        first = engine.compile("x 2 *", ["x"])
+        assert isinstance(first, GeneratedExpression)
+        assert engine.compile("x 2 *", ["x"]) is first
+        assert engine.cache is not CodegenEngine().cache
+
+    def test_numeric_backend(self):
+        """Test that backend functions are called, not inlined."""
+        from decimal import Decimal
+
+        engine = CodegenEngine(numeric=DecimalBackend())
+        assert engine.evaluate("0.1 0.2 +") == Decimal("0.3")
+        with pytest.raises(ZeroDivisionError):
+            engine.evaluate("1 0 /")
@@ -0,0 +1,157 @@
+"""Unit tests for compiled UPN expressions."""
+
+import dataclasses
+import math
+import threading
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    CompiledExpression,
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    Operator,
+    UPNCalculator,
+    ZeroDivisionError,
+    compile_expression,
+)
+from upn_calculator.compiler import MAX_SHARED_DEPTH
+
+
+class TestCompile:
+    """Tests for compiling expressions."""
+
+    def test_compile_returns_program(self):
+        """Test that compile() returns a CompiledExpression."""
+        calc = UPNCalculator()
+        program = calc.compile("2 3 +")
+        assert isinstance(program, CompiledExpression)
+        assert program.source == "2 3 +"
+
+    def test_run_matches_evaluate(self):
+        """Test that run() gives the same results as evaluate()."""
+        calc = UPNCalculator()
+        for expr in ["5", "2 3 +", "10 3 -", "2 3 + 4 *", "1e-10 2e-10 +", "1 3 /"]:
+            assert compile_expression(expr).run() == calc.evaluate(expr)
+
+    def test_run_is_repeatable(self):
+        """Test that a program can be run many times."""
+        program = compile_expression("2 3 + 4 *")
+        assert [program.run() for _ in range(3)] == [20.0, 20.0, 20.0]
+
+    def test_max_depth(self):
+        """Test that the maximum stack depth is computed at compile time."""
+        assert compile_expression("5").max_depth == 1
+        assert compile_expression("2 3 + 4 *").max_depth == 2
+        assert compile_expression("1 2 3 4 + + +").max_depth == 4
+
+    def test_program_is_immutable(self):
+        """Test that a compiled program cannot be modified."""
+        program = compile_expression("2 3 +")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            program.code = ()
+
+
+class TestCompileErrors:
+    """Tests for errors detected at compile time."""
+
+    def test_invalid_token(self):
+        """Test that unknown tokens are rejected at compile time."""
+        with pytest.raises(InvalidTokenError) as exc_info:
+            compile_expression("2 3 xyz +")
+        assert "xyz" in str(exc_info.value)
+
+    def test_insufficient_operands(self):
+        """Test that operand underflow is rejected at compile time."""
+        with pytest.raises(InsufficientOperandsError) as exc_info:
+            compile_expression("2 +")
+        assert "2 operands" in str(exc_info.value).lower()
+
+    def test_too_many_operands(self):
+        """Test that leftover operands are rejected at compile time."""
+        with pytest.raises(InvalidExpressionError):
+            compile_expression("2 3 4 +")
+
+    def test_division_by_zero_at_run_time(self):
+        """Test that division by zero is raised when the program runs."""
+        program = compile_expression("10 0 /")
+        with pytest.raises(ZeroDivisionError):
+            program.run()
+
+
+class TestOperandBuffer:
+    """Tests for running programs on reused operand buffers."""
+
+    @pytest.mark.parametrize("operands", [2, 64, MAX_SHARED_DEPTH + 1])
+    def test_deep_programs(self, operands):
+        """Test programs up to and beyond the depth of shared buffers."""
+        program = compile_expression(
+            " ".join(["1"] * operands + ["+"] * (operands - 1))
+        )
+        assert program.max_depth == operands
+        assert program.run() == operands
+        assert compile_expression("1 2 + 3 -").run() == 0.0
+
+    @pytest.mark.parametrize(
+        "expression, expected",
+        [
+            ("pi", math.pi),
+            ("1 pi +", 1 + math.pi),
+            ("2 dup *", 4.0),
+            ("1 2 3 dup", None),
+            ("1 2 3 swap - +", 2.0),
+            ("1 2 3 4 sum", 10.0),
+            ("1 2 swap 3 dup sum", 9.0),
+            ("5 drop 7", 7.0),
+        ],
+    )
+    def test_apply(self, expression, expected):
+        """Test operators with other operand and result counts at any depth."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("pi", 0, lambda: math.pi))
+        registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+        registry.register(Operator("swap", 2, lambda a, b: (b, a), outputs=2))
+        registry.register(Operator("sum", None, lambda *xs: math.fsum(xs)))
+        registry.register(Operator("drop", 1, lambda x: (), outputs=0))
+        if expected is None:
+            with pytest.raises(InvalidExpressionError):
+                compile_expression(expression, operators=registry)
+        else:
+            assert compile_expression(expression, operators=registry).run() == expected
+
+    def test_nested_run(self):
+        """Test an operator that runs another program while its own runs."""
+        inner = compile_expression("x 10 * 1 +", ["x"])
+        registry = OPERATORS.copy()
+        registry.register(Operator("f", 1, lambda x: inner.run({"x": x})))
+        program = compile_expression("1 2 f 3 f + +", operators=registry)
+        assert program.run() == 1 + 21 + 31
+
+    def test_run_after_error(self):
+        """Test that a run failing halfway leaves no trace in later runs."""
+        with pytest.raises(ZeroDivisionError):
+            compile_expression("1 2 3 0 / + +").run()
+        assert compile_expression("4 5 6 + +").run() == 15.0
+
+    def test_threads(self):
+        """Test that concurrent runs do not share a buffer."""
+        programs = [compile_expression(f"{i} 1 2 3 + + +") for i in range(8)]
+        errors = []
+
+        def work(index):
+            for _ in range(2000):
+                if programs[index].run() != index + 6:
+                    errors.append(index)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    def test_calculator_has_slots(self):
+        """Test that calculators carry no per-instance attribute dict."""
+        assert not hasattr(UPNCalculator(), "__dict__")
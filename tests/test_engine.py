@@ -0,0 +1,77 @@
+"""Unit tests for the thread-safe evaluation engine."""
+
+import threading
+
+import pytest
+
+from upn_calculator import (
+    ExpressionCache,
+    InvalidTokenError,
+    UPNCalculator,
+    UPNEngine,
+)
+
+
+def run_threads(target, count=8):
+    """Run target in several threads and wait for all of them."""
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestUPNEngine:
+    """Tests for UPNEngine."""
+
+    def test_evaluate(self):
+        """Test basic evaluation."""
+        engine = UPNEngine()
+        assert engine.evaluate("2 3 + 4 *") == 20.0
+
+    def test_errors(self):
+        """Test that errors are raised as usual."""
+        with pytest.raises(InvalidTokenError):
+            UPNEngine().evaluate("2 xyz +")
+
+    def test_shared_between_threads(self):
+        """Test that one engine gives correct results in many threads."""
+        engine = UPNEngine(ExpressionCache(maxsize=16))
+        failures = []
+
+        def work(index):
+            for i in range(300):
+                value = index * 1000 + i
+                if engine.evaluate(f"{value} 2 * 1 +") != value * 2 + 1:
+                    failures.append(value)
+
+        run_threads(work)
+        assert failures == []
+
+    def test_calculator_results_correct_when_shared(self):
+        """Test that a shared calculator returns each caller's own result."""
+        calc = UPNCalculator()
+        failures = []
+
+        def work(index):
+            for i in range(300):
+                if calc.evaluate(f"{index} {i} +") != index + i:
+                    failures.append((index, i))
+
+        run_threads(work)
+        assert failures == []
+
+
+class TestCalculatorSession:
+    """Tests for UPNCalculator as a session on top of an engine."""
+
+    def test_shared_engine(self):
+        """Test that sessions can share one engine but not their stacks."""
+        engine = UPNEngine()
+        first = UPNCalculator(engine=engine)
+        second = UPNCalculator(engine=engine)
+        first.evaluate("2 3 +")
+        second.push(7.0)
+        assert first.get_stack() == [5.0]
+        assert second.get_stack() == [7.0]
+        assert first.cache is engine.cache
@@ -0,0 +1,121 @@
+"""Unit tests for variable environments and incremental re-evaluation."""
+
+import pytest
+
+from upn_calculator import (
+    Environment,
+    InvalidTokenError,
+    ReactiveEnvironment,
+    UnboundVariableError,
+    UPNCalculator,
+    UPNEngine,
+    ZeroDivisionError,
+)
+
+
+class TestEnvironment:
+    """Tests for Environment and evaluating with bindings."""
+
+    def test_mapping(self):
+        """Test that an environment behaves like a mapping."""
+        env = Environment({"x": 1.0}, y=2.0)
+        env["z"] = 3.0
+        del env["x"]
+        assert dict(env) == {"y": 2.0, "z": 3.0}
+        assert "y" in env
+        assert len(env) == 2
+
+    @pytest.mark.parametrize("name", ["+", "1x", "inf", "a b"])
+    def test_invalid_name(self, name):
+        """Test that invalid variable names are rejected."""
+        with pytest.raises(ValueError):
+            Environment({name: 1.0})
+
+    def test_calculator_evaluate(self):
+        """Test evaluating an expression with an environment."""
+        calc = UPNCalculator()
+        env = Environment(x=2.0, y=3.0)
+        assert calc.evaluate("x y + 4 *", env) == 20.0
+        assert calc.get_stack() == [20.0]
+        env["x"] = 7.0
+        assert calc.evaluate("x y + 4 *", env) == 40.0
+
+    def test_plain_mapping(self):
+        """Test that a plain dict works as bindings too."""
+        assert UPNEngine().evaluate("a b /", {"a": 1.0, "b": 4.0}) == 0.25
+
+    def test_unknown_name(self):
+        """Test that names not bound are unknown tokens."""
+        with pytest.raises(InvalidTokenError):
+            UPNCalculator().evaluate("x y +", Environment(x=1.0))
+
+    def test_cached_per_names(self):
+        """Test that programs are cached per set of bound names."""
+        engine = UPNEngine()
+        engine.cache.clear()
+        engine.evaluate("x 1 +", Environment(x=1.0))
+        engine.evaluate("x 1 +", Environment(x=2.0))
+        assert engine.cache.stats().hits == 1
+        with pytest.raises(InvalidTokenError):
+            engine.evaluate("x 1 +")
+
+
+class TestReactiveEnvironment:
+    """Tests for incremental re-evaluation of registered expressions."""
+
+    def test_only_dependents_recomputed(self):
+        """Test that a change recomputes only the operations that read it."""
+        env = ReactiveEnvironment(a=1.0, b=2.0, c=3.0)
+        env.register("a b + c *")
+        env.register("a b + 2 *")
+        env.register("c 1 +")
+        assert env.results() == [9.0, 6.0, 4.0]
+        env["c"] = 4.0
+        assert env.results() == [12.0, 6.0, 5.0]
+        # load c, "a b + c *" and "c 1 +"
+        assert env.recomputed == 3
+
+    def test_no_change_no_work(self):
+        """Test that unchanged results are served without recomputation."""
+        env = ReactiveEnvironment(x=1.0)
+        env.register("x 2 *")
+        env.results()
+        assert env.results() == [2.0]
+        assert env.recomputed == 0
+
+    def test_register_after_results(self):
+        """Test that expressions can be added to a live environment."""
+        env = ReactiveEnvironment(x=1.0)
+        first = env.register("x 2 *")
+        assert env.result(first) == 2.0
+        second = env.register("x 2 * 1 +")
+        assert env.result(second) == 3.0
+        # only the new "1 +" operation is computed
+        assert env.recomputed == 1
+        env["x"] = 5.0
+        assert env.results() == [10.0, 11.0]
+
+    def test_matches_full_evaluation(self):
+        """Test that incremental results equal a fresh evaluation."""
+        formulas = ["a b * c -", "a 2 / b +", "c c * a -", "b 3 + 4 *"]
+        env = ReactiveEnvironment(a=1.0, b=2.0, c=3.0)
+        for formula in formulas:
+            env.register(formula)
+        calc = UPNCalculator()
+        for tick in range(20):
+            env["abc"[tick % 3]] = tick * 0.5 + 1
+            assert env.results() == [calc.evaluate(f, env) for f in formulas]
+
+    def test_errors_follow_bindings(self):
+        """Test that errors appear and disappear with the bindings."""
+        env = ReactiveEnvironment(x=0.0, y=1.0)
+        env.register("1 x /")
+        env.register("y 1 +")
+        env.register("2 zzz +")
+        results = env.results()
+        assert isinstance(results[0], ZeroDivisionError)
+        assert isinstance(results[2], InvalidTokenError)
+        env["x"] = 4.0
+        assert env.results()[:2] == [0.25, 2.0]
+        del env["y"]
+        assert isinstance(env.results()[1], UnboundVariableError)
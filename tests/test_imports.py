@@ -0,0 +1,110 @@
+"""Tests for the package's lazy imports and their import time."""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Set, Tuple
+
+import pytest
+
+import upn_calculator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules the calculator must not pull in until they are used.
+HEAVY_MODULES = [
+    "decimal",
+    "fractions",
+    "concurrent.futures",
+    "multiprocessing",
+    "asyncio",
+    "upn_calculator.numeric",
+    "upn_calculator.profiling",
+]
+
+
+def run_import(code: str) -> Tuple[Set[str], Dict[str, int]]:
+    """
+    Run code in a fresh interpreter with -X importtime.
+
+    Args:
+        code: The Python source to run.
+
+    Returns:
+        The names of all modules loaded afterwards, and {module name:
+        cumulative import time in microseconds} for the modules that import
+        statements loaded (importlib.import_module() does not report).
+    """
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return set(process.stdout.split()), times
+
+
+class TestImportTime:
+    """Tests for what importing the package loads."""
+
+    def test_bare_import(self):
+        """Test that importing the package loads none of its modules."""
+        modules, _ = run_import("import upn_calculator")
+        assert "upn_calculator" in modules
+        assert [name for name in modules if name.startswith("upn_calculator.")] == []
+
+    def test_bare_import_time(self):
+        """Test that the package imports faster than the calculator module."""
+        _, times = run_import("import upn_calculator\nimport upn_calculator.calculator")
+        assert times["upn_calculator"] < times["upn_calculator.calculator"]
+
+    def test_calculator_import(self):
+        """Test that the calculator does not load optional backends."""
+        modules, _ = run_import("from upn_calculator import UPNCalculator")
+        assert "upn_calculator.calculator" in modules
+        assert [name for name in HEAVY_MODULES if name in modules] == []
+
+    def test_backend_loaded_on_use(self):
+        """Test that a backend's modules load when it is first accessed."""
+        modules, _ = run_import("from upn_calculator import DecimalBackend")
+        assert "upn_calculator.numeric" in modules
+        assert "decimal" in modules
+
+    def test_cli_import(self):
+        """Test that the command line loads no process pool or column mode."""
+        modules, _ = run_import("import upn_calculator.cli")
+        assert "concurrent.futures" not in modules
+        assert "multiprocessing" not in modules
+        assert "upn_calculator.mapped" not in modules
+
+
+class TestLazyAttributes:
+    """Tests for the module-level __getattr__."""
+
+    def test_exports_match_all(self):
+        """Test that every public name has a defining module."""
+        assert list(upn_calculator._EXPORTS) == upn_calculator.__all__
+
+    @pytest.mark.parametrize("name", upn_calculator.__all__)
+    def test_public_name(self, name):
+        """Test that every public name resolves to its module's object."""
+        value = getattr(upn_calculator, name)
+        module = sys.modules[f"upn_calculator.{upn_calculator._EXPORTS[name]}"]
+        assert value is getattr(module, name)
+
+    def test_dir(self):
+        """Test that dir() lists names that are not loaded yet."""
+        assert set(upn_calculator.__all__) <= set(dir(upn_calculator))
+
+    def test_unknown_name(self):
+        """Test that unknown names raise AttributeError."""
+        with pytest.raises(AttributeError, match="no attribute 'missing'"):
+            upn_calculator.missing  # noqa: B018
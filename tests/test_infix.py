@@ -0,0 +1,196 @@
+"""Unit tests for converting infix formulas to UPN."""
+
+import math
+import operator
+import random
+import re
+from fractions import Fraction
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    ExpressionCache,
+    FractionBackend,
+    InfixConverter,
+    InvalidExpressionError,
+    InvalidTokenError,
+    Operator,
+    UPNEngine,
+    ZeroDivisionError,
+    compile_expression,
+    compile_infix,
+    to_upn,
+)
+from upn_calculator.infix import PRECEDENCE, infix_tokens
+
+
+def _random_formula(rng, depth=0):
+    """Build a random fully parenthesized formula and its Python equivalent."""
+    if depth > 3 or rng.random() < 0.3:
+        if rng.random() < 0.3:
+            name = rng.choice("xyz")
+            return name, name
+        number = str(rng.randint(0, 9))
+        return number, number
+    if rng.random() < 0.15:
+        text, python = _random_formula(rng, depth + 1)
+        return f"-({text})", f"-({python})"
+    left, left_py = _random_formula(rng, depth + 1)
+    right, right_py = _random_formula(rng, depth + 1)
+    op = rng.choice("+-*/")
+    if rng.random() < 0.5:
+        return f"{left} {op} {right}", f"{left_py} {op} {right_py}"
+    return f"({left}) {op} ({right})", f"({left_py}) {op} ({right_py})"
+
+
+class TestToUpn:
+    """Tests for the shunting-yard conversion."""
+
+    @pytest.mark.parametrize(
+        "formula, upn",
+        [
+            ("(a + b) * c", "a b + c *"),
+            ("a + b * c", "a b c * +"),
+            ("10 - 4 - 3", "10 4 - 3 -"),
+            ("8 / 4 / 2", "8 4 / 2 /"),
+            ("a - (b - c)", "a b c - -"),
+            ("1 + 2 * 3 - 4 / 5", "1 2 3 * + 4 5 / -"),
+            ("((2))", "2"),
+            ("2*(3+4)", "2 3 4 + *"),
+            ("1.5e3 + .5 - 1_000", "1.5e3 .5 + 1_000 -"),
+            ("inf - x", "inf x -"),
+        ],
+    )
+    def test_precedence_and_associativity(self, formula, upn):
+        """Test operator precedence and left associativity of - and /."""
+        assert to_upn(formula) == upn
+
+    @pytest.mark.parametrize(
+        "formula, upn",
+        [
+            ("-3 * 2", "-3 2 *"),
+            ("2 * -3", "2 -3 *"),
+            ("- -3", "3"),
+            ("-x * y", "x -1 * y *"),
+            ("-(1 + 2)", "1 2 + -1 *"),
+            ("+5 - +x", "5 x -"),
+        ],
+    )
+    def test_prefix_signs(self, formula, upn):
+        """Test that a prefix minus folds into literals and binds tightly."""
+        assert to_upn(formula) == upn
+
+    def test_negative_zero(self):
+        """Test that negating a variable keeps the sign of zero."""
+        result = compile_infix("-x", ["x"]).run({"x": 0.0})
+        assert math.copysign(1.0, result) == -1.0
+
+    def test_token_offsets(self):
+        """Test that tokens keep their position in the formula."""
+        tokens = infix_tokens("(a +  b) * c")
+        assert [(t.text, t.offset) for t in tokens] == [
+            ("a", 1),
+            ("b", 6),
+            ("+", 3),
+            ("c", 11),
+            ("*", 9),
+        ]
+
+    @pytest.mark.parametrize(
+        "formula, message",
+        [
+            ("(1 + 2", "missing ')'"),
+            ("1 + 2)", "unexpected ')' at offset 5"),
+            ("1 2", "unexpected '2' at offset 2"),
+            ("1 +", "unexpected end of input"),
+            ("", "unexpected end of input"),
+            ("* 2", "unexpected '*' at offset 0"),
+            ("2 (3)", "unexpected '(' at offset 2"),
+            ("1, 2", "unexpected ',' at offset 1"),
+        ],
+    )
+    def test_malformed(self, formula, message):
+        """Test that malformed formulas name the failing token."""
+        with pytest.raises(InvalidExpressionError, match=re.escape(message)):
+            to_upn(formula)
+
+    def test_unknown_character(self):
+        """Test that characters outside the grammar are unknown tokens."""
+        with pytest.raises(InvalidTokenError, match=r"'\$'"):
+            to_upn("1 $ 2")
+
+    def test_custom_operators(self):
+        """Test a right-associative power operator and function calls."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("^", 2, operator.pow))
+        registry.register(Operator("max", 2, max))
+        registry.register(Operator("sqrt", 1, math.sqrt))
+        registry.register(Operator("pi", 0, lambda: math.pi))
+        precedence = {**PRECEDENCE, "^": (4, True)}
+        assert to_upn("2 ^ 3 ^ 2", registry, precedence) == "2 3 2 ^ ^"
+        assert to_upn("-2 ^ 2", registry, precedence) == "2 2 ^ -1 *"
+        assert to_upn("max(a, b + 1) * sqrt(4)", registry) == "a b 1 + max 4 sqrt *"
+        assert compile_infix("2 * pi()", (), registry).run() == 2 * math.pi
+        with pytest.raises(InvalidExpressionError, match="takes 2 arguments"):
+            to_upn("max(1)", registry)
+        with pytest.raises(InvalidExpressionError, match="expected '\\('"):
+            to_upn("sqrt 4", registry)
+
+
+class TestCompileInfix:
+    """Tests for compiling infix formulas into programs."""
+
+    def test_same_program_as_upn(self):
+        """Test that the program equals the one compiled from the UPN."""
+        program = compile_infix("(a + b) * c / 2", ["a", "b", "c"])
+        assert program == compile_expression("a b + c * 2 /", ["a", "b", "c"])
+
+    def test_unbound_name(self):
+        """Test that names must be declared as variables."""
+        with pytest.raises(InvalidTokenError, match="'y'"):
+            compile_infix("x + y", ["x"])
+
+    def test_matches_python(self):
+        """Test random formulas against Python's own evaluation."""
+        rng = random.Random(0)
+        values = {"x": 1.5, "y": -2.0, "z": 0.0}
+        for _ in range(500):
+            formula, python = _random_formula(rng)
+            try:
+                expected = eval(python, {}, dict(values))
+            except ArithmeticError:
+                expected = ZeroDivisionError
+            program = compile_infix(formula, values)
+            try:
+                result = program.run(values)
+            except ZeroDivisionError:
+                result = ZeroDivisionError
+            assert result == expected, formula
+
+
+class TestInfixConverter:
+    """Tests for cached evaluation of infix formulas."""
+
+    def test_evaluate(self):
+        """Test evaluation with and without variables."""
+        converter = InfixConverter()
+        assert converter.evaluate("2 * (3 + 4)") == 14.0
+        assert converter.evaluate("x / y", {"x": 1.0, "y": 4.0}) == 0.25
+        with pytest.raises(ZeroDivisionError):
+            converter.evaluate("1 / (2 - 2)")
+
+    def test_cached(self):
+        """Test that each formula is converted once per set of names."""
+        cache = ExpressionCache()
+        converter = InfixConverter(cache=cache)
+        results = converter.evaluate_many(["1 + 2", "1 + 2", "x * 2"], {"x": 3.0})
+        assert results == [3.0, 3.0, 6.0]
+        assert cache.stats().hits == 1
+        assert len(cache) == 2
+
+    def test_numeric_backend(self):
+        """Test that programs are specialized for the engine's backend."""
+        converter = InfixConverter(UPNEngine(numeric=FractionBackend()))
+        assert converter.evaluate("-1 / 3 + x", {"x": 1}) == Fraction(2, 3)
+        assert converter.evaluate("-(1 / 3)") == Fraction(-1, 3)
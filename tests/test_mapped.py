@@ -0,0 +1,153 @@
+"""Unit tests for evaluating memory-mapped column files."""
+
+import math
+from array import array
+
+import pytest
+
+from upn_calculator import (
+    InvalidTokenError,
+    UnboundVariableError,
+    ZeroDivisionError,
+    compile_expression,
+    evaluate_batch,
+    evaluate_mapped,
+    write_column,
+)
+from upn_calculator.mapped import _ROW_ALIGNMENT
+
+
+def read_column(path):
+    """Read a column file into an array('d')."""
+    return array("d", path.read_bytes())
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Write x and y columns spanning several chunks."""
+    rows = 3 * _ROW_ALIGNMENT + 5
+    write_column(tmp_path / "x", (float(i) for i in range(rows)))
+    write_column(tmp_path / "y", (float(i % 7) for i in range(rows)))
+    return {"x": tmp_path / "x", "y": tmp_path / "y"}
+
+
+class TestWriteColumn:
+    """Tests for writing column files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that values are written in chunks as native float64."""
+        path = tmp_path / "c"
+        assert write_column(path, iter([1.5, -2.0, 3.0]), chunk_rows=2) == 3
+        assert read_column(path) == array("d", [1.5, -2.0, 3.0])
+
+
+class TestEvaluateMapped:
+    """Tests for evaluate_mapped() in pure Python."""
+
+    use_numpy = False
+
+    def evaluate(self, expression, inputs, output, **kwargs):
+        """Call evaluate_mapped() with the class's NumPy setting."""
+        return evaluate_mapped(
+            expression, inputs, output, use_numpy=self.use_numpy, **kwargs
+        )
+
+    def test_matches_batch(self, files, tmp_path):
+        """Test chunked evaluation against evaluate_batch() in memory."""
+        output = tmp_path / "out"
+        rows = self.evaluate("x y 2 * + x -", files, output, chunk_rows=1)
+        columns = {name: read_column(path) for name, path in files.items()}
+        expected = evaluate_batch("x y 2 * + x -", columns).values
+        assert rows == len(expected)
+        assert read_column(output) == array("d", expected)
+
+    def test_compiled_program(self, files, tmp_path):
+        """Test a program compiled with the input names."""
+        program = compile_expression("x 1 +", ["x"])
+        self.evaluate(program, files, tmp_path / "out")
+        assert read_column(tmp_path / "out")[:3] == array("d", [1.0, 2.0, 3.0])
+
+    def test_constant_and_copy(self, files, tmp_path):
+        """Test expressions that read no column or only copy one."""
+        output = tmp_path / "out"
+        self.evaluate("2 3 *", files, output)
+        assert set(read_column(output)) == {6.0}
+        self.evaluate("y", files, output)
+        assert read_column(output) == read_column(files["y"])
+
+    def test_zero_division_row(self, files, tmp_path):
+        """Test that the error names the row in the whole file."""
+        row = 2 * _ROW_ALIGNMENT + 3
+        divisors = [1.0] * len(read_column(files["x"]))
+        divisors[row] = 0.0
+        write_column(tmp_path / "d", divisors)
+        with pytest.raises(ZeroDivisionError, match=f"row {row}$"):
+            self.evaluate(
+                "x d /",
+                {"x": files["x"], "d": tmp_path / "d"},
+                tmp_path / "out",
+                chunk_rows=_ROW_ALIGNMENT,
+            )
+
+    def test_zero_division_nan(self, files, tmp_path):
+        """Test that the nan policy writes NaN for the failing rows."""
+        output = tmp_path / "out"
+        self.evaluate("x y /", files, output, on_zero_division="nan")
+        values = read_column(output)
+        assert math.isnan(values[0]) and math.isnan(values[7])
+        assert values[8] == 8.0
+
+    def test_empty_files(self, tmp_path):
+        """Test that empty columns give an empty result file."""
+        write_column(tmp_path / "x", [])
+        assert self.evaluate("x 1 +", {"x": tmp_path / "x"}, tmp_path / "out") == 0
+        assert (tmp_path / "out").read_bytes() == b""
+
+
+class TestEvaluateMappedNumPy(TestEvaluateMapped):
+    """The same tests with NumPy kernels on the mapped windows."""
+
+    use_numpy = True
+
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        """Skip the tests without NumPy."""
+        return pytest.importorskip("numpy")
+
+
+class TestEvaluateMappedErrors:
+    """Tests for invalid inputs."""
+
+    def test_unequal_lengths(self, tmp_path):
+        """Test that all inputs must have the same number of rows."""
+        write_column(tmp_path / "x", [1.0, 2.0])
+        write_column(tmp_path / "y", [1.0])
+        inputs = {"x": tmp_path / "x", "y": tmp_path / "y"}
+        with pytest.raises(ValueError, match="same length"):
+            evaluate_mapped("x 1 +", inputs, tmp_path / "out")
+
+    def test_not_float64(self, tmp_path):
+        """Test that a file size must be a multiple of 8 bytes."""
+        (tmp_path / "x").write_bytes(b"\0" * 12)
+        with pytest.raises(ValueError, match="not a float64 file"):
+            evaluate_mapped("x", {"x": tmp_path / "x"}, tmp_path / "out")
+
+    def test_names(self, tmp_path):
+        """Test unknown names and programs reading a missing column."""
+        write_column(tmp_path / "x", [1.0])
+        with pytest.raises(InvalidTokenError):
+            evaluate_mapped("x z +", {"x": tmp_path / "x"}, tmp_path / "out")
+        program = compile_expression("z", ["z"])
+        with pytest.raises(UnboundVariableError):
+            evaluate_mapped(program, {"x": tmp_path / "x"}, tmp_path / "out")
+
+    def test_options(self, tmp_path):
+        """Test that the policy and chunk size are checked."""
+        write_column(tmp_path / "x", [1.0])
+        inputs = {"x": tmp_path / "x"}
+        with pytest.raises(ValueError, match="policy"):
+            evaluate_mapped("x", inputs, tmp_path / "out", on_zero_division="mask")
+        with pytest.raises(ValueError, match="chunk_rows"):
+            evaluate_mapped("x", inputs, tmp_path / "out", chunk_rows=0)
+        with pytest.raises(ValueError, match="input column"):
+            evaluate_mapped("1", {}, tmp_path / "out")
@@ -0,0 +1,168 @@
+"""Unit tests for the numeric backends."""
+
+import decimal
+import io
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from upn_calculator import (
+    FLOAT,
+    OPERATORS,
+    BytecodeError,
+    DecimalBackend,
+    FractionBackend,
+    InvalidTokenError,
+    NumericBackend,
+    Operator,
+    UPNCalculator,
+    UPNEngine,
+    ZeroDivisionError,
+    compile_expression,
+)
+from upn_calculator.bytecode import dumps
+
+
+class TestDecimalBackend:
+    """Tests for decimal arithmetic."""
+
+    def test_exact_literals(self):
+        """Test that decimal literals are not rounded through binary floats."""
+        calc = UPNCalculator(numeric=DecimalBackend())
+        assert calc.evaluate("0.1 0.2 +") == Decimal("0.3")
+        assert calc.evaluate("1.10 3 *") == Decimal("3.30")
+
+    def test_context_precision(self):
+        """Test that operations round with the backend's context."""
+        backend = DecimalBackend(decimal.Context(prec=5))
+        assert UPNCalculator(numeric=backend).evaluate("1 3 /") == Decimal("0.33333")
+
+    def test_context_rounding(self):
+        """Test that the context's rounding mode applies."""
+        context = decimal.Context(prec=2, rounding=decimal.ROUND_HALF_UP)
+        calc = UPNCalculator(numeric=DecimalBackend(context))
+        assert calc.evaluate("2.5 5 *") == Decimal("13")
+
+    def test_thread_context_ignored(self):
+        """Test that the calling thread's context does not leak in."""
+        calc = UPNCalculator(numeric=DecimalBackend(decimal.Context(prec=28)))
+        with decimal.localcontext(prec=3):
+            result = calc.evaluate("1 3 /")
+        assert result == Decimal("0." + "3" * 28)
+
+    def test_division_by_zero(self):
+        """Test that division by zero raises the calculator's error."""
+        calc = UPNCalculator(numeric=DecimalBackend())
+        with pytest.raises(ZeroDivisionError, match="Division by zero"):
+            calc.evaluate("1 0 /")
+        with pytest.raises(ZeroDivisionError):
+            calc.evaluate("0 0 /")
+
+    def test_trapped_signal(self):
+        """Test that conditions trapped by the context raise its signal."""
+        calc = UPNCalculator(numeric=DecimalBackend(decimal.Context()))
+        with pytest.raises(decimal.InvalidOperation):
+            calc.evaluate("inf inf -")
+
+    def test_variables(self):
+        """Test that bound values are converted to Decimal."""
+        calc = UPNCalculator(numeric=DecimalBackend())
+        assert calc.evaluate("x y +", {"x": 0.1, "y": 2}) == Decimal("2.1")
+        assert calc.evaluate("x 2 *", {"x": Decimal("1.25")}) == Decimal("2.50")
+
+
+class TestFractionBackend:
+    """Tests for rational arithmetic."""
+
+    @pytest.mark.parametrize(
+        "expression, expected",
+        [
+            ("1 3 / 1 6 / +", Fraction(1, 2)),
+            ("0.1 0.2 + 0.3 -", Fraction(0)),
+            ("1e-3 1_000 *", Fraction(1)),
+            ("2 3 / 3 *", Fraction(2)),
+        ],
+    )
+    def test_evaluate(self, expression, expected):
+        """Test exact results."""
+        result = UPNCalculator(numeric=FractionBackend()).evaluate(expression)
+        assert result == expected
+        assert isinstance(result, Fraction)
+
+    def test_division_by_zero(self):
+        """Test that division by zero raises the calculator's error."""
+        with pytest.raises(ZeroDivisionError):
+            UPNCalculator(numeric=FractionBackend()).evaluate("1 0 /")
+
+    @pytest.mark.parametrize("token", ["inf", "nan", "-Infinity"])
+    def test_non_finite_literal(self, token):
+        """Test that literals without a rational value are rejected."""
+        with pytest.raises(InvalidTokenError, match="rational"):
+            UPNCalculator(numeric=FractionBackend()).evaluate(f"{token} 1 +")
+
+    def test_variables(self):
+        """Test that floats are converted through their shortest repr."""
+        calc = UPNCalculator(numeric=FractionBackend())
+        assert calc.evaluate("x 3 *", {"x": 0.1}) == Fraction(3, 10)
+        with pytest.raises(ValueError):
+            calc.evaluate("x 1 +", {"x": math.inf})
+
+
+class TestBackendIntegration:
+    """Tests for backends across the calculator's entry points."""
+
+    def test_float_default(self):
+        """Test that the float backend leaves programs unchanged."""
+        program = compile_expression("0.1 0.2 +")
+        assert FLOAT.specialize(program) is program
+        assert UPNCalculator(numeric=FLOAT).evaluate("0.1 0.2 +") == 0.1 + 0.2
+
+    def test_private_cache(self):
+        """Test that backends do not share cached programs with floats."""
+        UPNCalculator().evaluate("0.5 0.25 +")
+        calc = UPNCalculator(numeric=FractionBackend())
+        assert calc.cache is not UPNCalculator().cache
+        assert calc.evaluate("0.5 0.25 +") == Fraction(3, 4)
+
+    def test_compile(self):
+        """Test that compiled programs are specialized for the backend."""
+        program = UPNCalculator(numeric=DecimalBackend()).compile("x 0.5 *", ["x"])
+        assert program.run({"x": Decimal("3")}) == Decimal("1.5")
+
+    def test_engine(self):
+        """Test an engine with a numeric backend."""
+        engine = UPNEngine(numeric=FractionBackend())
+        assert engine.evaluate("1 4 / 1 4 / +") == Fraction(1, 2)
+
+    def test_stream(self):
+        """Test streamed evaluation with a backend."""
+        calc = UPNCalculator(numeric=DecimalBackend())
+        assert calc.evaluate_stream(io.StringIO("0.1 0.2 + 3 *")) == Decimal("0.9")
+
+    def test_custom_operators(self):
+        """Test that custom operators receive the backend's numbers."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("half", 1, lambda x: x / 2))
+        registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+        calc = UPNCalculator(operators=registry, numeric=FractionBackend())
+        assert calc.evaluate("1 half dup *") == Fraction(1, 4)
+
+    def test_incomplete_backend(self):
+        """Test that a backend without number() and convert() is rejected."""
+
+        class HalfBackend(NumericBackend):
+            """Backend that only converts literals."""
+
+            def number(self, text):
+                return float(text)
+
+        with pytest.raises(TypeError, match="convert"):
+            HalfBackend()
+
+    def test_bytecode_rejects_backend_programs(self):
+        """Test that catalogues refuse programs with non-float constants."""
+        program = DecimalBackend().specialize(compile_expression("0.1 2 *"))
+        with pytest.raises(BytecodeError, match="float"):
+            dumps([program])
@@ -0,0 +1,212 @@
+"""Unit tests for the operator registry and custom operators."""
+
+import math
+from array import array
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    ExpressionPlan,
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    Operator,
+    OperatorRegistry,
+    UPNCalculator,
+    ZeroDivisionError,
+    apply_operator,
+    compile_expression,
+    evaluate_batch,
+    is_operator,
+    optimize,
+)
+
+
+def _inverse(x):
+    """Return 1 / x with the calculator's division semantics."""
+    if x == 0:
+        raise ZeroDivisionError("Division by zero")
+    return 1 / x
+
+
+@pytest.fixture
+def registry():
+    """A copy of the default registry with the custom example operators."""
+    registry = OPERATORS.copy()
+    registry.register(Operator("sqrt", 1, math.sqrt, kernel=math.sqrt))
+    registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+    registry.register(Operator("swap", 2, lambda a, b: (b, a), outputs=2))
+    registry.register(Operator("sum", None, lambda *xs: math.fsum(xs)))
+    registry.register(Operator("inv", 1, _inverse))
+    return registry
+
+
+class TestRegistry:
+    """Tests for OperatorRegistry and the default operators."""
+
+    def test_default_operators(self):
+        """Test that the default registry holds the four basic operators."""
+        assert sorted(OPERATORS) == ["*", "+", "-", "/"]
+        assert all(OPERATORS[symbol].arity == 2 for symbol in OPERATORS)
+
+    def test_is_operator_uses_registry(self):
+        """Test that is_operator() and the registry agree."""
+        assert all(is_operator(symbol) for symbol in OPERATORS)
+        assert not is_operator("sqrt")
+
+    def test_copy_is_independent(self, registry):
+        """Test that registering in a copy leaves the default untouched."""
+        assert "sqrt" in registry
+        assert "sqrt" not in OPERATORS
+
+    def test_unregister(self, registry):
+        """Test removing an operator."""
+        registry.unregister("sqrt")
+        assert "sqrt" not in registry
+        with pytest.raises(KeyError):
+            registry.unregister("sqrt")
+
+    @pytest.mark.parametrize("symbol", ["", "a b", "5", "-1e3", "nan"])
+    def test_invalid_symbol(self, symbol):
+        """Test that empty, spaced and numeric symbols are rejected."""
+        with pytest.raises(ValueError):
+            OperatorRegistry([Operator(symbol, 1, abs)])
+
+    def test_invalid_shape(self):
+        """Test that negative arity or outputs are rejected."""
+        with pytest.raises(ValueError):
+            Operator("neg", -1, abs)
+        with pytest.raises(ValueError):
+            Operator("neg", 1, abs, outputs=-1)
+
+    def test_apply_operator(self):
+        """Test that apply_operator() dispatches through the registry."""
+        assert apply_operator(7.0, 2.0, "-") == 5.0
+        with pytest.raises(ValueError, match="Unknown operator"):
+            apply_operator(1.0, 2.0, "%")
+
+
+class TestCustomOperators:
+    """Tests for evaluating expressions with custom operators."""
+
+    @pytest.mark.parametrize(
+        "expression, expected",
+        [
+            ("16 sqrt", 4.0),
+            ("3 dup *", 9.0),
+            ("1 5 swap -", 4.0),
+            ("1 2 3 4 sum", 10.0),
+            ("2 3 * 4 sum", 10.0),
+            ("9 sqrt 1 2 sum", 6.0),
+            ("4 inv", 0.25),
+        ],
+    )
+    def test_evaluate(self, registry, expression, expected):
+        """Test unary, multi-output and variadic operators."""
+        calc = UPNCalculator(operators=registry)
+        assert calc.evaluate(expression) == expected
+
+    def test_default_calculator_unaffected(self, registry):
+        """Test that custom operators are unknown to other calculators."""
+        UPNCalculator(operators=registry).evaluate("16 sqrt")
+        with pytest.raises(InvalidTokenError):
+            UPNCalculator().evaluate("16 sqrt")
+
+    def test_private_cache(self, registry):
+        """Test that a calculator with its own registry has its own cache."""
+        assert UPNCalculator(operators=registry).cache is not UPNCalculator().cache
+
+    @pytest.mark.parametrize(
+        "expression, message",
+        [
+            ("sqrt", "'sqrt' requires 1 operand but stack has 0"),
+            ("1 swap", "'swap' requires 2 operands but stack has 1"),
+            ("sum", "'sum' requires at least 1 operand but stack has 0"),
+        ],
+    )
+    def test_arity_checked(self, registry, expression, message):
+        """Test that depth checks respect each operator's arity."""
+        with pytest.raises(InsufficientOperandsError, match=message):
+            compile_expression(expression, operators=registry)
+
+    def test_outputs_counted(self, registry):
+        """Test that extra outputs count towards the final stack size."""
+        with pytest.raises(InvalidExpressionError, match="has 2"):
+            compile_expression("1 dup", operators=registry)
+        assert compile_expression("1 dup dup sum", operators=registry).max_depth == 3
+
+    def test_zero_division(self, registry):
+        """Test that custom operators can raise the calculator's errors."""
+        with pytest.raises(ZeroDivisionError):
+            UPNCalculator(operators=registry).evaluate("0 inv")
+
+    def test_stream(self, registry):
+        """Test custom operators in streamed evaluation."""
+        calc = UPNCalculator(operators=registry)
+        assert calc.evaluate_stream(["1 2 3 s", "um dup *"]) == 36.0
+
+    def test_variable_names(self, registry):
+        """Test that operator symbols cannot be used as variable names."""
+        with pytest.raises(ValueError):
+            compile_expression("sqrt", ["sqrt"], registry)
+        assert compile_expression("sqrt", ["sqrt"]).run({"sqrt": 2.0}) == 2.0
+
+
+class TestCustomOperatorPasses:
+    """Tests for custom operators in the optimizer, planner and batches."""
+
+    def test_optimizer_folds(self, registry):
+        """Test constant folding through unary and multi-output operators."""
+        program = compile_expression("16 sqrt dup * x +", ["x"], registry)
+        optimized, removed = optimize(program)
+        assert [token for _, _, token in optimized.code] == ["16.0", "x", "+"]
+        assert removed == 3
+        assert optimized.run({"x": 1.0}) == 17.0
+
+    def test_optimizer_keeps_failing_fold(self, registry):
+        """Test that an operator failing at compile time is left in place."""
+        program = compile_expression("-1 sqrt x +", ["x"], registry)
+        optimized, removed = optimize(program)
+        assert removed == 0
+        with pytest.raises(ValueError):
+            optimized.run({"x": 1.0})
+
+    def test_optimizer_with_variables(self, registry):
+        """Test that multi-output results of variables are not removed."""
+        program = compile_expression("x dup * 1 * y swap -", ["x", "y"], registry)
+        optimized, removed = optimize(program)
+        assert removed == 1
+        values = {"x": 3.0, "y": 2.0}
+        assert optimized.run(values) == program.run(values) == -7.0
+
+    def test_planner(self, registry):
+        """Test shared evaluation with custom operators."""
+        plan = ExpressionPlan(
+            ["x dup * sqrt", "x dup * 1 +", "1 2 3 sum x swap -"], ["x"], registry
+        )
+        assert plan.run({"x": -3.0}) == [3.0, 10.0, -9.0]
+        assert isinstance(plan.run({"x": 0.0})[0], float)
+
+    def test_batch_python(self, registry):
+        """Test column evaluation with custom operators."""
+        result = evaluate_batch(
+            "x dup * sqrt x inv swap sum",
+            {"x": array("d", [1.0, 2.0, 0.0])},
+            on_zero_division="mask",
+            operators=registry,
+        )
+        assert list(result.values[:2]) == [2.0, 2.5]
+        assert math.isnan(result.values[2])
+        assert list(result.mask) == [0, 0, 1]
+
+    def test_batch_numpy(self, registry):
+        """Test kernels and the row-wise fallback on NumPy columns."""
+        numpy = pytest.importorskip("numpy")
+        registry.register(Operator("sqrt", 1, math.sqrt, kernel=numpy.sqrt))
+        result = evaluate_batch(
+            "x sqrt x dup * +",
+            {"x": numpy.array([4.0, 9.0])},
+            operators=registry,
+        )
+        assert list(result.values) == [18.0, 84.0]
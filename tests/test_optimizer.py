@@ -0,0 +1,134 @@
+"""Unit tests for the constant folding and peephole optimizer."""
+
+import math
+import random
+import struct
+
+import pytest
+
+from upn_calculator import ZeroDivisionError, compile_expression, optimize
+
+
+def _tokens(program):
+    """Return the source tokens of a program's instructions."""
+    return [token for _, _, token in program.code]
+
+
+def _bits(value):
+    """Return the IEEE 754 bit pattern of a float."""
+    return struct.pack("<d", value)
+
+
+class TestConstantFolding:
+    """Tests for folding constant operations."""
+
+    def test_fold_whole_expression(self):
+        """Test that a constant expression folds to a single push."""
+        program, removed = optimize(compile_expression("2 3 + 4 *"))
+        assert _tokens(program) == ["20.0"]
+        assert removed == 2
+        assert program.run() == 20.0
+        assert program.max_depth == 1
+
+    def test_fold_subexpression(self):
+        """Test that a constant subexpression next to a variable folds."""
+        program, removed = optimize(compile_expression("2 3 + x *", ["x"]))
+        assert _tokens(program) == ["5.0", "x", "*"]
+        assert removed == 1
+        assert program.run({"x": 4.0}) == 20.0
+
+    def test_fold_right_operand(self):
+        """Test folding a constant subexpression used as the right operand."""
+        program, removed = optimize(compile_expression("x 10 2 / -", ["x"]))
+        assert _tokens(program) == ["x", "5.0", "-"]
+        assert removed == 1
+
+    def test_nothing_to_do(self):
+        """Test that a program without constants is returned unchanged."""
+        original = compile_expression("x y +", ["x", "y"])
+        program, removed = optimize(original)
+        assert program is original
+        assert removed == 0
+
+    def test_constant_division_by_zero(self):
+        """Test that folding a division by zero raises at compile time."""
+        with pytest.raises(ZeroDivisionError, match="Division by zero"):
+            optimize(compile_expression("5 3 3 - /"))
+
+    def test_variable_division_by_constant_zero(self):
+        """Test that dividing anything by a constant zero raises."""
+        with pytest.raises(ZeroDivisionError):
+            optimize(compile_expression("x 0 /", ["x"]))
+        with pytest.raises(ZeroDivisionError):
+            optimize(compile_expression("x -0 /", ["x"]))
+
+    def test_keeps_source_and_variables(self):
+        """Test that source and variables of the program are kept."""
+        program, _ = optimize(compile_expression("1 2 + x *", ["x"]))
+        assert program.source == "1 2 + x *"
+        assert program.variables == ("x",)
+
+
+class TestIdentities:
+    """Tests for removing exact identities."""
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["x 1 *", "1 x *", "x 1 /", "x 0 -", "x -0 +", "-0 x +", "x 2 1 - *"],
+    )
+    def test_identity_removed(self, expression):
+        """Test that exact identities reduce to the operand."""
+        program, removed = optimize(compile_expression(expression, ["x"]))
+        assert _tokens(program) == ["x"]
+        assert removed >= 1
+
+    @pytest.mark.parametrize("expression", ["x 0 +", "0 x +", "0 x -", "1 x /"])
+    def test_inexact_identity_kept(self, expression):
+        """Test that rewrites that change -0.0 or other results are not made."""
+        program, removed = optimize(compile_expression(expression, ["x"]))
+        assert removed == 0
+        assert len(program.code) == 3
+
+    def test_identity_inside_expression(self):
+        """Test removing an identity in the middle of a program."""
+        program, removed = optimize(compile_expression("x 1 * y +", ["x", "y"]))
+        assert _tokens(program) == ["x", "y", "+"]
+        assert removed == 1
+        assert program.max_depth == 2
+
+
+class TestBitIdentical:
+    """Tests that optimized programs give bit-identical results."""
+
+    SPECIAL = [0.0, -0.0, 1.0, -1.0, 0.1, 1e308, -1e-308, math.inf, -math.inf]
+
+    def _random_expression(self, rng, operands):
+        """Build a random valid expression mixing constants and variables."""
+        literals = ["0", "-0", "1", "2", "0.5", "3", "1e308", "x", "y"]
+        tokens = [rng.choice(literals)]
+        depth = 1
+        for _ in range(operands - 1):
+            tokens.append(rng.choice(literals))
+            depth += 1
+            while depth > 1 and rng.random() < 0.5:
+                tokens.append(rng.choice("+-*"))
+                depth -= 1
+        tokens.extend(rng.choice("+-*") for _ in range(depth - 1))
+        return " ".join(tokens)
+
+    def test_random_programs(self):
+        """Test random programs on special values, including -0.0 and inf."""
+        rng = random.Random(42)
+        for _ in range(300):
+            expression = self._random_expression(rng, rng.randint(1, 12))
+            original = compile_expression(expression, ["x", "y"])
+            program, _ = optimize(original)
+            for x in self.SPECIAL:
+                for y in self.SPECIAL:
+                    values = {"x": x, "y": y}
+                    expected = original.run(values)
+                    result = program.run(values)
+                    if math.isnan(expected):
+                        assert math.isnan(result), expression
+                    else:
+                        assert _bits(result) == _bits(expected), expression
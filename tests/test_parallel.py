@@ -0,0 +1,58 @@
+"""Unit tests for multi-process batch evaluation."""
+
+import pytest
+
+from upn_calculator import (
+    InvalidTokenError,
+    ParallelEvaluator,
+    ZeroDivisionError,
+    evaluate_many,
+)
+from upn_calculator.parallel import evaluate_chunk
+
+
+class TestEvaluateChunk:
+    """Tests for in-process chunk evaluation."""
+
+    def test_errors_are_returned(self):
+        """Test that errors are returned in place of results."""
+        results = evaluate_chunk(["2 3 +", "2 xyz +", "4"])
+        assert results[0] == 5.0
+        assert isinstance(results[1], InvalidTokenError)
+        assert results[2] == 4.0
+
+
+class TestEvaluateMany:
+    """Tests for evaluate_many() and ParallelEvaluator."""
+
+    def test_single_worker(self):
+        """Test evaluation without worker processes."""
+        assert evaluate_many(["2 3 +", "10 3 -"], workers=1) == [5.0, 7.0]
+
+    def test_order_preserved_across_workers(self):
+        """Test that results come back in input order."""
+        expressions = [f"{i} 2 *" for i in range(200)]
+        results = evaluate_many(expressions, workers=2, chunk_size=13)
+        assert results == [i * 2.0 for i in range(200)]
+
+    def test_errors_do_not_abort(self):
+        """Test that one bad row does not abort the job."""
+        expressions = ["1 1 +", "1 0 /", "2 2 +"]
+        results = evaluate_many(expressions, workers=2, chunk_size=1)
+        assert results[0] == 2.0
+        assert isinstance(results[1], ZeroDivisionError)
+        assert str(results[1]) == "Division by zero"
+        assert results[2] == 4.0
+
+    def test_pool_reuse(self):
+        """Test evaluating several batches with one pool."""
+        with ParallelEvaluator(workers=2, chunk_size=4) as pool:
+            assert pool.evaluate(["1 1 +"]) == [2.0]
+            assert pool.evaluate(iter(["3 3 *", "8 2 /"])) == [9.0, 4.0]
+
+    def test_invalid_arguments(self):
+        """Test validation of workers and chunk size."""
+        with pytest.raises(ValueError):
+            ParallelEvaluator(workers=0)
+        with pytest.raises(ValueError):
+            ParallelEvaluator(workers=1, chunk_size=0)
@@ -0,0 +1,106 @@
+"""Unit tests for token classification and the single-pass scanner."""
+
+import operator
+
+import pytest
+
+from upn_calculator import is_number
+from upn_calculator.operators import divide
+from upn_calculator.parser import NUMBER, OPERATOR, WORD, Token, classify, scan
+
+TRICKY_TOKENS = [
+    "5",
+    "-5",
+    "+5",
+    "3.14",
+    ".5",
+    "5.",
+    "1e-10",
+    "1E+10",
+    "1.e5",
+    "1_000",
+    "1__000",
+    "_1",
+    "1_",
+    "inf",
+    "-Infinity",
+    "NaN",
+    "nan1",
+    "٣",
+    "²",
+    ".",
+    "-",
+    "+-1",
+    "--1",
+    "1e",
+    "e5",
+    ".e5",
+    "1e5e5",
+    "1e+-5",
+    "1E٣",
+    "2.5e-0_1",
+    "infinit",
+    "ınf",
+    "0x10",
+    "1.2.3",
+    "xyz",
+]
+
+
+class TestIsNumber:
+    """Tests for exception-free number recognition."""
+
+    @pytest.mark.parametrize("token", TRICKY_TOKENS)
+    def test_matches_float_syntax(self, token):
+        """Test that is_number() agrees with float() on tricky tokens."""
+        try:
+            float(token)
+            expected = True
+        except ValueError:
+            expected = False
+        assert is_number(token) is expected
+
+
+class TestClassify:
+    """Tests for classify()."""
+
+    def test_number(self):
+        """Test that numbers are converted once."""
+        assert classify("2.5", 3) == Token(NUMBER, "2.5", 3, 2.5)
+
+    def test_operator(self):
+        """Test that operators resolve to their registered Operator."""
+        assert classify("+").value.function is operator.add
+        assert classify("/").value.function is divide
+
+    def test_word(self):
+        """Test that anything else is a word."""
+        assert classify("xyz") == Token(WORD, "xyz", 0, None)
+
+
+class TestScan:
+    """Tests for scan()."""
+
+    def test_kinds_and_values(self):
+        """Test the token stream of a simple expression."""
+        tokens = list(scan("2 3.5 + x"))
+        assert [t.kind for t in tokens] == [NUMBER, NUMBER, OPERATOR, WORD]
+        assert [t.value for t in tokens[:2]] == [2.0, 3.5]
+
+    def test_offsets(self):
+        """Test that offsets point at the token in the source."""
+        expression = "  10\t3   -\n 4 *"
+        for token in scan(expression):
+            start = token.offset
+            assert expression[start : start + len(token.text)] == token.text
+        assert [t.offset for t in scan(expression)] == [2, 5, 9, 12, 14]
+
+    def test_repeated_tokens(self):
+        """Test that repeated literals keep their values and offsets."""
+        tokens = list(scan("1 1 + 1 +"))
+        assert [t.offset for t in tokens] == [0, 2, 4, 6, 8]
+        assert [t.value for t in tokens if t.kind == NUMBER] == [1.0, 1.0, 1.0]
+
+    def test_empty(self):
+        """Test that an empty expression yields no tokens."""
+        assert list(scan("   ")) == []
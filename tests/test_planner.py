@@ -0,0 +1,98 @@
+"""Unit tests for shared evaluation of many expressions."""
+
+import pytest
+
+from upn_calculator import (
+    ExpressionPlan,
+    InvalidTokenError,
+    UnboundVariableError,
+    UPNCalculator,
+    ZeroDivisionError,
+    evaluate_shared,
+)
+
+
+class TestExpressionPlan:
+    """Tests for building and running plans."""
+
+    def test_matches_evaluate(self):
+        """Test that results equal independent evaluate() calls."""
+        expressions = ["2 3 + 4 *", "2 3 + 5 -", "1 3 /", "7", "2 3 + 4 * 1 3 / +"]
+        calc = UPNCalculator()
+        assert evaluate_shared(expressions) == [calc.evaluate(e) for e in expressions]
+
+    def test_shared_nodes(self):
+        """Test that a common core is stored only once."""
+        plan = ExpressionPlan(
+            ["a b + c * 1 +", "a b + c * 2 *", "a b + c * a -"], ["a", "b", "c"]
+        )
+        # a, b, +, c, * shared; then 1, +, 2, *, - (a is reused)
+        assert plan.nodes == 10
+        assert plan.instructions == 21
+        assert plan.dedup_ratio == pytest.approx(2.1)
+        assert plan.run({"a": 1.0, "b": 2.0, "c": 3.0}) == [10.0, 18.0, 8.0]
+
+    def test_operand_order_matters(self):
+        """Test that swapped operands are distinct subexpressions."""
+        plan = ExpressionPlan(["a b -", "b a -"], ["a", "b"])
+        assert plan.nodes == 4
+        assert plan.run({"a": 5.0, "b": 2.0}) == [3.0, -3.0]
+
+    def test_negative_zero_is_distinct(self):
+        """Test that 0 and -0 constants are not merged."""
+        results = evaluate_shared(["1 0 *", "1 -0 *"])
+        assert [str(r) for r in results] == ["0.0", "-0.0"]
+
+    def test_rerun_with_new_values(self):
+        """Test that a plan can be run repeatedly with different bindings."""
+        plan = ExpressionPlan(["x 2 *", "x 2 * 1 +"], ["x"])
+        assert plan.run({"x": 1.0}) == [2.0, 3.0]
+        assert plan.run({"x": 10.0}) == [20.0, 21.0]
+
+    def test_empty(self):
+        """Test a plan without expressions."""
+        plan = ExpressionPlan([])
+        assert plan.run() == []
+        assert plan.dedup_ratio == 1.0
+
+
+class TestPlanErrors:
+    """Tests for per-expression errors."""
+
+    def test_compile_error_returned(self):
+        """Test that an invalid expression keeps its error as result."""
+        results = evaluate_shared(["2 3 +", "2 xyz +"])
+        assert results[0] == 5.0
+        assert isinstance(results[1], InvalidTokenError)
+
+    def test_constant_division_by_zero(self):
+        """Test that only expressions using a failing node get the error."""
+        results = evaluate_shared(["1 0 / 2 +", "1 2 +"])
+        assert isinstance(results[0], ZeroDivisionError)
+        assert results[1] == 3.0
+
+    def test_runtime_division_by_zero(self):
+        """Test division by zero that depends on variable values."""
+        plan = ExpressionPlan(["1 x /", "x 1 +"], ["x"])
+        results = plan.run({"x": 0.0})
+        assert isinstance(results[0], ZeroDivisionError)
+        assert results[1] == 1.0
+        assert plan.run({"x": 2.0}) == [0.5, 3.0]
+
+    def test_unbound_variable(self):
+        """Test that only expressions reading the variable fail."""
+        plan = ExpressionPlan(["x 1 +", "y 1 +"], ["x", "y"])
+        results = plan.run({"y": 1.0})
+        assert isinstance(results[0], UnboundVariableError)
+        assert results[1] == 2.0
+
+    def test_first_error_wins(self):
+        """Test that the left operand's error is reported, as in evaluate()."""
+        plan = ExpressionPlan(["x 1 0 / +", "1 0 / x +"], ["x"])
+        first, second = plan.run({})
+        assert isinstance(first, UnboundVariableError)
+        assert isinstance(second, ZeroDivisionError)
+
+    def test_variables_from_values(self):
+        """Test that evaluate_shared() declares the bound names."""
+        assert evaluate_shared(["x y *"], {"x": 2.0, "y": 4.0}) == [8.0]
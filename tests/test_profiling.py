@@ -0,0 +1,159 @@
+"""Unit tests for opt-in profiling."""
+
+import threading
+
+import pytest
+
+from upn_calculator import (
+    DecimalBackend,
+    InvalidTokenError,
+    Profiler,
+    ProfilingEngine,
+    Status,
+    UPNCalculator,
+    UPNEngine,
+    ZeroDivisionError,
+)
+from upn_calculator.profiling import PHASES
+
+
+@pytest.fixture
+def profiler():
+    """A fresh profiler."""
+    return Profiler()
+
+
+class TestProfiler:
+    """Tests for the counters collected while evaluating."""
+
+    def test_disabled_by_default(self):
+        """Test that calculators use the plain engine unless profiling."""
+        assert type(UPNCalculator().engine) is UPNEngine
+
+    def test_profiling_engine(self, profiler):
+        """Test that a profiler selects a profiling engine with its own cache."""
+        calc = UPNCalculator(profiler=profiler)
+        assert isinstance(calc.engine, ProfilingEngine)
+        assert calc.cache is not UPNCalculator().cache
+
+    def test_phases(self, profiler):
+        """Test that compile phases run on misses and execute on every call."""
+        calc = UPNCalculator(profiler=profiler)
+        for _ in range(3):
+            assert calc.evaluate("2 3 + 4 *") == 20.0
+        phases = profiler.as_dict()["phases"]
+        assert list(phases) == list(PHASES)
+        assert [phases[phase]["count"] for phase in PHASES] == [1, 1, 1, 3]
+        assert all(phases[phase]["seconds"] >= 0 for phase in PHASES)
+
+    def test_operators(self, profiler):
+        """Test per-operator call counts."""
+        calc = UPNCalculator(profiler=profiler)
+        calc.evaluate("1 2 + 3 + 4 *")
+        calc.evaluate("x 2 *", {"x": 5.0})
+        operators = profiler.as_dict()["operators"]
+        assert {symbol: entry["count"] for symbol, entry in operators.items()} == {
+            "+": 2,
+            "*": 2,
+        }
+
+    def test_max_stack_depth(self, profiler):
+        """Test that the deepest program is reported."""
+        calc = UPNCalculator(profiler=profiler)
+        calc.evaluate("1 2 3 4 + + +")
+        calc.evaluate("1 2 +")
+        assert profiler.as_dict()["max_stack_depth"] == 4
+
+    def test_errors(self, profiler):
+        """Test that errors are counted by class and still raised."""
+        calc = UPNCalculator(profiler=profiler)
+        with pytest.raises(ZeroDivisionError):
+            calc.evaluate("1 0 /")
+        with pytest.raises(ZeroDivisionError):
+            calc.evaluate("1 0 /")
+        with pytest.raises(InvalidTokenError):
+            calc.evaluate("1 x +")
+        stats = profiler.as_dict()
+        assert stats["errors"] == {"ZeroDivisionError": 2, "InvalidTokenError": 1}
+        assert stats["evaluations"] == 2
+
+    def test_try_evaluate(self, profiler):
+        """Test that failed status-code evaluations are counted and timed."""
+        calc = UPNCalculator(profiler=profiler)
+        outcomes = calc.try_evaluate_many(["1 0 /", "1 x +", "2 +", "2 3 +"])
+        assert [outcome.ok for outcome in outcomes] == [False, False, False, True]
+        assert calc.try_evaluate("1 0 /").status == Status.ZERO_DIVISION
+        stats = profiler.as_dict()
+        assert stats["errors"] == {
+            "ZeroDivisionError": 2,
+            "InvalidTokenError": 1,
+            "InsufficientOperandsError": 1,
+        }
+        assert stats["evaluations"] == 3
+        assert stats["phases"]["execute"]["count"] == 3
+
+    def test_reset(self, profiler):
+        """Test that reset() zeroes every counter."""
+        calc = UPNCalculator(profiler=profiler)
+        calc.evaluate("2 3 +")
+        profiler.reset()
+        stats = profiler.as_dict()
+        assert stats["evaluations"] == 0
+        assert stats["operators"] == {}
+        assert all(entry["count"] == 0 for entry in stats["phases"].values())
+
+    def test_numeric_backend(self, profiler):
+        """Test profiling together with a numeric backend."""
+        calc = UPNCalculator(profiler=profiler, numeric=DecimalBackend())
+        assert str(calc.evaluate("0.1 x +", {"x": 0.2})) == "0.3"
+        assert profiler.as_dict()["operators"]["+"]["count"] == 1
+
+    def test_threads(self, profiler):
+        """Test that concurrent evaluations are all counted."""
+        calc = UPNCalculator(profiler=profiler)
+
+        def work():
+            for _ in range(500):
+                calc.evaluate("1 2 +")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = profiler.as_dict()
+        assert stats["evaluations"] == 2000
+        assert stats["operators"]["+"]["count"] == 2000
+
+
+class TestPrometheus:
+    """Tests for the Prometheus text export."""
+
+    def test_format(self, profiler):
+        """Test metric names, types and samples."""
+        calc = UPNCalculator(profiler=profiler)
+        calc.evaluate("2 3 +")
+        with pytest.raises(ZeroDivisionError):
+            calc.evaluate("1 0 /")
+        text = profiler.to_prometheus()
+        assert text.endswith("\n")
+        lines = text.splitlines()
+        assert "# TYPE upn_evaluations_total counter" in lines
+        assert "upn_evaluations_total 2" in lines
+        assert 'upn_operator_calls_total{operator="+"} 1' in lines
+        assert 'upn_phase_calls_total{phase="execute"} 2' in lines
+        assert "# TYPE upn_max_stack_depth gauge" in lines
+        assert 'upn_errors_total{type="ZeroDivisionError"} 1' in lines
+
+    def test_prefix(self, profiler):
+        """Test a custom metric prefix."""
+        text = profiler.to_prometheus(prefix="calc")
+        assert "calc_evaluations_total 0" in text.splitlines()
+        assert "upn_" not in text
+
+    def test_label_escaping(self, profiler):
+        """Test that quotes and backslashes in symbols are escaped."""
+        profiler.record_operator('a"\\b', 0.0)
+        assert 'upn_operator_calls_total{operator="a\\"\\\\b"} 1' in (
+            profiler.to_prometheus().splitlines()
+        )
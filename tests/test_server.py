@@ -0,0 +1,211 @@
+"""Tests for the asyncio evaluation service."""
+
+import asyncio
+
+import pytest
+
+from upn_calculator import ZeroDivisionError
+from upn_calculator.parallel import evaluate_chunk
+from upn_calculator.server import (
+    MicroBatcher,
+    _client_handler,
+    format_response,
+    start_server,
+)
+
+
+class RecordingEvaluator:
+    """Evaluate batches while recording their sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, expressions):
+        self.batches.append(len(expressions))
+        return evaluate_chunk(expressions)
+
+
+class ResettingWriter:
+    """Stream writer whose peer has reset the connection."""
+
+    def __init__(self):
+        self.closed = False
+
+    def write(self, data):
+        raise ConnectionResetError("Connection reset by peer")
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+class StalledWriter:
+    """Stream writer whose peer reads nothing until it is resumed."""
+
+    def __init__(self):
+        self.writes = 0
+        self.resumed = asyncio.Event()
+
+    def write(self, data):
+        self.writes += 1
+
+    async def drain(self):
+        await self.resumed.wait()
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+async def exchange(reader, writer, lines):
+    """Send request lines and read one response line per request."""
+    writer.write("".join(f"{line}\n" for line in lines).encode())
+    await writer.drain()
+    return [(await reader.readline()).decode() for _ in lines]
+
+
+class TestMicroBatcher:
+    """Tests for request coalescing."""
+
+    def test_requests_are_coalesced(self):
+        """Test that requests within the window form one batch."""
+        evaluate = RecordingEvaluator()
+
+        async def scenario():
+            batcher = MicroBatcher(window=0.05, evaluate=evaluate)
+            return await asyncio.gather(
+                *(batcher.submit(f"{i} 1 +") for i in range(10))
+            )
+
+        assert asyncio.run(scenario()) == [i + 1.0 for i in range(10)]
+        assert evaluate.batches == [10]
+
+    def test_max_batch(self):
+        """Test that full batches are sent without waiting."""
+        evaluate = RecordingEvaluator()
+
+        async def scenario():
+            batcher = MicroBatcher(window=10, max_batch=4, evaluate=evaluate)
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit("1") for _ in range(8))), timeout=5
+            )
+
+        assert asyncio.run(scenario()) == [1.0] * 8
+        assert evaluate.batches == [4, 4]
+
+    def test_errors_are_results(self):
+        """Test that evaluation errors are returned per request."""
+
+        async def scenario():
+            batcher = MicroBatcher(window=0)
+            return await asyncio.gather(batcher.submit("1 0 /"), batcher.submit("2"))
+
+        error, value = asyncio.run(scenario())
+        assert isinstance(error, ZeroDivisionError)
+        assert value == 2.0
+
+    def test_backpressure(self):
+        """Test that no more than max_pending requests are admitted."""
+
+        async def scenario():
+            batcher = MicroBatcher(window=10, max_batch=100, max_pending=2)
+            await batcher.enqueue("1")
+            await batcher.enqueue("2")
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(batcher.enqueue("3"), timeout=0.05)
+
+        asyncio.run(scenario())
+
+    def test_invalid_knobs(self):
+        """Test validation of the batching knobs."""
+        with pytest.raises(ValueError):
+            MicroBatcher(max_batch=0)
+        with pytest.raises(ValueError):
+            MicroBatcher(window=-1)
+
+
+class TestServer:
+    """End-to-end tests over sockets."""
+
+    def test_format_response(self):
+        """Test the response line format."""
+        assert format_response(5.0) == "OK 5.0\n"
+        assert format_response(ZeroDivisionError("Division by zero")) == (
+            "ERR ZeroDivisionError Division by zero\n"
+        )
+
+    def test_tcp_pipelined_requests(self):
+        """Test that pipelined responses come back in request order."""
+
+        async def scenario():
+            server = await start_server(port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                lines = [f"{i} 2 *" for i in range(20)] + ["2 xyz +"]
+                responses = await exchange(reader, writer, lines)
+                writer.close()
+                await writer.wait_closed()
+            return responses
+
+        responses = asyncio.run(scenario())
+        assert responses[:20] == [f"OK {i * 2.0}\n" for i in range(20)]
+        assert responses[20] == "ERR InvalidTokenError Unknown token: 'xyz'\n"
+
+    def test_unix_socket(self, tmp_path):
+        """Test serving on a Unix socket."""
+        path = str(tmp_path / "upn.sock")
+
+        async def scenario():
+            server = await start_server(path=path)
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(path)
+                responses = await exchange(reader, writer, ["2 3 +"])
+                writer.close()
+                await writer.wait_closed()
+            return responses
+
+        assert asyncio.run(scenario()) == ["OK 5.0\n"]
+
+    def test_writer_closed_after_reset(self):
+        """Test that the writer is closed when sending a response fails."""
+        writer = ResettingWriter()
+
+        async def scenario():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b"2 3 +\n")
+            reader.feed_eof()
+            await _client_handler(MicroBatcher(window=0))(reader, writer)
+
+        with pytest.raises(ConnectionResetError):
+            asyncio.run(scenario())
+        assert writer.closed
+
+    def test_client_not_reading(self):
+        """Test that a client that does not read is no longer read from."""
+        evaluate = RecordingEvaluator()
+
+        async def scenario():
+            batcher = MicroBatcher(window=0, max_pending=4, evaluate=evaluate)
+            reader = asyncio.StreamReader()
+            reader.feed_data(b"1 1 +\n" * 1000)
+            writer = StalledWriter()
+            handler = asyncio.create_task(_client_handler(batcher)(reader, writer))
+            await asyncio.sleep(0.1)
+            stalled = (writer.writes, sum(evaluate.batches))
+            writer.resumed.set()
+            reader.feed_eof()
+            await asyncio.wait_for(handler, timeout=5)
+            return stalled, writer.writes
+
+        (writes, evaluated), total = asyncio.run(scenario())
+        assert writes == 1
+        assert evaluated <= 6
+        assert total == 1000
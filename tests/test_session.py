@@ -0,0 +1,196 @@
+"""Unit tests for interactive sessions with undo and redo."""
+
+import tracemalloc
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    EmptyStackError,
+    FractionBackend,
+    InsufficientOperandsError,
+    InvalidTokenError,
+    Operator,
+    PersistentStack,
+    UPNEngine,
+    UPNSession,
+    ZeroDivisionError,
+)
+
+
+class TestPersistentStack:
+    """Tests for the structurally shared stack."""
+
+    def test_versions_unchanged(self):
+        """Test that push and pop leave the original version intact."""
+        base = PersistentStack([1.0, 2.0])
+        pushed = base.push(3.0)
+        value, popped = base.pop()
+        assert base.to_list() == [1.0, 2.0]
+        assert pushed.to_list() == [1.0, 2.0, 3.0]
+        assert (value, popped.to_list()) == (2.0, [1.0])
+        assert len(base) == 2 and len(pushed) == 3 and len(popped) == 1
+
+    def test_shared_cells(self):
+        """Test that versions share the cells below their top."""
+        base = PersistentStack(range(1000))
+        assert base.push(1)._cell[1] is base._cell
+        assert base.pop()[1]._cell is base._cell[1]
+
+    def test_empty(self):
+        """Test pop and peek on an empty stack."""
+        with pytest.raises(EmptyStackError):
+            PersistentStack().pop()
+        with pytest.raises(EmptyStackError):
+            PersistentStack().peek()
+
+    def test_iteration_and_equality(self):
+        """Test iteration order and value equality."""
+        stack = PersistentStack([1.0, 2.0, 3.0])
+        assert list(stack) == [3.0, 2.0, 1.0]
+        assert stack == PersistentStack([1.0, 2.0]).push(3.0)
+        assert stack != PersistentStack([1.0, 2.0])
+        assert repr(stack) == "PersistentStack([1.0, 2.0, 3.0])"
+
+
+class TestSession:
+    """Tests for the stack API of a session."""
+
+    def test_stack_api(self):
+        """Test push, pop, peek, get_stack and clear_stack."""
+        session = UPNSession()
+        session.push(1.0)
+        session.push(2.0)
+        assert session.peek() == 2.0
+        assert session.get_stack() == [1.0, 2.0]
+        assert session.pop() == 2.0
+        session.clear_stack()
+        assert session.get_stack() == []
+        with pytest.raises(EmptyStackError):
+            session.pop()
+        with pytest.raises(EmptyStackError):
+            session.peek()
+
+    def test_evaluate(self):
+        """Test that evaluate replaces the stack with its result."""
+        session = UPNSession()
+        session.push(9.0)
+        assert session.evaluate("x 2 *", {"x": 21.0}) == 42.0
+        assert session.get_stack() == [42.0]
+        with pytest.raises(ZeroDivisionError):
+            session.evaluate("1 0 /")
+        assert session.get_stack() == [42.0]
+
+    def test_apply(self):
+        """Test applying operators to the top of the stack."""
+        session = UPNSession()
+        for value in (10.0, 4.0, 2.0):
+            session.push(value)
+        assert session.apply("/") == 2.0
+        assert session.apply("-") == 8.0
+        assert session.get_stack() == [8.0]
+
+    def test_apply_errors(self):
+        """Test that failing operators leave the stack unchanged."""
+        session = UPNSession()
+        session.push(1.0)
+        with pytest.raises(InsufficientOperandsError):
+            session.apply("+")
+        with pytest.raises(InvalidTokenError):
+            session.apply("sqrt")
+        session.push(0.0)
+        with pytest.raises(ZeroDivisionError):
+            session.apply("/")
+        assert session.get_stack() == [1.0, 0.0]
+        assert session.history == (2, 0)
+
+    def test_apply_custom_operators(self):
+        """Test multi-output and variadic operators and a numeric backend."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+        registry.register(Operator("drop", 1, lambda x: (), outputs=0))
+        registry.register(Operator("sum", None, lambda *xs: sum(xs)))
+        engine = UPNEngine(operators=registry, numeric=FractionBackend())
+        session = UPNSession(engine)
+        session.push(engine.numeric.number("1"))
+        session.push(engine.numeric.number("3"))
+        assert session.apply("/") == engine.numeric.number("1") / 3
+        assert session.apply("dup") == session.get_stack()[0]
+        assert session.apply("sum") * 3 == 2
+        assert session.apply("drop") is None
+        assert session.get_stack() == []
+
+
+class TestHistory:
+    """Tests for undo, redo and checkpoints."""
+
+    def test_undo_redo(self):
+        """Test stepping back and forth through the changes."""
+        session = UPNSession()
+        session.push(1.0)
+        session.push(2.0)
+        session.apply("+")
+        assert session.undo() and session.get_stack() == [1.0, 2.0]
+        assert session.undo() and session.get_stack() == [1.0]
+        assert session.redo() and session.get_stack() == [1.0, 2.0]
+        assert session.redo() and session.get_stack() == [3.0]
+        assert not session.redo()
+        assert session.history == (3, 0)
+
+    def test_undo_everything(self):
+        """Test undoing back to the empty stack."""
+        session = UPNSession()
+        session.push(1.0)
+        session.clear_stack()
+        assert session.undo() and session.undo()
+        assert not session.undo()
+        assert not session.can_undo and session.can_redo
+        assert session.get_stack() == []
+
+    def test_change_clears_redo(self):
+        """Test that a new change discards the undone changes."""
+        session = UPNSession()
+        session.push(1.0)
+        session.undo()
+        session.push(2.0)
+        assert not session.can_redo
+        assert session.get_stack() == [2.0]
+
+    def test_checkpoints(self):
+        """Test saving, restoring and undoing a restore."""
+        session = UPNSession()
+        session.push(1.0)
+        session.checkpoint("start")
+        session.push(2.0)
+        session.apply("*")
+        session.restore("start")
+        assert session.get_stack() == [1.0]
+        session.undo()
+        assert session.get_stack() == [2.0]
+        assert session.checkpoints == ["start"]
+        with pytest.raises(KeyError, match="missing"):
+            session.restore("missing")
+
+    def test_snapshot(self):
+        """Test that a snapshot does not follow later changes."""
+        session = UPNSession()
+        session.push(1.0)
+        snapshot = session.stack
+        session.push(2.0)
+        session.apply("+")
+        assert snapshot.to_list() == [1.0]
+
+    def test_history_memory(self):
+        """Test that the history grows with the changes, not the stack size."""
+        session = UPNSession()
+        for i in range(10_000):
+            session.push(float(i))
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        for _ in range(1_000):
+            session.apply("+")
+        grown = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        # Copying the stack per change would take about 80 MB.
+        assert grown < 1_000_000
+        assert session.history == (11_000, 0)
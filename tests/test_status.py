@@ -0,0 +1,161 @@
+"""Unit tests for evaluation with status codes instead of exceptions."""
+
+from fractions import Fraction
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    ExpressionCache,
+    FractionBackend,
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    Operator,
+    Outcome,
+    Profiler,
+    Status,
+    UnboundVariableError,
+    UPNCalculator,
+    UPNCalculatorError,
+    UPNEngine,
+    ZeroDivisionError,
+)
+
+
+def _raised(calc, expression, values=None):
+    """Return the error evaluate() raises, or None."""
+    try:
+        calc.evaluate(expression, values)
+    except UPNCalculatorError as exc:
+        return exc
+    return None
+
+
+class TestTryEvaluate:
+    """Tests for UPNCalculator.try_evaluate()."""
+
+    def test_ok(self):
+        """Test a successful evaluation."""
+        calc = UPNCalculator()
+        outcome = calc.try_evaluate("2 3 + 4 *")
+        assert outcome.ok
+        assert outcome.status is Status.OK
+        assert outcome.value == 20.0
+        assert outcome.error() is None
+        assert outcome.message == ""
+        assert outcome.offset is None
+        assert calc.get_stack() == [20.0]
+
+    @pytest.mark.parametrize(
+        "expression, status, error, offset",
+        [
+            ("2 x? +", Status.INVALID_TOKEN, InvalidTokenError, 2),
+            ("2 + 3", Status.INSUFFICIENT_OPERANDS, InsufficientOperandsError, 2),
+            ("2 3", Status.INVALID_EXPRESSION, InvalidExpressionError, 3),
+            ("", Status.INVALID_EXPRESSION, InvalidExpressionError, 0),
+            ("1 0 /", Status.ZERO_DIVISION, ZeroDivisionError, None),
+        ],
+    )
+    def test_errors(self, expression, status, error, offset):
+        """Test that failures report the error evaluate() raises."""
+        calc = UPNCalculator()
+        calc.push(1.0)
+        outcome = calc.try_evaluate(expression)
+        assert not outcome.ok
+        assert outcome.value is None
+        assert outcome.status is status
+        assert isinstance(outcome.error(), error)
+        assert outcome.message == str(_raised(calc, expression))
+        assert outcome.offset == offset
+        assert calc.get_stack() == []
+
+    def test_message_is_lazy(self):
+        """Test that a static failure stores no error, only its position."""
+        outcome = UPNCalculator().try_evaluate("1 2 + foo")
+        assert outcome.detail == 1
+        assert outcome.index == 3
+        assert outcome.message == "Unknown token: 'foo'"
+
+    def test_variables(self):
+        """Test bound and unbound variables."""
+        calc = UPNCalculator()
+        assert calc.try_evaluate("x y *", {"x": 2.0, "y": 4.0}).value == 8.0
+        outcome = calc.try_evaluate("x y *", {"x": 2.0})
+        assert outcome.status is Status.INVALID_TOKEN
+        with pytest.raises(ValueError):
+            calc.try_evaluate("1", {"not valid": 1.0})
+
+    def test_unbound_in_mapping(self):
+        """Test a mapping that lists a name it cannot provide."""
+
+        class Partial(dict):
+            def __getitem__(self, name):
+                raise UnboundVariableError(f"Variable '{name}' is not bound")
+
+        outcome = UPNEngine().try_evaluate("x 1 +", Partial(x=1.0))
+        assert outcome.status is Status.UNBOUND_VARIABLE
+
+    def test_custom_operator_error(self):
+        """Test that other calculator errors get the generic status."""
+
+        class CustomError(UPNCalculatorError):
+            pass
+
+        def fail(x):
+            raise CustomError("no")
+
+        registry = OPERATORS.copy()
+        registry.register(Operator("fail", 1, fail))
+        outcome = UPNCalculator(operators=registry).try_evaluate("1 fail")
+        assert outcome.status is Status.ERROR
+        assert outcome.message == "no"
+
+    def test_backend_literal(self):
+        """Test literals the numeric backend rejects at compile time."""
+        calc = UPNCalculator(numeric=FractionBackend())
+        assert calc.try_evaluate("1 3 /").value == Fraction(1, 3)
+        outcome = calc.try_evaluate("inf 1 +")
+        assert outcome.status is Status.INVALID_TOKEN
+        assert "rational" in outcome.message
+
+    def test_cached(self):
+        """Test that valid expressions are compiled once and cached."""
+        cache = ExpressionCache()
+        calc = UPNCalculator(cache=cache)
+        calc.try_evaluate("2 3 +")
+        calc.try_evaluate("2 3 +")
+        calc.try_evaluate("2 +")
+        assert cache.stats().hits == 1
+        assert len(cache) == 1
+
+    def test_profiling_engine(self):
+        """Test that programs compiled by a profiling engine are timed."""
+        profiler = Profiler()
+        calc = UPNCalculator(profiler=profiler)
+        assert calc.try_evaluate("2 3 +").value == 5.0
+        assert profiler.as_dict()["phases"]["compile"]["count"] == 1
+
+
+class TestTryEvaluateMany:
+    """Tests for batch evaluation with status codes."""
+
+    def test_statuses(self):
+        """Test one outcome per expression, in input order."""
+        calc = UPNCalculator()
+        calc.push(7.0)
+        outcomes = calc.try_evaluate_many(["1 2 +", "1 0 /", "+", "x"], {"x": 4.0})
+        assert [o.status for o in outcomes] == [
+            Status.OK,
+            Status.ZERO_DIVISION,
+            Status.INSUFFICIENT_OPERANDS,
+            Status.OK,
+        ]
+        assert [o.value for o in outcomes] == [3.0, None, None, 4.0]
+        assert calc.get_stack() == [7.0]
+
+    def test_outcome_is_tuple(self):
+        """Test that outcomes unpack like tuples."""
+        value, status, *_ = UPNEngine().try_evaluate_many(["2 2 *"])[0]
+        assert (value, status) == (4.0, 0)
+        assert isinstance(UPNEngine().try_evaluate("1"), Outcome)
@@ -0,0 +1,89 @@
+"""Unit tests for streaming evaluation."""
+
+import io
+import tracemalloc
+
+import pytest
+
+from upn_calculator import (
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    UPNCalculator,
+    ZeroDivisionError,
+)
+from upn_calculator.stream import evaluate_stream, iter_tokens
+
+
+def long_program(additions):
+    """Yield a program "1 1 + 1 + ..." in small chunks."""
+    yield "1"
+    for _ in range(additions):
+        yield " 1 +"
+
+
+class TestIterTokens:
+    """Tests for chunk-boundary handling."""
+
+    def test_token_split_across_chunks(self):
+        """Test that a token split over chunks is joined."""
+        texts = [t.text for t in iter_tokens(["12", "3.", "5 4", "", "2 +"])]
+        assert texts == ["123.5", "42", "+"]
+
+    def test_whitespace_at_boundaries(self):
+        """Test chunks that start or end with whitespace."""
+        texts = [t.text for t in iter_tokens(["1 ", " 2", "\n", "+"])]
+        assert texts == ["1", "2", "+"]
+
+    def test_multibyte_character_split(self):
+        """Test that a UTF-8 sequence split across bytes chunks is decoded."""
+        data = "1 ٣ +".encode()
+        chunks = [data[i : i + 1] for i in range(len(data))]
+        assert [t.text for t in iter_tokens(chunks)] == ["1", "٣", "+"]
+
+
+class TestEvaluateStream:
+    """Tests for evaluate_stream()."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 64])
+    def test_binary_file(self, chunk_size):
+        """Test reading from a binary file object with small reads."""
+        source = io.BytesIO(b"2 3 + 4 * 10 -")
+        assert evaluate_stream(source, chunk_size=chunk_size) == 10.0
+
+    def test_text_file(self):
+        """Test reading from a text file object."""
+        assert evaluate_stream(io.StringIO("10 3 -"), chunk_size=2) == 7.0
+
+    def test_matches_evaluate(self):
+        """Test that streaming gives the same result as evaluate()."""
+        expression = "1.5 2 + 3e2 * 7 / -4 -"
+        calc = UPNCalculator()
+        chunks = [expression[i : i + 4] for i in range(0, len(expression), 4)]
+        assert calc.evaluate_stream(chunks) == calc.evaluate(expression)
+        assert calc.get_stack() == [calc.evaluate(expression)]
+
+    def test_variables(self):
+        """Test binding words to values."""
+        assert evaluate_stream(["x 2", " *"], values={"x": 4.0}) == 8.0
+
+    def test_errors(self):
+        """Test that the usual errors are raised."""
+        with pytest.raises(InvalidTokenError):
+            evaluate_stream(["2 3 x", "yz +"])
+        with pytest.raises(InsufficientOperandsError):
+            evaluate_stream(["2 +"])
+        with pytest.raises(InvalidExpressionError):
+            evaluate_stream(["2 3"])
+        with pytest.raises(ZeroDivisionError):
+            evaluate_stream([b"1 0 /"])
+
+    def test_peak_memory_independent_of_length(self):
+        """Test that peak memory does not grow with the program length."""
+        peaks = []
+        for additions in (1_000, 50_000):
+            tracemalloc.start()
+            assert evaluate_stream(long_program(additions)) == additions + 1
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] < peaks[0] * 2
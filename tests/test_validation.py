@@ -0,0 +1,142 @@
+"""Unit tests for validating expressions without evaluating them."""
+
+import random
+
+import pytest
+
+from upn_calculator import (
+    OPERATORS,
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    Operator,
+    UPNCalculatorError,
+    compile_expression,
+    validate,
+    validate_many,
+)
+
+
+def _compile_error(expression, variables=(), operators=None):
+    """Return the error compile_expression() raises, or None."""
+    try:
+        compile_expression(expression, variables, operators)
+    except UPNCalculatorError as exc:
+        return exc
+    return None
+
+
+class TestValidate:
+    """Tests for validating single expressions."""
+
+    @pytest.mark.parametrize("expression", ["2 3 +", "1 0 /", "5", "2 3 + 4 * 1 -"])
+    def test_valid(self, expression):
+        """Test that well-formed expressions are valid, even 1 0 /."""
+        result = validate(expression)
+        assert result.valid
+        assert result.error is None
+        assert result.offset is None
+        assert result.depth == 1
+
+    def test_max_depth(self):
+        """Test that the deepest stack matches the compiled program."""
+        expression = "1 2 3 4 + + 5 * +"
+        assert (
+            validate(expression).max_depth == compile_expression(expression).max_depth
+        )
+
+    def test_invalid_token(self):
+        """Test an unknown token with its offset."""
+        result = validate("2  3 + abc *")
+        assert isinstance(result.error, InvalidTokenError)
+        assert str(result.error) == "Unknown token: 'abc'"
+        assert result.offset == 7
+        assert result.depth == 1
+
+    def test_insufficient_operands(self):
+        """Test operand underflow with the operator's offset."""
+        result = validate("2 + 3")
+        assert isinstance(result.error, InsufficientOperandsError)
+        assert str(result.error) == "Operator '+' requires 2 operands but stack has 1"
+        assert result.offset == 2
+
+    @pytest.mark.parametrize("expression, depth", [("2 3 4 +", 2), ("", 0)])
+    def test_final_stack_size(self, expression, depth):
+        """Test that a wrong final stack size is reported at the end."""
+        result = validate(expression)
+        assert isinstance(result.error, InvalidExpressionError)
+        assert result.depth == depth
+        assert result.offset == len(expression)
+
+    def test_repeated_token_offset(self):
+        """Test that the offset points at the failing occurrence of a token."""
+        assert validate("+ +").offset == 0
+        assert validate("1 + +").offset == 2
+        assert validate("1 2 + 3 + +").offset == 10
+
+    def test_variables(self):
+        """Test that only the given names are accepted as operands."""
+        assert validate("x y +", ["x", "y"]).valid
+        assert isinstance(validate("x y +", ["x"]).error, InvalidTokenError)
+        with pytest.raises(ValueError):
+            validate("1", ["1x"])
+
+    def test_custom_operators(self):
+        """Test variadic and multi-output operators of a registry."""
+        registry = OPERATORS.copy()
+        registry.register(Operator("sum", None, sum))
+        registry.register(Operator("dup", 1, lambda x: (x, x), outputs=2))
+        assert validate("1 2 3 sum", operators=registry).valid
+        assert validate("2 dup *", operators=registry).valid
+        result = validate("sum", operators=registry)
+        assert isinstance(result.error, InsufficientOperandsError)
+        assert "at least 1 operand" in str(result.error)
+
+    def test_matches_compiler(self):
+        """Test random token sequences against compile_expression()."""
+        rng = random.Random(0)
+        words = [
+            "1",
+            "2.5",
+            "-3",
+            "1e3",
+            "1_0",
+            "1e",
+            "1E+5",
+            ".5e-3",
+            "e5",
+            "inf",
+            "-NaN",
+            "x",
+            "y",
+            "+",
+            "-",
+            "*",
+            "/",
+            "?",
+        ]
+        for _ in range(2_000):
+            expression = " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+            error = _compile_error(expression, ["x"])
+            result = validate(expression, ["x"])
+            assert type(result.error) is type(error)
+            assert str(result.error) == str(error)
+
+
+class TestValidateMany:
+    """Tests for validating many expressions."""
+
+    def test_results_in_order(self):
+        """Test one result per expression, in input order."""
+        results = validate_many(["2 3 +", "2 +", "x 1 -", "1 2"], ["x"])
+        assert [r.valid for r in results] == [True, False, True, False]
+        assert [type(r.error).__name__ for r in results[1::2]] == [
+            "InsufficientOperandsError",
+            "InvalidExpressionError",
+        ]
+
+    def test_generator_input(self):
+        """Test that any iterable of expressions is accepted."""
+        results = validate_many(f"{i} 1 +" for i in range(3))
+        assert len(results) == 3
+        assert all(r.valid for r in results)
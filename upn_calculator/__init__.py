@@ -1,29 +1,176 @@
-"""UPN Calculator - Reverse Polish Notation Stack-based Calculator."""
-
-from .calculator import UPNCalculator
-from .errors import (
-    EmptyStackError,
-    InsufficientOperandsError,
-    InvalidExpressionError,
-    InvalidTokenError,
-    UPNCalculatorError,
-    ZeroDivisionError,
-)
-from .operators import OPERATORS, apply_operator
-from .parser import is_number, is_operator, tokenize
+"""UPN Calculator - Reverse Polish Notation Stack-based Calculator.
+
+The public names are loaded on first access (PEP 562), so importing the
+package is nearly free, and heavier parts such as the process pool or the
+decimal backends are only imported by programs that use them.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .batch import BatchResult, evaluate_batch
+    from .bytecode import Catalogue
+    from .cache import CacheStats, ExpressionCache
+    from .calculator import UPNCalculator
+    from .codegen import CodegenEngine, GeneratedExpression, generate_function
+    from .compiler import CompiledExpression, compile_expression
+    from .engine import UPNEngine
+    from .environment import Environment, ReactiveEnvironment
+    from .errors import (
+        BytecodeError,
+        EmptyStackError,
+        InsufficientOperandsError,
+        InvalidExpressionError,
+        InvalidTokenError,
+        UnboundVariableError,
+        UPNCalculatorError,
+        ZeroDivisionError,
+    )
+    from .infix import InfixConverter, compile_infix, to_upn
+    from .mapped import evaluate_mapped, write_column
+    from .numeric import (
+        FLOAT,
+        DecimalBackend,
+        FloatBackend,
+        FractionBackend,
+        NumericBackend,
+    )
+    from .operators import OPERATORS, Operator, OperatorRegistry, apply_operator
+    from .optimizer import optimize
+    from .parallel import ParallelEvaluator, evaluate_many
+    from .parser import is_number, is_operator, tokenize
+    from .planner import ExpressionPlan, evaluate_shared
+    from .profiling import Profiler, ProfilingEngine
+    from .session import PersistentStack, UPNSession
+    from .status import Outcome, Status
+    from .validation import ValidationResult, validate, validate_many
 
 __version__ = "0.1.0"
+
+# The module each public name is defined in.
+_EXPORTS = {
+    "UPNCalculator": "calculator",
+    "UPNEngine": "engine",
+    "CompiledExpression": "compiler",
+    "compile_expression": "compiler",
+    "optimize": "optimizer",
+    "CodegenEngine": "codegen",
+    "GeneratedExpression": "codegen",
+    "generate_function": "codegen",
+    "validate": "validation",
+    "validate_many": "validation",
+    "ValidationResult": "validation",
+    "Outcome": "status",
+    "Status": "status",
+    "UPNSession": "session",
+    "PersistentStack": "session",
+    "InfixConverter": "infix",
+    "compile_infix": "infix",
+    "to_upn": "infix",
+    "evaluate_batch": "batch",
+    "BatchResult": "batch",
+    "evaluate_mapped": "mapped",
+    "write_column": "mapped",
+    "ExpressionCache": "cache",
+    "CacheStats": "cache",
+    "evaluate_many": "parallel",
+    "ParallelEvaluator": "parallel",
+    "evaluate_shared": "planner",
+    "ExpressionPlan": "planner",
+    "Environment": "environment",
+    "ReactiveEnvironment": "environment",
+    "Catalogue": "bytecode",
+    "NumericBackend": "numeric",
+    "FloatBackend": "numeric",
+    "DecimalBackend": "numeric",
+    "FractionBackend": "numeric",
+    "FLOAT": "numeric",
+    "Profiler": "profiling",
+    "ProfilingEngine": "profiling",
+    "UPNCalculatorError": "errors",
+    "InvalidTokenError": "errors",
+    "InsufficientOperandsError": "errors",
+    "InvalidExpressionError": "errors",
+    "ZeroDivisionError": "errors",
+    "EmptyStackError": "errors",
+    "UnboundVariableError": "errors",
+    "BytecodeError": "errors",
+    "is_number": "parser",
+    "is_operator": "parser",
+    "tokenize": "parser",
+    "apply_operator": "operators",
+    "Operator": "operators",
+    "OperatorRegistry": "operators",
+    "OPERATORS": "operators",
+}
 __all__ = [
     "UPNCalculator",
+    "UPNEngine",
+    "CompiledExpression",
+    "compile_expression",
+    "optimize",
+    "CodegenEngine",
+    "GeneratedExpression",
+    "generate_function",
+    "validate",
+    "validate_many",
+    "ValidationResult",
+    "Outcome",
+    "Status",
+    "UPNSession",
+    "PersistentStack",
+    "InfixConverter",
+    "compile_infix",
+    "to_upn",
+    "evaluate_batch",
+    "BatchResult",
+    "evaluate_mapped",
+    "write_column",
+    "ExpressionCache",
+    "CacheStats",
+    "evaluate_many",
+    "ParallelEvaluator",
+    "evaluate_shared",
+    "ExpressionPlan",
+    "Environment",
+    "ReactiveEnvironment",
+    "Catalogue",
+    "NumericBackend",
+    "FloatBackend",
+    "DecimalBackend",
+    "FractionBackend",
+    "FLOAT",
+    "Profiler",
+    "ProfilingEngine",
     "UPNCalculatorError",
     "InvalidTokenError",
     "InsufficientOperandsError",
     "InvalidExpressionError",
     "ZeroDivisionError",
     "EmptyStackError",
+    "UnboundVariableError",
+    "BytecodeError",
     "is_number",
     "is_operator",
     "tokenize",
     "apply_operator",
+    "Operator",
+    "OperatorRegistry",
     "OPERATORS",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the module defining a public name on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the module attributes including the not yet loaded names."""
+    return sorted(set(globals()) | set(__all__))
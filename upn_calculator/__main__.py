@@ -0,0 +1,7 @@
+"""Allow running the calculator as `python -m upn_calculator`."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
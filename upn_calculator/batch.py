@@ -0,0 +1,266 @@
+"""Columnar evaluation of one UPN expression over many rows of input."""
+
+import math
+from array import array
+from itertools import repeat
+from typing import (
+    Any,
+    Callable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .compiler import (
+    LOAD,
+    PUSH,
+    CompiledExpression,
+    compile_expression,
+    operator_call,
+)
+from .errors import UnboundVariableError, ZeroDivisionError
+from .operators import OPERATORS, OperatorRegistry, divide
+
+ZERO_DIVISION_POLICIES = ("raise", "nan", "mask")
+
+
+class BatchResult(NamedTuple):
+    """
+    Result column of a batch evaluation.
+
+    Attributes:
+        values: One result per row (array('d') or a NumPy array).
+        mask: With the "mask" policy, a column that is true for every row in
+            which a division by zero occurred (the value of such rows is NaN).
+            None for the other policies.
+    """
+
+    values: Any
+    mask: Optional[Any] = None
+
+
+def _is_numpy_array(column: Any) -> bool:
+    """Check for a NumPy array without importing NumPy."""
+    return type(column).__module__ == "numpy" and hasattr(column, "dtype")
+
+
+def _operand_rows(operand: Union[float, Sequence[float]], rows: int):
+    """Return an iterable over an operand, broadcasting scalars to all rows."""
+    if isinstance(operand, float):
+        return repeat(operand, rows)
+    return operand
+
+
+def _apply_rows(
+    function: Callable[..., Any],
+    operands: List[Any],
+    rows: int,
+    outputs: int,
+    policy: str,
+    mask: Optional[Any],
+) -> List[Any]:
+    """Apply an operator row by row, handling divisions by zero per row."""
+    failed = math.nan if outputs == 1 else (math.nan,) * outputs
+    results = []
+    append = results.append
+    arguments = zip(*(_operand_rows(operand, rows) for operand in operands))
+    for row, args in enumerate(arguments):
+        try:
+            append(function(*args))
+        except ZeroDivisionError:
+            if policy == "raise":
+                raise ZeroDivisionError(f"Division by zero in row {row}") from None
+            append(failed)
+            if mask is not None:
+                mask[row] = 1
+    return results
+
+
+def _split_outputs(results: List[Any], outputs: int) -> List[array]:
+    """Turn per-row result tuples into one column per output."""
+    if not results:
+        return [array("d") for _ in range(outputs)]
+    return [array("d", column) for column in zip(*results)]
+
+
+def _run_python(
+    program: CompiledExpression,
+    columns: Mapping[str, Sequence[float]],
+    rows: int,
+    policy: str,
+) -> BatchResult:
+    """Execute a program over columns with pure-Python kernels."""
+    mask = array("b", bytes(rows)) if policy == "mask" else None
+    stack = []
+    for opcode, arg, _ in program.code:
+        if opcode == PUSH:
+            stack.append(arg)
+            continue
+        if opcode == LOAD:
+            stack.append(columns[arg])
+            continue
+        function, count, outputs = operator_call(opcode, arg)
+        operands = stack[len(stack) - count :]
+        del stack[len(stack) - count :]
+        if all(isinstance(operand, float) for operand in operands):
+            try:
+                result = function(*operands)
+            except ZeroDivisionError:
+                if policy == "raise":
+                    raise
+                if mask is not None:
+                    mask = array("b", [1]) * rows
+                result = math.nan if outputs == 1 else (math.nan,) * outputs
+            if outputs == 1:
+                stack.append(result)
+            else:
+                stack.extend(result)
+            continue
+        iterables = [_operand_rows(operand, rows) for operand in operands]
+        try:
+            if outputs == 1:
+                stack.append(array("d", map(function, *iterables)))
+                continue
+            results = list(map(function, *iterables))
+        except ZeroDivisionError:
+            results = _apply_rows(function, operands, rows, outputs, policy, mask)
+            if outputs == 1:
+                stack.append(array("d", results))
+                continue
+        stack.extend(_split_outputs(results, outputs))
+
+    values = stack[0]
+    if isinstance(values, float):
+        values = array("d", [values]) * rows
+    elif any(values is column for column in columns.values()):
+        values = array("d", values)
+    return BatchResult(values, mask)
+
+
+def _run_numpy(
+    program: CompiledExpression,
+    columns: Mapping[str, Any],
+    rows: int,
+    policy: str,
+    operators: OperatorRegistry,
+) -> BatchResult:
+    """Execute a program over columns with the operators' NumPy kernels."""
+    import numpy
+
+    arrays = {
+        name: numpy.asarray(columns[name], dtype=numpy.float64) for name in columns
+    }
+    mask = numpy.zeros(rows, dtype=bool) if policy == "mask" else None
+    stack = []
+    for opcode, arg, token in program.code:
+        if opcode == PUSH:
+            stack.append(arg)
+            continue
+        if opcode == LOAD:
+            stack.append(arrays[arg])
+            continue
+        function, count, outputs = operator_call(opcode, arg)
+        operands = stack[len(stack) - count :]
+        del stack[len(stack) - count :]
+        op = operators.table.get(token)
+        kernel = op.kernel if op is not None and op.function is function else None
+        if kernel is None:
+            # No vectorized kernel: fall back to the function, row by row.
+            results = _apply_rows(function, operands, rows, outputs, policy, mask)
+            if outputs == 1:
+                stack.append(numpy.array(results, dtype=numpy.float64))
+            else:
+                stack.extend(
+                    numpy.array(column, dtype=numpy.float64)
+                    for column in _split_outputs(results, outputs)
+                )
+            continue
+        if function is not divide:
+            result = kernel(*operands)
+            if outputs == 1:
+                stack.append(result)
+            else:
+                stack.extend(result)
+            continue
+        a, b = operands
+        zero = numpy.equal(b, 0)
+        if zero.any():
+            if policy == "raise":
+                row = int(numpy.argmax(numpy.broadcast_to(zero, rows)))
+                raise ZeroDivisionError(f"Division by zero in row {row}")
+            if mask is not None:
+                mask |= zero
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            stack.append(numpy.where(zero, numpy.nan, kernel(a, b)))
+
+    values = numpy.array(numpy.broadcast_to(stack[0], rows), dtype=numpy.float64)
+    return BatchResult(values, mask)
+
+
+def evaluate_batch(
+    expression: Union[str, CompiledExpression],
+    columns: Mapping[str, Sequence[float]],
+    on_zero_division: str = "raise",
+    operators: Optional[OperatorRegistry] = None,
+) -> BatchResult:
+    """
+    Evaluate one UPN expression over columns of input values.
+
+    Each variable of the expression is bound to the column of the same name.
+    Every operation runs once over whole columns instead of once per row.
+    Columns may be array.array("d") (or any float sequence), in which case
+    the operator functions are mapped over the rows, or NumPy arrays, in
+    which case the operators' vectorized kernels (NumPy ufuncs for the
+    built-in operators) are used. NumPy is an optional dependency and is only
+    needed when NumPy arrays are passed in.
+
+    Args:
+        expression: A UPN expression with named variables, or a program
+            compiled with those variables.
+        columns: Input columns by variable name; all must have the same length.
+        on_zero_division: What to do with rows that divide by zero:
+            "raise" raises ZeroDivisionError, "nan" yields NaN for the row,
+            and "mask" yields NaN and marks the row in BatchResult.mask.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        A BatchResult with one value per row.
+
+    Raises:
+        ValueError: If the policy is unknown or the columns differ in length.
+        UnboundVariableError: If a variable has no matching column.
+        ZeroDivisionError: If a row divides by zero under the "raise" policy.
+
+    Examples:
+        >>> from array import array
+        >>> evaluate_batch(
+        ...     "x y + z *",
+        ...     {"x": array("d", [1, 2]), "y": array("d", [3, 4]),
+        ...      "z": array("d", [10, 100])},
+        ... ).values
+        array('d', [40.0, 600.0])
+    """
+    if on_zero_division not in ZERO_DIVISION_POLICIES:
+        raise ValueError(f"Unknown division-by-zero policy: {on_zero_division!r}")
+    if not columns:
+        raise ValueError("At least one input column is required")
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError("All input columns must have the same length")
+    rows = lengths.pop()
+
+    if isinstance(expression, CompiledExpression):
+        program = expression
+    else:
+        program = compile_expression(expression, columns.keys(), operators)
+    for name in program.variables:
+        if name not in columns:
+            raise UnboundVariableError(f"Variable '{name}' is not bound")
+
+    if any(_is_numpy_array(column) for column in columns.values()):
+        registry = OPERATORS if operators is None else operators
+        return _run_numpy(program, columns, rows, on_zero_division, registry)
+    return _run_python(program, columns, rows, on_zero_division)
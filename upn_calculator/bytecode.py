@@ -0,0 +1,463 @@
+"""Binary catalogues of compiled programs, loadable from memory-mapped files.
+
+A catalogue stores many compiled programs in one file that can be mapped
+read-only and shared by any number of processes. All sections are arrays
+read in place through memoryview casts; a program is only turned back into
+a CompiledExpression when it is first accessed.
+
+Layout (native byte order, recorded in the header):
+
+    header     magic, version, flags, CRC-32 of everything after the header,
+               and the length of each section
+    constants  float64 per distinct constant
+    index      6 x uint32 per program: first instruction, instruction count,
+               source string, max depth, first variable, variable count
+    variables  uint32 string id per variable
+    code       3 x uint32 per instruction: opcode, argument (constant index
+               for PUSH, operand count for APPLY) and token string id
+    strings    uint32 end offset per string, then the UTF-8 bytes
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from .cache import ExpressionCache
+from .compiler import (
+    APPLY,
+    BINARY,
+    LOAD,
+    PUSH,
+    UNARY,
+    CompiledExpression,
+    Instruction,
+)
+from .errors import BytecodeError
+from .operators import OPERATORS, OperatorRegistry
+
+MAGIC = b"UPNB"
+FORMAT_VERSION = 1
+
+# magic, version, flags, crc32, programs, constants, variables, instructions,
+# strings, string bytes, reserved
+_HEADER = struct.Struct("=4sHHIIIIIIII")
+_FLAG_BIG_ENDIAN = 1
+_NATIVE_FLAGS = _FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+
+_INDEX_FIELDS = 6
+_CODE_FIELDS = 3
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def dumps(programs: Iterable[CompiledExpression]) -> bytes:
+    """
+    Serialize compiled programs into a catalogue.
+
+    Operators are stored by symbol and resolved again when loading, so the
+    programs must only use operators of the registry used to load them.
+
+    Args:
+        programs: The programs to store, in catalogue order.
+
+    Returns:
+        The catalogue bytes.
+
+    Raises:
+        BytecodeError: If a program computes with another numeric backend.
+
+    Examples:
+        >>> from upn_calculator import compile_expression
+        >>> catalogue = loads(dumps([compile_expression("2 3 + 4 *")]))
+        >>> catalogue[0].run()
+        20.0
+    """
+    constants = array("d")
+    constant_ids: Dict[str, int] = {}
+    strings: Dict[str, int] = {}
+    index = array("I")
+    variables = array("I")
+    code = array("I")
+
+    def string_id(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    for program in programs:
+        index.extend(
+            (
+                len(code) // _CODE_FIELDS,
+                len(program.code),
+                string_id(program.source),
+                program.max_depth,
+                len(variables),
+                len(program.variables),
+            )
+        )
+        variables.extend(string_id(name) for name in program.variables)
+        for opcode, arg, token in program.code:
+            if opcode == PUSH:
+                if not isinstance(arg, (int, float)):
+                    raise BytecodeError(
+                        f"Constant {token!r} is not a float; "
+                        "only float programs can be stored"
+                    )
+                key = float(arg).hex()
+                argument = constant_ids.get(key)
+                if argument is None:
+                    argument = constant_ids[key] = len(constants)
+                    constants.append(arg)
+            elif opcode == APPLY:
+                argument = arg[1]
+            else:
+                argument = 0
+            code.extend((opcode, argument, string_id(token)))
+
+    blob = bytearray()
+    ends = array("I")
+    for text in strings:
+        blob += text.encode("utf-8")
+        ends.append(len(blob))
+
+    body = b"".join(
+        [
+            constants.tobytes(),
+            index.tobytes(),
+            variables.tobytes(),
+            code.tobytes(),
+            ends.tobytes(),
+            bytes(blob),
+        ]
+    )
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        _NATIVE_FLAGS,
+        zlib.crc32(body),
+        len(index) // _INDEX_FIELDS,
+        len(constants),
+        len(variables),
+        len(code) // _CODE_FIELDS,
+        len(ends),
+        len(blob),
+        0,
+    )
+    return header + body
+
+
+def dump(
+    programs: Iterable[CompiledExpression], file: Union[PathLike, BinaryIO]
+) -> None:
+    """
+    Write compiled programs to a catalogue file.
+
+    Args:
+        programs: The programs to store, in catalogue order.
+        file: A path, or a binary file object open for writing.
+    """
+    data = dumps(programs)
+    if hasattr(file, "write"):
+        file.write(data)
+        return
+    with open(file, "wb") as stream:
+        stream.write(data)
+
+
+class Catalogue(Sequence):
+    """
+    A read-only sequence of compiled programs backed by a catalogue buffer.
+
+    Opening a catalogue validates the header (and, by default, the checksum)
+    and maps its sections; programs are decoded one by one on first access.
+    Use load() to open a file, loads() for bytes in memory.
+
+    Examples:
+        >>> from upn_calculator import compile_expression
+        >>> data = dumps([compile_expression("x 2 *", ["x"])])
+        >>> with loads(data) as catalogue:
+        ...     catalogue.find("x 2 *").run({"x": 21.0})
+        42.0
+    """
+
+    def __init__(
+        self,
+        buffer: Any,
+        operators: Optional[OperatorRegistry] = None,
+        verify: bool = True,
+    ):
+        """
+        Open a catalogue from a buffer.
+
+        Args:
+            buffer: An object supporting the buffer protocol (bytes, mmap).
+            operators: Registry to resolve operator symbols; defaults to
+                OPERATORS.
+            verify: Check the CRC-32 checksum of the whole catalogue.
+
+        Raises:
+            BytecodeError: If the buffer is not a valid catalogue of this
+                version and byte order, or fails the checksum.
+        """
+        self.operators = OPERATORS if operators is None else operators
+        self._mmap: Optional[mmap.mmap] = None
+        self._view = memoryview(buffer).cast("B")
+        try:
+            header = self._check_header(verify)
+        except BytecodeError:
+            self._view.release()
+            raise
+        programs, constants, variables, instructions, strings, blob_size = header
+        sizes = [
+            constants * 8,
+            programs * _INDEX_FIELDS * 4,
+            variables * 4,
+            instructions * _CODE_FIELDS * 4,
+            strings * 4,
+            blob_size,
+        ]
+        sections = []
+        offset = _HEADER.size
+        for size in sizes:
+            sections.append(self._view[offset : offset + size])
+            offset += size
+        self._constants = sections[0].cast("d")
+        self._index = sections[1].cast("I")
+        self._variables = sections[2].cast("I")
+        self._code = sections[3].cast("I")
+        self._string_ends = sections[4].cast("I")
+        self._blob = sections[5]
+        self._sections = sections
+        self._programs: List[Optional[CompiledExpression]] = [None] * programs
+        self._strings: Dict[int, str] = {}
+        self._instructions: Dict[Tuple[int, int, int], Instruction] = {}
+        self._by_source: Optional[Dict[str, int]] = None
+
+    def _check_header(self, verify: bool) -> tuple:
+        """Validate the header and checksum; return the section lengths."""
+        if len(self._view) < _HEADER.size:
+            raise BytecodeError("Not a UPN bytecode catalogue: file too short")
+        magic, version, flags, checksum, *lengths, _ = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise BytecodeError("Not a UPN bytecode catalogue: bad magic number")
+        if version != FORMAT_VERSION:
+            raise BytecodeError(
+                f"Unsupported catalogue version {version} (expected {FORMAT_VERSION})"
+            )
+        if flags != _NATIVE_FLAGS:
+            raise BytecodeError("Catalogue was written with a different byte order")
+        programs, constants, variables, instructions, strings, blob_size = lengths
+        size = (
+            _HEADER.size
+            + constants * 8
+            + (programs * _INDEX_FIELDS + variables + instructions * _CODE_FIELDS) * 4
+            + strings * 4
+            + blob_size
+        )
+        if size != len(self._view):
+            raise BytecodeError("Catalogue size does not match its header")
+        if verify and zlib.crc32(self._view[_HEADER.size :]) != checksum:
+            raise BytecodeError("Catalogue checksum mismatch: file is corrupt")
+        return tuple(lengths)
+
+    def _string(self, string_id: int) -> str:
+        """Decode a string of the string table."""
+        text = self._strings.get(string_id)
+        if text is None:
+            start = self._string_ends[string_id - 1] if string_id else 0
+            end = self._string_ends[string_id]
+            text = str(self._blob[start:end], "utf-8")
+            self._strings[string_id] = text
+        return text
+
+    def _instruction(self, opcode: int, argument: int, token_id: int) -> Instruction:
+        """Turn one encoded instruction into an instruction tuple."""
+        token = self._string(token_id)
+        if opcode == PUSH:
+            return (PUSH, self._constants[argument], token)
+        if opcode == LOAD:
+            return (LOAD, token, token)
+        if opcode == BINARY:
+            operands, outputs = 2, 1
+        elif opcode == UNARY:
+            operands, outputs = 1, 1
+        elif opcode == APPLY:
+            operands, outputs = argument, None
+        else:
+            raise BytecodeError(f"Unknown opcode {opcode}")
+        op = self.operators.table.get(token)
+        if (
+            op is None
+            or op.arity not in (None, operands)
+            or (outputs is not None and outputs != op.outputs)
+        ):
+            raise BytecodeError(
+                f"Operator '{token}' is not registered with a matching arity"
+            )
+        if opcode == APPLY:
+            return (APPLY, (op.function, operands, op.outputs), token)
+        return (opcode, op.function, token)
+
+    def _decode(self, position: int) -> CompiledExpression:
+        """Turn one program of the catalogue into a CompiledExpression."""
+        first, count, source, max_depth, var_start, var_count = self._index[
+            position * _INDEX_FIELDS : (position + 1) * _INDEX_FIELDS
+        ]
+        names = tuple(
+            self._string(name)
+            for name in self._variables[var_start : var_start + var_count]
+        )
+        # Formulas share most instructions (operators, variables, common
+        # constants), so each distinct encoded instruction is decoded once
+        # and its tuple reused by every program that contains it.
+        instructions = self._instructions
+        words = iter(
+            self._code[first * _CODE_FIELDS : (first + count) * _CODE_FIELDS].tolist()
+        )
+        code = []
+        for key in zip(words, words, words):
+            instruction = instructions.get(key)
+            if instruction is None:
+                instruction = instructions[key] = self._instruction(*key)
+            code.append(instruction)
+        return CompiledExpression(self._string(source), tuple(code), max_depth, names)
+
+    def __len__(self) -> int:
+        """Return the number of programs."""
+        return len(self._programs)
+
+    def __getitem__(self, position):
+        """Return the program at a position, decoding it on first access."""
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        program = self._programs[position]
+        if program is None:
+            if position < 0:
+                position += len(self)
+            program = self._programs[position] = self._decode(position)
+        return program
+
+    def find(self, source: str) -> Optional[CompiledExpression]:
+        """
+        Look up a program by its source expression.
+
+        Args:
+            source: The expression the program was compiled from.
+
+        Returns:
+            The first program with this source, or None.
+        """
+        if self._by_source is None:
+            self._by_source = {}
+            for position in range(len(self) - 1, -1, -1):
+                source_id = self._index[position * _INDEX_FIELDS + 2]
+                self._by_source[self._string(source_id)] = position
+        position = self._by_source.get(source)
+        return None if position is None else self[position]
+
+    def preload(self, cache: ExpressionCache) -> int:
+        """
+        Store every program in an expression cache.
+
+        Programs without variables are stored under their source, like
+        UPNEngine.compile() does; programs with variables under
+        (source, None). UPNEngine uses such an entry for any bindings that
+        include the program's variables, e.g. a whole row or Environment,
+        and caches it under those names on first use.
+
+        Args:
+            cache: The cache to fill (e.g., an engine's cache).
+
+        Returns:
+            The number of programs stored.
+        """
+        for program in self:
+            key = (program.source, None) if program.variables else program.source
+            cache.put(key, program)
+        return len(self)
+
+    def close(self) -> None:
+        """Release the buffer (and unmap the file, if it was mapped)."""
+        if self._view is None:
+            return
+        for section in self._sections:
+            section.release()
+        for view in (
+            self._constants,
+            self._index,
+            self._variables,
+            self._code,
+            self._string_ends,
+        ):
+            view.release()
+        self._view.release()
+        self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "Catalogue":
+        """Return the catalogue for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Release the buffer."""
+        self.close()
+
+
+def loads(
+    data: Any, operators: Optional[OperatorRegistry] = None, verify: bool = True
+) -> Catalogue:
+    """
+    Open a catalogue from bytes in memory.
+
+    Args:
+        data: The catalogue bytes (any buffer-protocol object).
+        operators: Registry to resolve operator symbols; defaults to OPERATORS.
+        verify: Check the CRC-32 checksum.
+
+    Returns:
+        The catalogue.
+
+    Raises:
+        BytecodeError: If the data is not a valid catalogue.
+    """
+    return Catalogue(data, operators, verify)
+
+
+def load(
+    path: PathLike, operators: Optional[OperatorRegistry] = None, verify: bool = True
+) -> Catalogue:
+    """
+    Open a catalogue file by mapping it read-only into memory.
+
+    The file is not read or copied up front: pages are loaded by the OS on
+    access and shared between all processes that map the same file. With
+    `verify`, the checksum pass reads the file once.
+
+    Args:
+        path: Path of the catalogue file.
+        operators: Registry to resolve operator symbols; defaults to OPERATORS.
+        verify: Check the CRC-32 checksum.
+
+    Returns:
+        The catalogue; close it (or use it as a context manager) when done.
+
+    Raises:
+        BytecodeError: If the file is not a valid catalogue.
+        OSError: If the file cannot be opened or mapped.
+    """
+    with open(path, "rb") as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            raise BytecodeError("Not a UPN bytecode catalogue: file too short")
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        catalogue = Catalogue(mapped, operators, verify)
+    except BaseException:
+        mapped.close()
+        raise
+    catalogue._mmap = mapped
+    return catalogue
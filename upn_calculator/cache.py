@@ -0,0 +1,144 @@
+"""Thread-safe LRU cache for compiled UPN expressions."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from .compiler import CompiledExpression
+
+
+class CacheStats(NamedTuple):
+    """
+    Counters of an ExpressionCache.
+
+    Attributes:
+        hits: Lookups that returned a cached program.
+        misses: Lookups that found nothing (including expired entries).
+        evictions: Entries dropped because the cache was full.
+        expirations: Entries dropped because their TTL had passed.
+        size: Current number of entries.
+        maxsize: Maximum number of entries.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    maxsize: int
+
+
+class ExpressionCache:
+    """
+    A bounded, thread-safe LRU cache of compiled expressions.
+
+    Entries are keyed by the expression string. When the cache is full, the
+    least recently used entry is evicted. With a TTL, entries older than
+    `ttl` seconds are treated as missing and dropped on lookup.
+
+    Examples:
+        >>> cache = ExpressionCache(maxsize=2)
+        >>> cache.get("2 3 +") is None
+        True
+        >>> cache.stats().misses
+        1
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries; 0 disables caching.
+            ttl: Lifetime of an entry in seconds, or None for no expiry.
+
+        Raises:
+            ValueError: If maxsize is negative or ttl is not positive.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable) -> Optional[CompiledExpression]:
+        """
+        Look up a compiled program and mark it as recently used.
+
+        Args:
+            key: The cache key (usually the expression string).
+
+        Returns:
+            The cached program, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            program, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return program
+
+    def put(self, key: Hashable, program: CompiledExpression) -> None:
+        """
+        Store a compiled program, evicting the least recently used if full.
+
+        Args:
+            key: The cache key (usually the expression string).
+            program: The compiled program to store.
+        """
+        if self.maxsize == 0:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (program, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Get a snapshot of the cache counters.
+
+        Returns:
+            The current CacheStats.
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._expirations,
+                len(self._entries),
+                self.maxsize,
+            )
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+
+# Cache shared by all calculators that are not given their own.
+DEFAULT_CACHE = ExpressionCache()
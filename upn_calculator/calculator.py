@@ -1,15 +1,18 @@
 """UPN (Reverse Polish Notation) Stack-based Calculator implementation."""
 
-from typing import List
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional
 
-from .errors import (
-    EmptyStackError,
-    InsufficientOperandsError,
-    InvalidExpressionError,
-    InvalidTokenError,
-)
-from .operators import apply_operator
-from .parser import is_number, is_operator, tokenize
+from .cache import ExpressionCache
+from .compiler import CompiledExpression
+from .engine import UPNEngine
+from .errors import EmptyStackError
+from .operators import OperatorRegistry
+from .status import Outcome
+from .stream import DEFAULT_CHUNK_SIZE, evaluate_stream
+
+if TYPE_CHECKING:
+    from .numeric import NumericBackend
+    from .profiling import Profiler
 
 
 class UPNCalculator:
@@ -21,34 +24,94 @@ class UPNCalculator:
         - "2 3 +" evaluates to 5
         - "10 3 -" evaluates to 7
         - "2 3 + 4 *" evaluates to 20
+
+    The calculator is a stateful session: it keeps the stack used by push(),
+    pop(), peek() and get_stack(). Evaluation itself is delegated to an
+    UPNEngine and runs on a call-local stack, so results are correct even if
+    threads share a calculator; for concurrent use without the session
+    state, share a single UPNEngine instead.
     """
 
-    def __init__(self):
-        """Initialize the calculator with an empty stack."""
+    __slots__ = ("stack", "engine")
+
+    def __init__(
+        self,
+        cache: Optional[ExpressionCache] = None,
+        engine: Optional[UPNEngine] = None,
+        operators: Optional[OperatorRegistry] = None,
+        numeric: Optional["NumericBackend"] = None,
+        profiler: Optional["Profiler"] = None,
+    ):
+        """
+        Initialize the calculator with an empty stack.
+
+        Args:
+            cache: Cache for compiled expressions. Defaults to a cache shared
+                by all calculators; pass ExpressionCache(maxsize=0) to
+                disable caching. Ignored if `engine` is given.
+            engine: Engine used for evaluation; defaults to a new engine
+                using `cache` and `operators`.
+            operators: Operator registry with the operators the calculator
+                understands; defaults to OPERATORS. A calculator with its own
+                registry gets a private cache unless `cache` is given.
+                Ignored if `engine` is given.
+            numeric: Numeric backend: DecimalBackend(context) or
+                FractionBackend() for exact arithmetic; defaults to float.
+                Like `operators`, it implies a private cache. Ignored if
+                `engine` is given.
+            profiler: Collects per-phase timings, operator counts and
+                times, stack depths and errors of evaluate(); the calculator
+                then uses a ProfilingEngine with a private cache. Without
+                it, evaluation carries no instrumentation at all. Ignored if
+                `engine` is given.
+        """
         self.stack: List[float] = []
+        if engine is None:
+            if profiler is None:
+                engine = UPNEngine(cache, operators, numeric)
+            else:
+                from .profiling import ProfilingEngine
+
+                engine = ProfilingEngine(profiler, cache, operators, numeric)
+        self.engine = engine
 
-    def evaluate(self, expression: str) -> float:
+    @property
+    def cache(self) -> ExpressionCache:
+        """The expression cache of the calculator's engine."""
+        return self.engine.cache
+
+    def evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> float:
         """
         Evaluate a UPN expression and return the result.
 
         Algorithm:
-        1. Split expression into tokens
-        2. For each token:
-           - If number: push to stack
-           - If operator: pop 2 operands, apply operator, push result
-           - Otherwise: raise InvalidTokenError
-        3. After all tokens, stack must have exactly 1 element (the result)
+        1. Look up the compiled program in the cache; on a miss, compile it:
+           - Split expression into tokens
+           - Classify each token as number or operator, else raise
+             InvalidTokenError
+           - Check that every operator finds as many operands as its arity
+             and that exactly 1 element remains
+        2. Run the program: numbers are pushed, operators pop their operands
+           and push their results
 
         Args:
             expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings, e.g. an Environment; every bound name
+                may appear as an operand.
 
         Returns:
-            The result of the evaluation as a float.
+            The result of the evaluation as a float, or a Decimal or Fraction
+            with those numeric backends.
 
         Raises:
             InvalidTokenError: If an unknown token is encountered.
-            InsufficientOperandsError: If an operator has fewer than 2 operands.
+            InsufficientOperandsError: If an operator has fewer operands than
+                its arity.
             InvalidExpressionError: If the final stack size is not 1.
+            ZeroDivisionError: If a division by zero occurs.
+            ValueError: If a bound name is not a valid identifier.
 
         Examples:
             >>> calc = UPNCalculator()
@@ -60,35 +123,153 @@ class UPNCalculator:
             20.0
             >>> calc.evaluate("-5 3 +")
             -2.0
+            >>> calc.evaluate("x 2 *", {"x": 21.0})
+            42.0
         """
-        tokens = tokenize(expression)
-        self.stack = []  # Clear stack for new evaluation
-
-        for token in tokens:
-            if is_number(token):
-                self.stack.append(float(token))
-            elif is_operator(token):
-                if len(self.stack) < 2:
-                    msg = (
-                        f"Operator '{token}' requires 2 operands "
-                        f"but stack has {len(self.stack)}"
-                    )
-                    raise InsufficientOperandsError(msg)
-                b = self.stack.pop()
-                a = self.stack.pop()
-                result = apply_operator(a, b, token)
-                self.stack.append(result)
-            else:
-                raise InvalidTokenError(f"Unknown token: '{token}'")
+        stack = self.stack
+        stack.clear()  # Clear stack for new evaluation
+        result = self.engine.evaluate(expression, values)
+        stack.append(result)
+        return result
+
+    def try_evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> Outcome:
+        """
+        Evaluate a UPN expression, returning a status instead of raising.
+
+        Meant for hot loops over dirty data: a failed evaluation costs no
+        exception, and its message is only built when the Outcome's
+        message or error() is used. On success the result is left on the
+        stack as with evaluate().
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings; every bound name may appear as an
+                operand.
+
+        Returns:
+            The Outcome with the value and its Status.
+
+        Raises:
+            ValueError: If a bound name is not a valid identifier.
+
+        Examples:
+            >>> calc = UPNCalculator()
+            >>> outcome = calc.try_evaluate("2 3 +")
+            >>> outcome.ok, outcome.value
+            (True, 5.0)
+            >>> outcome = calc.try_evaluate("2 x +")
+            >>> outcome.status.name, outcome.offset
+            ('INVALID_TOKEN', 2)
+        """
+        stack = self.stack
+        stack.clear()  # Clear stack for new evaluation
+        outcome = self.engine.try_evaluate(expression, values)
+        if outcome.status == 0:
+            stack.append(outcome.value)
+        return outcome
+
+    def try_evaluate_many(
+        self,
+        expressions: Iterable[str],
+        values: Optional[Mapping[str, float]] = None,
+    ) -> List[Outcome]:
+        """
+        Evaluate many expressions, returning a status for each.
+
+        Like try_evaluate() for every expression, but the stack is left
+        unchanged.
+
+        Args:
+            expressions: The expressions to evaluate.
+            values: Variable bindings shared by all expressions.
+
+        Returns:
+            One Outcome per expression, in input order.
+
+        Raises:
+            ValueError: If a bound name is not a valid identifier.
 
-        if len(self.stack) != 1:
-            msg = (
-                f"Invalid expression: stack must have exactly 1 element, "
-                f"but has {len(self.stack)}"
-            )
-            raise InvalidExpressionError(msg)
+        Examples:
+            >>> outcomes = UPNCalculator().try_evaluate_many(["1 2 +", "1 0 /"])
+            >>> [o.status.name for o in outcomes]
+            ['OK', 'ZERO_DIVISION']
+        """
+        return self.engine.try_evaluate_many(expressions, values)
+
+    def evaluate_stream(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> float:
+        """
+        Evaluate a UPN program read incrementally from a stream.
+
+        Meant for machine-generated programs too large to hold as a string:
+        only the operand stack stays in memory while the source is consumed.
+
+        Args:
+            source: A file object (text or binary), str or bytes, or an
+                iterable of str or bytes chunks.
+            chunk_size: Number of characters or bytes per read() on files.
+
+        Returns:
+            The result of the evaluation as a float.
+
+        Raises:
+            InvalidTokenError: If an unknown token is encountered.
+            InsufficientOperandsError: If an operator has fewer operands than
+                its arity.
+            InvalidExpressionError: If the final stack size is not 1.
+            ZeroDivisionError: If a division by zero occurs.
 
-        return self.stack[0]
+        Examples:
+            >>> calc = UPNCalculator()
+            >>> calc.evaluate_stream(["2 3", " + 4 *"])
+            20.0
+        """
+        stack = self.stack
+        stack.clear()  # Clear stack for new evaluation
+        engine = self.engine
+        result = evaluate_stream(
+            source,
+            chunk_size=chunk_size,
+            operators=engine.operators,
+            numeric=engine.numeric,
+        )
+        stack.append(result)
+        return result
+
+    def compile(
+        self, expression: str, variables: Iterable[str] = ()
+    ) -> CompiledExpression:
+        """
+        Compile a UPN expression into a reusable program.
+
+        Use this when the same expression is evaluated many times: parsing,
+        validation and stack-depth checking happen once, and each call to
+        run() on the returned program only executes pre-resolved operations.
+        Programs are taken from and stored in the calculator's cache.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            variables: Names that may appear as operands; their values are
+                passed to run().
+
+        Returns:
+            An immutable CompiledExpression.
+
+        Raises:
+            InvalidTokenError: If an unknown token is encountered.
+            InsufficientOperandsError: If an operator has fewer operands than
+                its arity.
+            InvalidExpressionError: If the final stack size is not 1.
+            ValueError: If a variable name is not a valid identifier.
+
+        Examples:
+            >>> calc = UPNCalculator()
+            >>> program = calc.compile("2 3 + 4 *")
+            >>> program.run()
+            20.0
+        """
+        return self.engine.compile(expression, variables)
 
     def push(self, value: float) -> None:
         """
@@ -131,7 +312,7 @@ class UPNCalculator:
 
     def clear_stack(self) -> None:
         """Clear the stack."""
-        self.stack = []
+        self.stack.clear()
 
     def peek(self) -> float:
         """
@@ -0,0 +1,310 @@
+"""Command-line interface for bulk evaluation of expressions and column files."""
+
+import argparse
+import io
+import sys
+import time
+from typing import IO, Iterator, List, Optional, Sequence
+
+from . import __version__
+from .calculator import UPNCalculator
+from .errors import UPNCalculatorError
+from .parallel import DEFAULT_CHUNK_SIZE, ParallelEvaluator
+
+# Input is read in blocks of roughly this many bytes; output is written per block.
+BLOCK_SIZE = 1 << 20
+
+# Default of --chunk-rows; equal to mapped.DEFAULT_CHUNK_ROWS, which is not
+# imported unless column mode is used.
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+ERROR_COLUMNS = ("message", "type", "none")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the upn command."""
+    parser = argparse.ArgumentParser(
+        prog="upn",
+        description=(
+            "Evaluate newline-delimited UPN expressions. Writes one output line "
+            "per input line: the result, followed by an error column."
+        ),
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        metavar="FILE",
+        help="input files with one expression per line ('-' or none for stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="write results to FILE instead of stdout",
+    )
+    parser.add_argument(
+        "--error-column",
+        choices=ERROR_COLUMNS,
+        default="message",
+        help=(
+            "content of the error column: the error message (default), the "
+            "error type, or none to omit the column (failed lines stay empty)"
+        ),
+    )
+    parser.add_argument(
+        "-d",
+        "--delimiter",
+        default="\t",
+        help="separator between result and error column (default: tab)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="report expressions per second and latency percentiles on stderr",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1, evaluate in-process)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"expressions per worker task (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    columns = parser.add_argument_group(
+        "column mode",
+        "Evaluate one expression over memory-mapped float64 column files "
+        "instead of reading expressions; requires --expression and --output.",
+    )
+    columns.add_argument(
+        "-c",
+        "--column",
+        action="append",
+        default=[],
+        metavar="NAME=FILE",
+        help="bind variable NAME to the column file FILE (repeatable)",
+    )
+    columns.add_argument(
+        "-e",
+        "--expression",
+        metavar="EXPR",
+        help="the UPN expression to evaluate for every row",
+    )
+    columns.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"rows mapped per file at a time (default: {DEFAULT_CHUNK_ROWS})",
+    )
+    columns.add_argument(
+        "--on-zero-division",
+        choices=("raise", "nan"),
+        default="raise",
+        help="fail on the first division by zero (default) or write NaN",
+    )
+    columns.add_argument(
+        "--numpy",
+        action="store_true",
+        help="evaluate chunks with NumPy (must be installed)",
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    return parser
+
+
+def _read_blocks(files: Sequence[str]) -> Iterator[List[str]]:
+    """
+    Yield lists of input lines, read in large buffered blocks.
+
+    Bytes that are not valid UTF-8 are decoded as U+FFFD, so the line holding
+    them fails as an unknown token instead of aborting the run.
+    """
+    for path in files or ["-"]:
+        if path == "-":
+            buffer = getattr(sys.stdin, "buffer", None)
+            if buffer is None:
+                stream = sys.stdin
+            else:
+                stream = io.TextIOWrapper(buffer, encoding="utf-8", errors="replace")
+            close = False
+        else:
+            stream = open(
+                path, encoding="utf-8", errors="replace", buffering=BLOCK_SIZE
+            )
+            close = True
+        try:
+            while True:
+                lines = stream.readlines(BLOCK_SIZE)
+                if not lines:
+                    break
+                yield lines
+        finally:
+            if close:
+                stream.close()
+            elif stream is not sys.stdin:
+                # Leave sys.stdin.buffer open for the caller.
+                stream.detach()
+
+
+def _format_line(result, error_column: str, delimiter: str) -> str:
+    """Format one result (a float or an error) as an output line."""
+    if isinstance(result, UPNCalculatorError):
+        if error_column == "none":
+            return "\n"
+        if error_column == "type":
+            return f"{delimiter}{type(result).__name__}\n"
+        return f"{delimiter}{result}\n"
+    if error_column == "none":
+        return f"{result!r}\n"
+    return f"{result!r}{delimiter}\n"
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> int:
+    """Return the nearest-rank percentile of an ascending list."""
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def _print_stats(
+    count: int, errors: int, seconds: float, latencies: List[int], out: IO[str]
+) -> None:
+    """Print throughput and latency percentiles."""
+    rate = count / seconds if seconds > 0 else float("inf")
+    print(
+        f"{count} expressions ({errors} errors) in {seconds:.3f} s: "
+        f"{rate:,.0f} expressions/s",
+        file=out,
+    )
+    if latencies:
+        latencies.sort()
+        parts = [
+            f"p{label}={_percentile(latencies, fraction) / 1000:.1f}us"
+            for label, fraction in (("50", 0.5), ("90", 0.9), ("99", 0.99))
+        ]
+        parts.append(f"max={latencies[-1] / 1000:.1f}us")
+        print("latency: " + " ".join(parts), file=out)
+
+
+def _evaluate_lines(
+    calc: UPNCalculator, lines: List[str], latencies: Optional[List[int]]
+) -> list:
+    """Evaluate a block of lines, returning a float or an error per line."""
+    results = []
+    append = results.append
+    evaluate = calc.evaluate
+    clock = time.perf_counter_ns
+    for line in lines:
+        start = clock() if latencies is not None else 0
+        try:
+            append(evaluate(line))
+        except UPNCalculatorError as exc:
+            append(exc)
+        if latencies is not None:
+            latencies.append(clock() - start)
+    return results
+
+
+def _evaluate_columns(args: argparse.Namespace) -> int:
+    """Run column mode: evaluate --expression over the --column files."""
+    from .mapped import evaluate_mapped
+
+    inputs = {}
+    for binding in args.column:
+        name, _, path = binding.partition("=")
+        inputs[name] = path
+    start = time.perf_counter()
+    try:
+        rows = evaluate_mapped(
+            args.expression,
+            inputs,
+            args.output,
+            args.chunk_rows,
+            args.on_zero_division,
+            use_numpy=args.numpy,
+        )
+    except (UPNCalculatorError, ValueError, OSError, ImportError) as exc:
+        print(f"upn: {exc}", file=sys.stderr)
+        return 1
+    if args.stats:
+        seconds = time.perf_counter() - start
+        rate = rows / seconds if seconds > 0 else float("inf")
+        print(f"{rows} rows in {seconds:.3f} s: {rate:,.0f} rows/s", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the upn command.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        The process exit code: 0 on success, 1 if an input file cannot be read.
+        Lines that fail to evaluate are reported in the error column and do
+        not change the exit code. In column mode, any error ends the run
+        with exit code 1.
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be at least 1")
+    if args.column or args.expression is not None:
+        if not args.column or args.expression is None or not args.output:
+            parser.error("column mode needs --column, --expression and --output")
+        if args.files:
+            parser.error("column mode reads no expression files")
+        if any("=" not in binding for binding in args.column):
+            parser.error("--column must be given as NAME=FILE")
+        if args.chunk_rows < 1:
+            parser.error("--chunk-rows must be at least 1")
+        return _evaluate_columns(args)
+    # Open the output before starting workers, so a bad path leaves no pool.
+    try:
+        out = (
+            open(args.output, "w", encoding="utf-8", buffering=BLOCK_SIZE)
+            if args.output
+            else sys.stdout
+        )
+    except OSError as exc:
+        print(f"upn: {exc}", file=sys.stderr)
+        return 1
+    calc = UPNCalculator()
+    pool = (
+        ParallelEvaluator(args.workers, args.chunk_size) if args.workers > 1 else None
+    )
+    # Per-expression latency is only measurable when evaluating in-process.
+    latencies: Optional[List[int]] = [] if args.stats and pool is None else None
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        for lines in _read_blocks(args.files):
+            if pool is None:
+                results = _evaluate_lines(calc, lines, latencies)
+            else:
+                results = pool.evaluate(lines)
+            count += len(results)
+            chunk = []
+            for result in results:
+                if isinstance(result, UPNCalculatorError):
+                    errors += 1
+                chunk.append(_format_line(result, args.error_column, args.delimiter))
+            out.write("".join(chunk))
+    except OSError as exc:
+        print(f"upn: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if pool is not None:
+            pool.close()
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+    if args.stats:
+        _print_stats(count, errors, time.perf_counter() - start, latencies, sys.stderr)
+    return 0
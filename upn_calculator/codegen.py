@@ -0,0 +1,312 @@
+"""Code generation of compiled UPN programs into Python functions."""
+
+import math
+import operator
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+
+from .cache import ExpressionCache
+from .compiler import (
+    BINARY,
+    LOAD,
+    PUSH,
+    CompiledExpression,
+    operator_call,
+)
+from .engine import UPNEngine
+from .errors import UnboundVariableError, ZeroDivisionError
+from .operators import OperatorRegistry, divide
+
+if TYPE_CHECKING:
+    from .numeric import NumericBackend
+
+# Built-in operator functions that are written as Python operators, by id()
+# (operator functions need not be hashable).
+_INLINE = {
+    id(operator.add): "+",
+    id(operator.sub): "-",
+    id(operator.mul): "*",
+    id(divide): "/",
+}
+
+# Subexpressions nested deeper than this are stored in a local variable
+# first, to stay clear of the parser's limit on nested parentheses.
+MAX_NESTING = 32
+
+_NO_VALUES: Mapping[str, float] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class GeneratedExpression(CompiledExpression):
+    """
+    A compiled program that runs as a generated Python function.
+
+    It keeps the instructions of the program it was generated from, so it
+    can be used wherever a CompiledExpression is expected; only run() is
+    different.
+
+    Attributes:
+        python: The source code of the generated function.
+        function: The generated function; called with the variable bindings
+            (or None), it returns the result.
+    """
+
+    python: str = ""
+    function: Optional[Callable[..., Any]] = None
+
+    def run(self, values: Optional[Mapping[str, float]] = None) -> float:
+        """
+        Execute the program by calling the generated function.
+
+        Args:
+            values: Variable bindings, required if the program uses variables.
+
+        Returns:
+            The result of the evaluation.
+
+        Raises:
+            ZeroDivisionError: If a division by zero occurs.
+            UnboundVariableError: If a variable has no value in `values`.
+        """
+        return self.function(values)
+
+
+class _Operand(NamedTuple):
+    """A value on the generator's operand stack."""
+
+    # The Python expression computing the value.
+    text: str
+    # Nesting depth of operations in `text`.
+    nesting: int
+    # Whether evaluating `text` can neither fail nor have side effects, so
+    # it may happen later than in the program (literals and locals).
+    pure: bool
+    # The value of a constant operand, else None.
+    constant: Any = None
+
+
+class _Generator:
+    """Translates the instructions of one program into function source."""
+
+    def __init__(self) -> None:
+        """Initialize an empty function body."""
+        self.lines: List[str] = []
+        self.namespace: Dict[str, Any] = {}
+        self.stack: List[_Operand] = []
+        self._names: Dict[int, str] = {}
+        self._locals = 0
+
+    def bind(self, value: Any, prefix: str) -> str:
+        """Make a value available to the function as a global name."""
+        name = self._names.get(id(value))
+        if name is None:
+            name = self._names[id(value)] = f"_{prefix}{len(self._names)}"
+            self.namespace[name] = value
+        return name
+
+    def store(self, text: str) -> str:
+        """Assign an expression to a new local and return its name."""
+        name = f"t{self._locals}"
+        self._locals += 1
+        self.lines.append(f"{name} = {text}")
+        return name
+
+    def settle(self, end: int) -> None:
+        """
+        Store the operands below stack[end] that are not pure in locals.
+
+        Called before emitting a statement, so that operands the program
+        computes first are also computed first by the function.
+        """
+        stack = self.stack
+        for i in range(end):
+            if not stack[i].pure:
+                stack[i] = _Operand(self.store(stack[i].text), 0, True)
+
+    def push(self, operand: _Operand) -> None:
+        """Push an operand, storing it in a local if it nests too deeply."""
+        if operand.nesting > MAX_NESTING:
+            self.settle(len(self.stack))
+            operand = _Operand(self.store(operand.text), 0, True)
+        self.stack.append(operand)
+
+    def constant(self, value: Any) -> None:
+        """Push a constant, as a literal if it has one."""
+        if type(value) in (float, int) and math.isfinite(value):
+            text = repr(value)
+            if text.startswith("-"):
+                text = f"({text})"
+        else:
+            text = self.bind(value, "c")
+        self.push(_Operand(text, 0, True, value))
+
+    def inline(self, symbol: str) -> None:
+        """Apply a built-in operator to the top two operands."""
+        if symbol == "/":
+            divisor = self.stack[-1].constant
+            if divisor is None or divisor == 0:
+                # Check the divisor like divide() does; the operands have
+                # to be stored first so that it is computed only once.
+                self.settle(len(self.stack))
+                self.lines.append(f"if {self.stack[-1].text} == 0:")
+                self.lines.append('    raise _DivisionByZero("Division by zero")')
+        b = self.stack.pop()
+        a = self.stack.pop()
+        nesting = max(a.nesting, b.nesting) + 1
+        self.push(_Operand(f"({a.text} {symbol} {b.text})", nesting, False))
+
+    def call(self, function: Callable[..., Any], count: int, outputs: int) -> None:
+        """Apply an operator function to the top `count` operands."""
+        stack = self.stack
+        operands = stack[len(stack) - count :]
+        del stack[len(stack) - count :]
+        text = f"{self.bind(function, 'f')}({', '.join(o.text for o in operands)})"
+        if outputs == 1:
+            nesting = max((o.nesting for o in operands), default=0) + 1
+            self.push(_Operand(text, nesting, False))
+            return
+        self.settle(len(stack))
+        if outputs == 0:
+            self.lines.append(text)
+            return
+        names = [f"t{self._locals + i}" for i in range(outputs)]
+        self._locals += outputs
+        self.lines.append(f"{', '.join(names)} = {text}")
+        stack.extend(_Operand(name, 0, True) for name in names)
+
+
+def _translate(program: CompiledExpression) -> _Generator:
+    """Run the generator over the instructions of a program."""
+    generator = _Generator()
+    for opcode, arg, _ in program.code:
+        if opcode == PUSH:
+            generator.constant(arg)
+        elif opcode == LOAD:
+            generator.push(_Operand(f"values[{arg!r}]", 0, False))
+        elif opcode == BINARY and id(arg) in _INLINE:
+            generator.inline(_INLINE[id(arg)])
+        else:
+            generator.call(*operator_call(opcode, arg))
+    return generator
+
+
+def generate_function(program: CompiledExpression) -> GeneratedExpression:
+    """
+    Translate a program into a Python function.
+
+    Operands become nested Python expressions instead of stack slots, so
+    "x y + z *" runs as (values['x'] + values['y']) * values['z']. The
+    built-in operators are written as Python operators; every other
+    operator is called as a function. The function is compiled once with
+    compile(), and behaves like CompiledExpression.run(): operations run in
+    the same order, a zero divisor raises the calculator's
+    ZeroDivisionError, and missing variables raise UnboundVariableError.
+
+    Args:
+        program: A program from compile_expression(), possibly optimized or
+            specialized for a numeric backend.
+
+    Returns:
+        The program with a generated run().
+
+    Examples:
+        >>> from upn_calculator import compile_expression
+        >>> program = compile_expression("x y + z *", ["x", "y", "z"])
+        >>> generated = generate_function(program)
+        >>> print(generated.python.splitlines()[4])
+                return ((values['x'] + values['y']) * values['z'])
+        >>> generated.run({"x": 1, "y": 2, "z": 3})
+        9
+    """
+    generator = _translate(program)
+    if program.variables:
+        body = [*generator.lines, f"return {generator.stack[0].text}"]
+        lines = [
+            "def upn(values=None):",
+            "    if values is None:",
+            "        values = _NO_VALUES",
+            "    try:",
+            *(f"        {line}" for line in body),
+            "    except KeyError as exc:",
+            "        if exc.args and exc.args[0] in _VARIABLES:",
+            "            msg = f\"Variable '{exc.args[0]}' is not bound\"",
+            "            raise _UnboundVariable(msg) from None",
+            "        raise",
+        ]
+    else:
+        lines = [
+            "def upn(values=None):",
+            *(f"    {line}" for line in generator.lines),
+            f"    return {generator.stack[0].text}",
+        ]
+    python = "\n".join(lines) + "\n"
+    namespace = generator.namespace
+    namespace.update(
+        _NO_VALUES=_NO_VALUES,
+        _VARIABLES=frozenset(program.variables),
+        _DivisionByZero=ZeroDivisionError,
+        _UnboundVariable=UnboundVariableError,
+    )
+    exec(compile(python, "<upn>", "exec"), namespace)
+    return GeneratedExpression(
+        program.source,
+        program.code,
+        program.max_depth,
+        program.variables,
+        python,
+        namespace["upn"],
+    )
+
+
+class CodegenEngine(UPNEngine):
+    """
+    An evaluation engine that runs expressions as generated functions.
+
+    It behaves like UPNEngine, but every program it compiles is translated
+    with generate_function() on the cache miss, so later evaluations call
+    the cached function instead of interpreting instructions. Generating
+    costs more than compiling, so this pays off for expressions that are
+    evaluated many times. Its cache is always private.
+
+    Examples:
+        >>> from upn_calculator import UPNCalculator
+        >>> calc = UPNCalculator(engine=CodegenEngine())
+        >>> calc.evaluate("x y + z *", {"x": 1.0, "y": 2.0, "z": 3.0})
+        9.0
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        cache: Optional[ExpressionCache] = None,
+        operators: Optional[OperatorRegistry] = None,
+        numeric: Optional["NumericBackend"] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            cache: Cache for generated programs; defaults to a new private
+                cache.
+            operators: Operator registry; defaults to OPERATORS.
+            numeric: Numeric backend; defaults to float arithmetic.
+        """
+        super().__init__(
+            ExpressionCache() if cache is None else cache, operators, numeric
+        )
+
+    def _build(self, expression: str, names: FrozenSet[str]) -> CompiledExpression:
+        """Compile an expression and generate its function."""
+        return generate_function(super()._build(expression, names))
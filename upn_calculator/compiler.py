@@ -0,0 +1,318 @@
+"""Compilation of UPN expressions into reusable, pre-validated programs."""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple
+
+from .errors import (
+    InvalidExpressionError,
+    InvalidTokenError,
+    UnboundVariableError,
+)
+from .operators import OPERATORS, OperatorRegistry
+from .parser import NUMBER, OPERATOR, Token, is_number, scan
+
+# Opcodes of a compiled program. BINARY and UNARY are the fast paths for
+# operators with two or one operands and one result; APPLY covers the rest.
+PUSH = 0
+BINARY = 1
+LOAD = 2
+UNARY = 3
+APPLY = 4
+
+# An instruction is (opcode, argument, source token). The argument is the
+# pre-converted constant for PUSH, the operator function for BINARY and
+# UNARY, the variable name for LOAD, and (function, operand count, outputs)
+# for APPLY.
+Instruction = Tuple[int, Any, str]
+
+_NO_VALUES: Mapping[str, float] = MappingProxyType({})
+
+# Operand buffers reused by CompiledExpression.run(): a run takes one and
+# puts it back when done, so the pool holds one buffer per concurrent run.
+# Deeper programs get a buffer of their own, so a single huge program does
+# not pin its stack for the lifetime of the process.
+MAX_SHARED_DEPTH = 1024
+_buffers: List[List[Any]] = []
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledExpression:
+    """
+    An immutable, validated UPN program.
+
+    Parsing, token classification and stack-depth checking happen once in
+    compile_expression(); run() only executes the pre-resolved instructions.
+
+    Attributes:
+        source: The expression the program was compiled from.
+        code: The instructions in execution order.
+        max_depth: The maximum operand stack depth reached while running.
+        variables: Names of the variables the program reads, in order of
+            first use.
+    """
+
+    source: str
+    code: Tuple[Instruction, ...]
+    max_depth: int
+    variables: Tuple[str, ...] = ()
+
+    def run(self, values: Optional[Mapping[str, float]] = None) -> float:
+        """
+        Execute the program and return its result.
+
+        The operand stack is a buffer of max_depth slots reused across runs,
+        so a run allocates no stack of its own.
+
+        Args:
+            values: Variable bindings, required if the program uses variables.
+
+        Returns:
+            The result of the evaluation as a float.
+
+        Raises:
+            ZeroDivisionError: If a division by zero occurs.
+            UnboundVariableError: If a variable has no value in `values`.
+
+        Examples:
+            >>> compile_expression("2 3 + 4 *").run()
+            20.0
+            >>> compile_expression("x y +", variables=["x", "y"]).run(
+            ...     {"x": 2, "y": 3}
+            ... )
+            5
+        """
+        if values is None:
+            values = _NO_VALUES
+        max_depth = self.max_depth
+        if max_depth > MAX_SHARED_DEPTH:
+            stack = [None] * max_depth
+        else:
+            # A buffer from the pool is owned by this run until it is put
+            # back, so concurrent and nested runs never share one. pop() is
+            # atomic, but checking for an empty pool first would race with
+            # other threads on free-threaded builds.
+            try:
+                stack = _buffers.pop()
+            except IndexError:
+                stack = []
+            if len(stack) < max_depth:
+                stack.extend([None] * (max_depth - len(stack)))
+        # The top of the stack lives in the local `top`; the values below it
+        # are stack[1] to stack[sp], so the buffer is only written with index
+        # stores. stack[0] takes the placeholder pushed down by the first
+        # push.
+        sp = -1
+        top = None
+        try:
+            for opcode, arg, _ in self.code:
+                if opcode == BINARY:
+                    top = arg(stack[sp], top)
+                    sp -= 1
+                elif opcode == PUSH:
+                    sp += 1
+                    stack[sp] = top
+                    top = arg
+                elif opcode == LOAD:
+                    sp += 1
+                    stack[sp] = top
+                    top = values[arg]
+                elif opcode == UNARY:
+                    top = arg(top)
+                else:
+                    function, count, outputs = arg
+                    if count:
+                        operands = stack[sp - count + 2 : sp + 1]
+                        operands.append(top)
+                        sp -= count
+                        top = stack[sp + 1]
+                    else:
+                        operands = []
+                    if outputs == 1:
+                        results = (function(*operands),)
+                    else:
+                        results = function(*operands)
+                    for result in results:
+                        sp += 1
+                        stack[sp] = top
+                        top = result
+        except KeyError as exc:
+            if exc.args and exc.args[0] in self.variables:
+                msg = f"Variable '{exc.args[0]}' is not bound"
+                raise UnboundVariableError(msg) from None
+            raise
+        finally:
+            if max_depth <= MAX_SHARED_DEPTH:
+                _buffers.append(stack)
+        return top
+
+
+def apply_instruction(
+    stack: List[Any], arg: Tuple[Callable[..., Any], int, int]
+) -> None:
+    """
+    Execute an APPLY instruction on a stack.
+
+    Args:
+        stack: The operand stack, modified in place.
+        arg: The instruction's (function, operand count, outputs).
+    """
+    function, count, outputs = arg
+    if count:
+        operands = stack[-count:]
+        del stack[-count:]
+    else:
+        operands = []
+    if outputs == 1:
+        stack.append(function(*operands))
+    else:
+        stack.extend(function(*operands))
+
+
+def operator_call(opcode: int, arg: Any) -> Tuple[Callable[..., Any], int, int]:
+    """
+    Get the operator of a BINARY, UNARY or APPLY instruction.
+
+    Args:
+        opcode: The instruction's opcode.
+        arg: The instruction's argument.
+
+    Returns:
+        The operator's (function, operand count, outputs).
+    """
+    if opcode == BINARY:
+        return arg, 2, 1
+    if opcode == UNARY:
+        return arg, 1, 1
+    return arg
+
+
+def _check_variable_names(
+    variables: Iterable[str], operators: Optional[OperatorRegistry] = None
+) -> frozenset:
+    """
+    Validate variable names and return them as a set.
+
+    A variable name must be a Python identifier that is neither an operator
+    nor a numeric literal (such as "inf" or "nan").
+
+    Args:
+        variables: The names to check.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        The names as a frozenset.
+
+    Raises:
+        ValueError: If a name is not a valid variable name.
+    """
+    names = frozenset(variables)
+    table = (OPERATORS if operators is None else operators).table
+    for name in names:
+        if not name.isidentifier() or name in table or is_number(name):
+            raise ValueError(f"Invalid variable name: {name!r}")
+    return names
+
+
+def compile_expression(
+    expression: str,
+    variables: Iterable[str] = (),
+    operators: Optional[OperatorRegistry] = None,
+) -> CompiledExpression:
+    """
+    Parse and validate a UPN expression into a reusable program.
+
+    Raises the same errors as UPNCalculator.evaluate() for malformed input,
+    but all checks happen up front: a program that compiles can only fail
+    at run time with a division by zero or an unbound variable.
+
+    Args:
+        expression: A UPN expression string (e.g., "2 3 +").
+        variables: Names that may appear as operands; their values are
+            supplied when the program runs.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        The compiled program.
+
+    Raises:
+        InvalidTokenError: If an unknown token is encountered.
+        InsufficientOperandsError: If an operator has fewer operands than
+            its arity.
+        InvalidExpressionError: If the final stack size is not 1.
+        ValueError: If a variable name is not a valid identifier.
+
+    Examples:
+        >>> program = compile_expression("10 3 -")
+        >>> program.run()
+        7.0
+        >>> program.max_depth
+        2
+    """
+    return compile_tokens(expression, scan(expression, operators), variables, operators)
+
+
+def compile_tokens(
+    expression: str,
+    tokens: Iterable[Token],
+    variables: Iterable[str] = (),
+    operators: Optional[OperatorRegistry] = None,
+) -> CompiledExpression:
+    """
+    Validate already classified tokens into a program.
+
+    This is compile_expression() without the scanning, for callers that
+    tokenize and classify the expression themselves.
+
+    Args:
+        expression: The expression the tokens come from.
+        tokens: The tokens, classified with the same operator registry.
+        variables: Names that may appear as operands.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        The compiled program.
+
+    Raises:
+        InvalidTokenError: If an unknown token is encountered.
+        InsufficientOperandsError: If an operator has fewer operands than
+            its arity.
+        InvalidExpressionError: If the final stack size is not 1.
+        ValueError: If a variable name is not a valid identifier.
+    """
+    names = _check_variable_names(variables, operators) if variables else frozenset()
+    code = []
+    used = {}
+    depth = 0
+    max_depth = 0
+
+    for kind, text, _, value in tokens:
+        if kind == OPERATOR:
+            count = value.operand_count(depth)
+            outputs = value.outputs
+            if count == 2 and outputs == 1:
+                code.append((BINARY, value.function, text))
+            elif count == 1 and outputs == 1:
+                code.append((UNARY, value.function, text))
+            else:
+                code.append((APPLY, (value.function, count, outputs), text))
+            depth += outputs - count
+            if depth > max_depth:
+                max_depth = depth
+            continue
+        if kind == NUMBER:
+            code.append((PUSH, value, text))
+        elif text in names:
+            code.append((LOAD, text, text))
+            used[text] = None
+        else:
+            raise InvalidTokenError(f"Unknown token: '{text}'")
+        depth += 1
+        if depth > max_depth:
+            max_depth = depth
+
+    if depth != 1:
+        msg = f"Invalid expression: stack must have exactly 1 element, but has {depth}"
+        raise InvalidExpressionError(msg)
+
+    return CompiledExpression(expression, tuple(code), max_depth, tuple(used))
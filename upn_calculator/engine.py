@@ -0,0 +1,260 @@
+"""Stateless, thread-safe evaluation engine."""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from .cache import DEFAULT_CACHE, ExpressionCache
+from .compiler import CompiledExpression, _check_variable_names, compile_expression
+from .errors import UPNCalculatorError
+from .operators import OPERATORS, OperatorRegistry
+from .status import STATUS_CODES, Outcome, Status
+from .validation import _check
+
+if TYPE_CHECKING:
+    from .numeric import NumericBackend
+
+_NO_NAMES: FrozenSet[str] = frozenset()
+_new = tuple.__new__
+
+
+class UPNEngine:
+    """
+    A stateless evaluator that can be shared between threads.
+
+    Unlike UPNCalculator, the engine keeps no stack of its own: every
+    evaluation runs on a call-local operand stack, and the only shared state
+    is the lock-protected expression cache. One engine can therefore serve
+    any number of threads, including on free-threaded (no-GIL) builds.
+
+    Examples:
+        >>> engine = UPNEngine()
+        >>> engine.evaluate("2 3 + 4 *")
+        20.0
+    """
+
+    __slots__ = ("cache", "operators", "numeric")
+
+    def __init__(
+        self,
+        cache: Optional[ExpressionCache] = None,
+        operators: Optional[OperatorRegistry] = None,
+        numeric: Optional["NumericBackend"] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            cache: Cache for compiled expressions. Defaults to the cache
+                shared by all engines and calculators, or to a private cache
+                if `operators` or `numeric` is given.
+            operators: Operator registry; defaults to OPERATORS.
+            numeric: Numeric backend, e.g. DecimalBackend(); defaults to
+                float arithmetic.
+        """
+        if cache is None:
+            shared = operators is None and numeric is None
+            cache = DEFAULT_CACHE if shared else ExpressionCache()
+        self.cache = cache
+        self.operators = operators
+        self.numeric = numeric
+
+    def compile(
+        self, expression: str, variables: Iterable[str] = ()
+    ) -> CompiledExpression:
+        """
+        Compile an expression, using the cache.
+
+        Programs compiled with variables are cached per set of names. A
+        program cached under (expression, None), as Catalogue.preload()
+        stores them, serves every set of names that includes its variables.
+        With a numeric backend, the cached program is already specialized
+        for it.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            variables: Names that may appear as operands.
+
+        Returns:
+            The compiled program.
+
+        Raises:
+            InvalidTokenError: If an unknown token is encountered, or a
+                literal has no value in the numeric backend.
+            InsufficientOperandsError: If an operator has fewer operands than
+                its arity.
+            InvalidExpressionError: If the final stack size is not 1.
+            ValueError: If a variable name is not a valid identifier.
+        """
+        names = frozenset(variables)
+        key = (expression, names) if names else expression
+        program = self.cache.get(key)
+        if program is None:
+            program = self._preloaded(expression, names) if names else None
+            if program is None:
+                program = self._build(expression, names)
+            self.cache.put(key, program)
+        return program
+
+    def _preloaded(
+        self, expression: str, names: FrozenSet[str]
+    ) -> Optional[CompiledExpression]:
+        """Find a program cached for any names that include its variables."""
+        program = self.cache.get((expression, None))
+        if program is not None and names.issuperset(program.variables):
+            return program
+        return None
+
+    def _build(self, expression: str, names: FrozenSet[str]) -> CompiledExpression:
+        """Compile an expression on a cache miss."""
+        program = compile_expression(expression, names, self.operators)
+        if self.numeric is not None:
+            program = self.numeric.specialize(program)
+        return program
+
+    def evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> float:
+        """
+        Evaluate an expression on a call-local stack.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings, e.g. an Environment; every bound name
+                may appear as an operand.
+
+        Returns:
+            The result of the evaluation as a float, or in the number type
+            of the engine's numeric backend.
+
+        Raises:
+            InvalidTokenError: If an unknown token is encountered.
+            InsufficientOperandsError: If an operator has fewer operands than
+                its arity.
+            InvalidExpressionError: If the final stack size is not 1.
+            ZeroDivisionError: If a division by zero occurs.
+            ValueError: If a bound name is not a valid identifier.
+        """
+        if not values:
+            return self.compile(expression).run()
+        program = self.compile(expression, values)
+        if self.numeric is not None:
+            values = self._convert(program, values)
+        return program.run(values)
+
+    def _convert(
+        self, program: CompiledExpression, values: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        """Convert the values a program reads to the numeric backend's type."""
+        convert = self.numeric.convert
+        return {name: convert(values[name]) for name in program.variables}
+
+    def try_evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> Outcome:
+        """
+        Evaluate an expression, returning a status instead of raising.
+
+        Malformed expressions are found by a static check that records only
+        where it failed; no exception is created or raised for them, and
+        the error message is built only if the Outcome is asked for it.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings; every bound name may appear as an
+                operand.
+
+        Returns:
+            The Outcome: the value and Status.OK, or the status of the
+            error evaluate() would have raised.
+
+        Raises:
+            ValueError: If a bound name is not a valid identifier.
+
+        Examples:
+            >>> engine = UPNEngine()
+            >>> engine.try_evaluate("2 3 +")[:2]
+            (5.0, <Status.OK: 0>)
+            >>> engine.try_evaluate("1 0 /").status
+            <Status.ZERO_DIVISION: 4>
+        """
+        names = frozenset(values) if values else _NO_NAMES
+        key = (expression, names) if names else expression
+        program = self.cache.get(key)
+        if program is None:
+            program = self._try_compile(expression, names, key)
+            if type(program) is Outcome:
+                return program
+        return self._try_run(program, expression, values)
+
+    def _try_run(
+        self,
+        program: CompiledExpression,
+        expression: str,
+        values: Optional[Mapping[str, float]],
+    ) -> Outcome:
+        """Run a compiled program for try_evaluate() and build its Outcome."""
+        if values and self.numeric is not None:
+            values = self._convert(program, values)
+        try:
+            value = program.run(values)
+        except UPNCalculatorError as exc:
+            status = STATUS_CODES.get(type(exc), Status.ERROR)
+            return _new(Outcome, (None, status, expression, -1, exc))
+        return _new(Outcome, (value, Status.OK, expression, -1, None))
+
+    def _try_compile(
+        self, expression: str, names: FrozenSet[str], key: object
+    ) -> Union[CompiledExpression, Outcome]:
+        """
+        Compile and cache an expression on a cache miss of try_evaluate().
+
+        Returns:
+            The compiled program, or the Outcome of a malformed expression.
+        """
+        if names:
+            program = self._preloaded(expression, names)
+            if program is not None:
+                self.cache.put(key, program)
+                return program
+            _check_variable_names(names, self.operators)
+        table = (OPERATORS if self.operators is None else self.operators).table
+        status, index, detail, _ = _check(expression, table, names)
+        if status:
+            return _new(Outcome, (None, Status(status), expression, index, detail))
+        try:
+            program = self._build(expression, names)
+        except UPNCalculatorError as exc:
+            status = STATUS_CODES.get(type(exc), Status.ERROR)
+            return _new(Outcome, (None, status, expression, -1, exc))
+        self.cache.put(key, program)
+        return program
+
+    def try_evaluate_many(
+        self,
+        expressions: Iterable[str],
+        values: Optional[Mapping[str, float]] = None,
+    ) -> List[Outcome]:
+        """
+        Evaluate many expressions with try_evaluate().
+
+        Args:
+            expressions: The expressions to evaluate.
+            values: Variable bindings shared by all expressions.
+
+        Returns:
+            One Outcome per expression, in input order.
+
+        Raises:
+            ValueError: If a bound name is not a valid identifier.
+        """
+        try_evaluate = self.try_evaluate
+        return [try_evaluate(expression, values) for expression in expressions]
@@ -0,0 +1,178 @@
+"""Variable bindings and incremental re-evaluation of registered expressions."""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from .compiler import _check_variable_names
+from .parallel import Result
+from .planner import ExpressionPlan
+
+
+class Environment(MutableMapping):
+    """
+    Named variable bindings for evaluating expressions.
+
+    Names are checked when first bound: they must be identifiers that are
+    neither operators nor numeric literals. Pass an environment wherever
+    variable values are accepted, e.g. to UPNCalculator.evaluate().
+
+    Examples:
+        >>> from upn_calculator import UPNCalculator
+        >>> env = Environment(x=2.0, y=3.0)
+        >>> UPNCalculator().evaluate("x y * 1 +", env)
+        7.0
+    """
+
+    def __init__(self, values: Optional[Mapping[str, float]] = None, **kwargs: float):
+        """
+        Initialize the environment.
+
+        Args:
+            values: Initial bindings.
+            **kwargs: More initial bindings.
+
+        Raises:
+            ValueError: If a name is not a valid variable name.
+        """
+        self._values: Dict[str, float] = {}
+        self.update(values or {}, **kwargs)
+
+    def __getitem__(self, name: str) -> float:
+        """Return the value bound to a name."""
+        return self._values[name]
+
+    def __setitem__(self, name: str, value: float) -> None:
+        """Bind a value to a name."""
+        if name not in self._values:
+            _check_variable_names((name,))
+        self._values[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        """Remove a binding."""
+        del self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the bound names."""
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        """Return the number of bindings."""
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        """Return a representation showing the bindings."""
+        return f"{type(self).__name__}({self._values!r})"
+
+
+class ReactiveEnvironment(Environment):
+    """
+    An environment that keeps registered expressions up to date.
+
+    Registered expressions share one ExpressionPlan, and the value of every
+    subexpression is kept between calls. When bindings change, results()
+    recomputes only the operations that depend on a changed name and returns
+    all other results from the stored values. Not thread-safe.
+
+    Examples:
+        >>> env = ReactiveEnvironment(a=1.0, b=2.0)
+        >>> env.register("a 10 *")
+        0
+        >>> env.register("b 10 *")
+        1
+        >>> env.results()
+        [10.0, 20.0]
+        >>> env["b"] = 3.0
+        >>> env.results(), env.recomputed
+        ([10.0, 30.0], 2)
+    """
+
+    def __init__(self, values: Optional[Mapping[str, float]] = None, **kwargs: float):
+        """
+        Initialize the environment.
+
+        Args:
+            values: Initial bindings.
+            **kwargs: More initial bindings.
+
+        Raises:
+            ValueError: If a name is not a valid variable name.
+        """
+        self._plan = ExpressionPlan()
+        self._nodes: List[Any] = []
+        self._changed: Set[str] = set()
+        self.recomputed = 0
+        super().__init__(values, **kwargs)
+
+    def __setitem__(self, name: str, value: float) -> None:
+        """Bind a value to a name and mark its dependents as stale."""
+        super().__setitem__(name, value)
+        self._changed.add(name)
+
+    def __delitem__(self, name: str) -> None:
+        """Remove a binding and mark its dependents as stale."""
+        super().__delitem__(name)
+        self._changed.add(name)
+
+    def register(
+        self, expression: str, variables: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Register an expression to be kept up to date.
+
+        An expression that fails to compile is registered with its error as
+        its result.
+
+        Args:
+            expression: The UPN expression.
+            variables: Names that may appear as operands; defaults to the
+                names bound when the expression is registered.
+
+        Returns:
+            The position of the expression's result in results().
+
+        Raises:
+            ValueError: If a variable name is not a valid identifier.
+        """
+        return self._plan.add(
+            expression, self._values if variables is None else variables
+        )
+
+    @property
+    def plan(self) -> ExpressionPlan:
+        """The shared plan of the registered expressions."""
+        return self._plan
+
+    def refresh(self) -> int:
+        """
+        Recompute the operations affected by changes since the last refresh.
+
+        Returns:
+            The number of recomputed operations (also stored in `recomputed`).
+        """
+        changed, self._changed = self._changed, set()
+        self.recomputed = self._plan.update(self._nodes, self._values, changed)
+        return self.recomputed
+
+    def results(self) -> List[Result]:
+        """
+        Get the current results of all registered expressions.
+
+        Returns:
+            One float or UPNCalculatorError per expression, in registration
+            order.
+        """
+        self.refresh()
+        return self._plan.results(self._nodes)
+
+    def result(self, index: int) -> Result:
+        """
+        Get the current result of one registered expression.
+
+        Args:
+            index: The position returned by register().
+
+        Returns:
+            The result as a float, or the UPNCalculatorError it produced.
+        """
+        self.refresh()
+        return self._plan.result(self._nodes, index)
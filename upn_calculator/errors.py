@@ -35,3 +35,15 @@ class EmptyStackError(UPNCalculatorError):
     """Raised when trying to pop from an empty stack."""
 
     pass
+
+
+class UnboundVariableError(UPNCalculatorError):
+    """Raised when a variable is used without a bound value."""
+
+    pass
+
+
+class BytecodeError(UPNCalculatorError):
+    """Raised when a bytecode catalogue is malformed, corrupt or incompatible."""
+
+    pass
@@ -0,0 +1,468 @@
+"""Conversion of infix formulas into UPN programs (shunting-yard)."""
+
+import re
+from functools import lru_cache
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from .cache import ExpressionCache
+from .compiler import CompiledExpression, compile_tokens
+from .engine import UPNEngine
+from .errors import InvalidExpressionError, InvalidTokenError
+from .operators import OPERATORS, OperatorRegistry
+from .parser import NUMBER, OPERATOR, WORD, Token, _is_number_text
+
+# Binding strength and associativity of the infix operators: symbol ->
+# (level, right associative). Higher levels bind tighter. Registered
+# operators without an entry are written as function calls, e.g. sqrt(x).
+PRECEDENCE: Dict[str, Tuple[int, bool]] = {
+    "+": (1, False),
+    "-": (1, False),
+    "*": (2, False),
+    "/": (2, False),
+}
+
+# Level of the prefix operators - and +: tighter than * and /, so -a * b is
+# (-a) * b, but looser than operators registered with a higher level, so
+# -2 ^ 2 is -(2 ^ 2) with a power operator at level 4.
+UNARY_PRECEDENCE = 3
+
+# Literals are matched loosely and checked by float(); names and operator
+# symbols are looked up in the registry.
+_LITERAL = r"[\d.][\d_.]*(?:[eE][+-]?[\d_]+)?"
+_NAME = r"[^\W\d]\w*"
+_PUNCTUATION = "(),"
+
+# Entries of the operator stack: an open parenthesis, a function call (with
+# its argument count), a binary operator and a prefix minus (with the
+# output length when it was read).
+_PAREN = 0
+_CALL = 1
+_BINARY = 2
+_NEGATE = 3
+
+_MINUS_ONE = "-1"
+
+
+@lru_cache(maxsize=32)
+def _lexer(symbols: Tuple[str, ...]) -> Pattern:
+    """Build the token pattern for the given non-identifier symbols."""
+    ordered = sorted(symbols, key=len, reverse=True)
+    alternatives = "".join(re.escape(symbol) + "|" for symbol in ordered)
+    return re.compile(rf"{_LITERAL}|{_NAME}|{alternatives}\S")
+
+
+def _unexpected(text: str, offset: int) -> InvalidExpressionError:
+    """Create the error for a token that does not fit the grammar."""
+    return InvalidExpressionError(
+        f"Invalid expression: unexpected '{text}' at offset {offset}"
+    )
+
+
+def infix_tokens(
+    expression: str,
+    operators: Optional[OperatorRegistry] = None,
+    precedence: Optional[Mapping[str, Tuple[int, bool]]] = None,
+) -> List[Token]:
+    """
+    Convert an infix formula into UPN tokens with the shunting-yard algorithm.
+
+    Operands are numbers and variable names; binary operators are the
+    registered operators listed in `precedence`. Other registered operators
+    with a fixed arity and one result are called like functions, e.g.
+    max(a, b). A prefix - negates its operand (a literal directly, anything
+    else by multiplying with -1); a prefix + is ignored.
+
+    Args:
+        expression: An infix formula (e.g., "(a + b) * c").
+        operators: Operator registry; defaults to OPERATORS.
+        precedence: Level and associativity of the binary operators;
+            defaults to PRECEDENCE.
+
+    Returns:
+        The tokens in UPN order, classified as by scan(), so they can be
+        passed to compile_tokens(). Their offsets point into `expression`.
+
+    Raises:
+        InvalidTokenError: If a character is neither part of an operand, an
+            operator nor a parenthesis or comma.
+        InvalidExpressionError: If the formula is malformed, e.g. has
+            unbalanced parentheses, two operands in a row, or a function
+            call with the wrong number of arguments.
+
+    Examples:
+        >>> [t.text for t in infix_tokens("(a + b) * c")]
+        ['a', 'b', '+', 'c', '*']
+        >>> [t.text for t in infix_tokens("10 - 4 - -3")]
+        ['10', '4', '-', '-3', '-']
+    """
+    table = (OPERATORS if operators is None else operators).table
+    get_operator = table.get
+    if precedence is None:
+        precedence = PRECEDENCE
+    texts = _lexer(tuple(s for s in table if not s.isidentifier())).findall(expression)
+    find = expression.find
+    new = tuple.__new__
+    output: List[Token] = []
+    emit = output.append
+    pending: List[tuple] = []
+    push = pending.append
+    operand = True
+    calling = False
+    end = 0
+
+    for text in texts:
+        offset = find(text, end)
+        end = offset + len(text)
+        if calling:
+            if text != "(":
+                name = pending[-1][1].text
+                msg = f"Invalid expression: expected '(' after '{name}'"
+                raise InvalidExpressionError(msg)
+            calling = False
+            continue
+        op = get_operator(text)
+
+        if op is None and text not in _PUNCTUATION:
+            # An operand: a literal, inf or nan, or a variable name.
+            if text.isidentifier():
+                if _is_number_text(text):
+                    token = new(Token, (NUMBER, text, offset, float(text)))
+                else:
+                    token = new(Token, (WORD, text, offset, None))
+            else:
+                try:
+                    token = new(Token, (NUMBER, text, offset, float(text)))
+                except ValueError:
+                    raise InvalidTokenError(f"Unknown token: '{text}'") from None
+            if not operand:
+                raise _unexpected(text, offset)
+            emit(token)
+            operand = False
+            continue
+
+        if operand:
+            if op is not None:
+                if text == "-":
+                    token = new(Token, (OPERATOR, text, offset, op))
+                    push((_NEGATE, token, len(output)))
+                elif text in precedence or op.arity is None or op.outputs != 1:
+                    if text != "+":
+                        raise _unexpected(text, offset)
+                else:
+                    push((_CALL, new(Token, (OPERATOR, text, offset, op)), [0]))
+                    calling = True
+                continue
+            if text == "(":
+                push((_PAREN, None, 0))
+                continue
+            # Only the call of a function without arguments may close where
+            # an operand is expected.
+            if text != ")" or not pending or pending[-1][0] != _CALL:
+                raise _unexpected(text, offset)
+            _, call, args = pending.pop()
+            if args[0] or call.value.arity:
+                raise _unexpected(text, offset)
+            emit(call)
+            operand = False
+            continue
+
+        if op is not None:
+            if text not in precedence:
+                raise _unexpected(text, offset)
+            if op.arity != 2 or op.outputs != 1:
+                msg = f"Invalid expression: '{text}' is not a binary operator"
+                raise InvalidExpressionError(msg)
+            level, right = precedence[text]
+            # Pop the operators that bind at least as tightly; with a right
+            # associative operator, only those that bind tighter.
+            while pending:
+                kind, top, extra = pending[-1]
+                if kind == _BINARY:
+                    if extra < level or (extra == level and right):
+                        break
+                    emit(top)
+                    pending.pop()
+                elif kind == _NEGATE and UNARY_PRECEDENCE >= level:
+                    _pop(pending, output, table)
+                else:
+                    break
+            push((_BINARY, new(Token, (OPERATOR, text, offset, op)), level))
+            operand = True
+            continue
+
+        if text == "(":
+            raise _unexpected(text, offset)
+        # ")" or ",": close the innermost parenthesis or argument.
+        while pending and pending[-1][0] >= _BINARY:
+            _pop(pending, output, table)
+        if not pending:
+            raise _unexpected(text, offset)
+        kind, call, args = pending[-1]
+        if text == ",":
+            if kind != _CALL:
+                raise _unexpected(text, offset)
+            args[0] += 1
+            operand = True
+            continue
+        pending.pop()
+        if kind == _CALL:
+            count = args[0] + 1
+            arity = call.value.arity
+            if count != arity:
+                word = "argument" if arity == 1 else "arguments"
+                raise InvalidExpressionError(
+                    f"Invalid expression: '{call.text}' takes {arity} {word} "
+                    f"but got {count}"
+                )
+            emit(call)
+
+    if operand or calling:
+        raise InvalidExpressionError("Invalid expression: unexpected end of input")
+    while pending:
+        if pending[-1][0] < _BINARY:
+            raise InvalidExpressionError("Invalid expression: missing ')'")
+        _pop(pending, output, table)
+    return output
+
+
+def _pop(pending: List[tuple], output: List[Token], table: Mapping) -> None:
+    """Move the top of the operator stack to the output."""
+    kind, token, mark = pending.pop()
+    if kind == _BINARY:
+        output.append(token)
+        return
+    # A negated literal becomes a negative literal; anything else is
+    # multiplied with -1, which keeps the sign of zeros and infinities.
+    last = output[-1]
+    if len(output) == mark + 1 and last.kind == NUMBER:
+        text = last.text[1:] if last.text[0] == "-" else "-" + last.text
+        output[-1] = Token(NUMBER, text, token.offset, -last.value)
+        return
+    multiply = table.get("*")
+    if multiply is None or multiply.arity != 2:
+        raise InvalidExpressionError(
+            "Invalid expression: negation requires the operator '*'"
+        )
+    output.append(Token(NUMBER, _MINUS_ONE, token.offset, -1.0))
+    output.append(Token(OPERATOR, "*", token.offset, multiply))
+
+
+def to_upn(
+    expression: str,
+    operators: Optional[OperatorRegistry] = None,
+    precedence: Optional[Mapping[str, Tuple[int, bool]]] = None,
+) -> str:
+    """
+    Convert an infix formula into a UPN expression string.
+
+    Args:
+        expression: An infix formula (e.g., "(a + b) * c").
+        operators: Operator registry; defaults to OPERATORS.
+        precedence: Level and associativity of the binary operators;
+            defaults to PRECEDENCE.
+
+    Returns:
+        The UPN expression, tokens separated by single spaces.
+
+    Raises:
+        InvalidTokenError: If the formula contains an unknown character.
+        InvalidExpressionError: If the formula is malformed.
+
+    Examples:
+        >>> to_upn("2 * (3 + 4) - x / 2")
+        '2 3 4 + * x 2 / -'
+    """
+    return " ".join(
+        [token.text for token in infix_tokens(expression, operators, precedence)]
+    )
+
+
+def compile_infix(
+    expression: str,
+    variables: Iterable[str] = (),
+    operators: Optional[OperatorRegistry] = None,
+    precedence: Optional[Mapping[str, Tuple[int, bool]]] = None,
+) -> CompiledExpression:
+    """
+    Compile an infix formula into a program.
+
+    The converted tokens go straight to compile_tokens(), without building
+    and scanning a UPN string. The program's source is the equivalent UPN
+    expression, so it can be cached and stored like any other program.
+
+    Args:
+        expression: An infix formula (e.g., "(a + b) * c").
+        variables: Names that may appear as operands.
+        operators: Operator registry; defaults to OPERATORS.
+        precedence: Level and associativity of the binary operators;
+            defaults to PRECEDENCE.
+
+    Returns:
+        The compiled program.
+
+    Raises:
+        InvalidTokenError: If the formula contains an unknown character or
+            a name that is not in `variables`.
+        InvalidExpressionError: If the formula is malformed.
+        ValueError: If a variable name is not a valid identifier.
+
+    Examples:
+        >>> program = compile_infix("(a + b) * c", ["a", "b", "c"])
+        >>> program.source
+        'a b + c *'
+        >>> program.run({"a": 1.0, "b": 2.0, "c": 4.0})
+        12.0
+    """
+    tokens = infix_tokens(expression, operators, precedence)
+    source = " ".join([token.text for token in tokens])
+    return compile_tokens(source, tokens, variables, operators)
+
+
+class InfixConverter:
+    """
+    Evaluates infix formulas through a cache of compiled programs.
+
+    Each distinct formula (per set of variable names) is converted and
+    compiled once; repeated formulas, as in feeds that send the same
+    formula for many records, only run the cached program. The engine
+    supplies the operator registry and numeric backend.
+
+    Examples:
+        >>> converter = InfixConverter()
+        >>> converter.evaluate("(a + b) * c", {"a": 1.0, "b": 2.0, "c": 4.0})
+        12.0
+        >>> converter.to_upn("1 - 2 - 3")
+        '1 2 - 3 -'
+    """
+
+    def __init__(
+        self,
+        engine: Optional[UPNEngine] = None,
+        precedence: Optional[Mapping[str, Tuple[int, bool]]] = None,
+        cache: Optional[ExpressionCache] = None,
+    ):
+        """
+        Initialize a converter.
+
+        Args:
+            engine: Provides the operator registry and numeric backend;
+                defaults to a new UPNEngine.
+            precedence: Level and associativity of the binary operators;
+                defaults to PRECEDENCE.
+            cache: Cache for the compiled formulas; defaults to a new
+                private cache, since formulas and UPN expressions must not
+                share entries.
+        """
+        self.engine = UPNEngine() if engine is None else engine
+        self.precedence = PRECEDENCE if precedence is None else precedence
+        self.cache = ExpressionCache() if cache is None else cache
+
+    def to_upn(self, expression: str) -> str:
+        """
+        Convert an infix formula into a UPN expression string.
+
+        Args:
+            expression: An infix formula.
+
+        Returns:
+            The UPN expression.
+
+        Raises:
+            InvalidTokenError: If the formula contains an unknown character.
+            InvalidExpressionError: If the formula is malformed.
+        """
+        return to_upn(expression, self.engine.operators, self.precedence)
+
+    def compile(
+        self, expression: str, variables: Iterable[str] = ()
+    ) -> CompiledExpression:
+        """
+        Compile an infix formula, using the cache.
+
+        Args:
+            expression: An infix formula (e.g., "(a + b) * c").
+            variables: Names that may appear as operands.
+
+        Returns:
+            The compiled program, specialized for the engine's numeric
+            backend.
+
+        Raises:
+            InvalidTokenError: If the formula contains an unknown character
+                or a name that is not a variable.
+            InvalidExpressionError: If the formula is malformed.
+            ValueError: If a variable name is not a valid identifier.
+        """
+        names = frozenset(variables)
+        key = (expression, names) if names else expression
+        program = self.cache.get(key)
+        if program is None:
+            program = self._build(expression, names)
+            self.cache.put(key, program)
+        return program
+
+    def _build(self, expression: str, names: FrozenSet[str]) -> CompiledExpression:
+        """Convert and compile a formula on a cache miss."""
+        engine = self.engine
+        program = compile_infix(expression, names, engine.operators, self.precedence)
+        if engine.numeric is not None:
+            program = engine.numeric.specialize(program)
+        return program
+
+    def evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> float:
+        """
+        Evaluate an infix formula.
+
+        Args:
+            expression: An infix formula (e.g., "(a + b) * c").
+            values: Variable bindings; every bound name may appear as an
+                operand.
+
+        Returns:
+            The result, in the number type of the engine's numeric backend.
+
+        Raises:
+            InvalidTokenError: If the formula contains an unknown character
+                or an unbound name.
+            InvalidExpressionError: If the formula is malformed.
+            ZeroDivisionError: If a division by zero occurs.
+            ValueError: If a bound name is not a valid identifier.
+        """
+        if not values:
+            return self.compile(expression).run()
+        program = self.compile(expression, values)
+        if self.engine.numeric is not None:
+            values = self.engine._convert(program, values)
+        return program.run(values)
+
+    def evaluate_many(
+        self,
+        expressions: Iterable[str],
+        values: Optional[Mapping[str, float]] = None,
+    ) -> List[float]:
+        """
+        Evaluate many infix formulas.
+
+        Args:
+            expressions: The formulas to evaluate.
+            values: Variable bindings shared by all formulas.
+
+        Returns:
+            One result per formula, in input order.
+
+        Raises:
+            UPNCalculatorError: The first error evaluate() raises.
+        """
+        evaluate = self.evaluate
+        return [evaluate(expression, values) for expression in expressions]
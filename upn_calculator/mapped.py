@@ -0,0 +1,253 @@
+"""Evaluation of UPN formulas over memory-mapped float64 column files."""
+
+import mmap
+import os
+from array import array
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from .batch import evaluate_batch
+from .compiler import CompiledExpression, compile_expression
+from .errors import UnboundVariableError, ZeroDivisionError
+from .operators import OperatorRegistry
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Bytes per value: column files hold float64 values in native byte order.
+ITEMSIZE = 8
+
+# Rows mapped per column at a time (512 KiB per column).
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+# Chunks start at multiples of this many rows, so every window of a file is
+# mapped at an offset mmap accepts.
+_ROW_ALIGNMENT = mmap.ALLOCATIONGRANULARITY // ITEMSIZE
+
+
+def write_column(
+    path: PathLike, values: Iterable[float], chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> int:
+    """
+    Write values to a column file.
+
+    The values are converted and written in chunks, so any iterable can be
+    written without holding it in memory.
+
+    Args:
+        path: The file to create or overwrite.
+        values: The values, in row order.
+        chunk_rows: Values converted per write.
+
+    Returns:
+        The number of rows written.
+
+    Examples:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "x.f64")
+        >>> write_column(path, [1.0, 2.5])
+        2
+        >>> os.path.getsize(path)
+        16
+    """
+    rows = 0
+    iterator = iter(values)
+    with open(path, "wb") as file:
+        while True:
+            chunk = array("d", islice(iterator, chunk_rows))
+            if not chunk:
+                return rows
+            chunk.tofile(file)
+            rows += len(chunk)
+
+
+def _column_rows(file: BinaryIO, name: str) -> int:
+    """Get the number of rows of an open column file."""
+    size = os.fstat(file.fileno()).st_size
+    if size % ITEMSIZE:
+        raise ValueError(
+            f"Column '{name}' is not a float64 file: "
+            f"{size} bytes is not a multiple of {ITEMSIZE}"
+        )
+    return size // ITEMSIZE
+
+
+def _map_rows(
+    file: BinaryIO, start: int, stop: int, access: int
+) -> Tuple[mmap.mmap, memoryview]:
+    """Map rows start to stop of a column file; start must be aligned."""
+    mapping = mmap.mmap(
+        file.fileno(), (stop - start) * ITEMSIZE, access=access, offset=start * ITEMSIZE
+    )
+    return mapping, memoryview(mapping).cast("d")
+
+
+def _unmap(windows: Iterable[Tuple[mmap.mmap, memoryview]]) -> None:
+    """Release mapped windows."""
+    for mapping, view in windows:
+        try:
+            view.release()
+            mapping.close()
+        except BufferError:
+            # An error traceback still references arrays on the window; the
+            # mapping is closed when they are collected.
+            pass
+
+
+def evaluate_mapped(
+    expression: Union[str, CompiledExpression],
+    inputs: Mapping[str, PathLike],
+    output: PathLike,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_zero_division: str = "raise",
+    operators: Optional[OperatorRegistry] = None,
+    use_numpy: bool = False,
+) -> int:
+    """
+    Evaluate one UPN expression over column files into a result file.
+
+    Each variable of the expression is bound to the input file of the same
+    name. Column files are flat float64 values in native byte order, the
+    layout of array("d").tofile() and numpy.ndarray.tofile(). The files are
+    processed in chunks: for every chunk, a window of each input and of the
+    output file is mapped with mmap, and evaluate_batch() runs on memoryviews
+    of the windows without copying the inputs. Only one chunk per file is
+    mapped at a time, so resident memory stays bounded however large the
+    files are.
+
+    Args:
+        expression: A UPN expression with named variables, or a program
+            compiled with those variables.
+        inputs: Column files by variable name; all must have the same number
+            of rows.
+        output: The result file, created or overwritten with one float64
+            value per row.
+        chunk_rows: Rows per chunk, rounded up to a multiple of the rows in
+            mmap.ALLOCATIONGRANULARITY bytes.
+        on_zero_division: "raise" raises ZeroDivisionError naming the first
+            row that divides by zero; "nan" writes NaN for such rows.
+        operators: Operator registry; defaults to OPERATORS.
+        use_numpy: Evaluate each chunk with the operators' NumPy kernels on
+            arrays that share memory with the windows. NumPy must be
+            installed.
+
+    Returns:
+        The number of rows written.
+
+    Raises:
+        ValueError: If the policy is unknown, there are no inputs, or the
+            input files are not float64 files of equal length.
+        UnboundVariableError: If a variable has no input file.
+        ZeroDivisionError: If a row divides by zero under the "raise" policy;
+            the output file then holds the rows of the preceding chunks.
+        OSError: If a file cannot be opened or mapped.
+
+    Examples:
+        >>> import os, tempfile
+        >>> from array import array
+        >>> folder = tempfile.mkdtemp()
+        >>> x, y, out = (os.path.join(folder, n) for n in ("x", "y", "out"))
+        >>> write_column(x, [1.0, 2.0]), write_column(y, [3.0, 4.0])
+        (2, 2)
+        >>> evaluate_mapped("x y + 2 *", {"x": x, "y": y}, out)
+        2
+        >>> with open(out, "rb") as file:
+        ...     array("d", file.read())
+        array('d', [8.0, 12.0])
+    """
+    if on_zero_division not in ("raise", "nan"):
+        raise ValueError(f"Unknown division-by-zero policy: {on_zero_division!r}")
+    if not inputs:
+        raise ValueError("At least one input column is required")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1")
+    chunk_rows = -(-chunk_rows // _ROW_ALIGNMENT) * _ROW_ALIGNMENT
+
+    if isinstance(expression, CompiledExpression):
+        program = expression
+    else:
+        program = compile_expression(expression, inputs.keys(), operators)
+    for name in program.variables:
+        if name not in inputs:
+            raise UnboundVariableError(f"Variable '{name}' is not bound")
+    numpy = None
+    if use_numpy:
+        import numpy
+
+    files: Dict[str, BinaryIO] = {}
+    try:
+        for name in program.variables:
+            files[name] = open(inputs[name], "rb")
+        lengths = {_column_rows(files[name], name) for name in files}
+        for name in inputs.keys() - files.keys():
+            with open(inputs[name], "rb") as file:
+                lengths.add(_column_rows(file, name))
+        if len(lengths) != 1:
+            raise ValueError("All input columns must have the same length")
+        rows = lengths.pop()
+
+        with open(output, "w+b") as result_file:
+            result_file.truncate(rows * ITEMSIZE)
+            for start in range(0, rows, chunk_rows):
+                stop = min(start + chunk_rows, rows)
+                _evaluate_chunk(
+                    program,
+                    files,
+                    result_file,
+                    start,
+                    stop,
+                    on_zero_division,
+                    operators,
+                    numpy,
+                )
+    finally:
+        for file in files.values():
+            file.close()
+    return rows
+
+
+def _evaluate_chunk(
+    program: CompiledExpression,
+    files: Mapping[str, BinaryIO],
+    result_file: BinaryIO,
+    start: int,
+    stop: int,
+    policy: str,
+    operators: Optional[OperatorRegistry],
+    numpy: Any,
+) -> None:
+    """Evaluate rows start to stop of the column files into the result file."""
+    windows = [
+        _map_rows(file, start, stop, mmap.ACCESS_READ) for file in files.values()
+    ]
+    try:
+        target = _map_rows(result_file, start, stop, mmap.ACCESS_WRITE)
+    except BaseException:
+        _unmap(windows)
+        raise
+    windows.append(target)
+    try:
+        # A constant expression reads no column; the output window gives
+        # evaluate_batch() the number of rows to broadcast it to.
+        views = {name: view for name, (_, view) in zip(files, windows)}
+        if not views:
+            views[""] = target[1]
+        if numpy is None:
+            columns: Dict[str, Any] = views
+        else:
+            columns = {name: numpy.frombuffer(view) for name, view in views.items()}
+        # Evaluate with a mask to find the first failing row of the file.
+        mode = "nan" if policy == "nan" else "mask"
+        result = evaluate_batch(program, columns, mode, operators)
+        mask = result.mask
+        if mask is not None:
+            if numpy is None:
+                first = mask.index(1) if 1 in mask else -1
+            else:
+                first = int(mask.argmax()) if mask.any() else -1
+            if first >= 0:
+                raise ZeroDivisionError(f"Division by zero in row {start + first}")
+        target[1][:] = result.values
+        # Drop the arrays on the windows before unmapping them.
+        del views, columns, result, mask
+    finally:
+        _unmap(windows)
@@ -0,0 +1,223 @@
+"""Numeric backends: float, decimal and rational arithmetic."""
+
+import decimal
+import operator
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from fractions import Fraction
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from .compiler import APPLY, BINARY, PUSH, UNARY, CompiledExpression
+from .errors import InvalidTokenError, ZeroDivisionError
+from .operators import divide
+
+
+class NumericBackend(ABC):
+    """
+    The number type a calculator computes with.
+
+    A backend does its work when a program is compiled: specialize() turns
+    every literal into the backend's number type and binds the built-in
+    operators to the backend's arithmetic, so the run loop stays free of
+    per-operation type checks. Custom operators receive and must return
+    the backend's numbers.
+
+    Attributes:
+        name: Short name of the backend.
+        functions: Replacements for the functions of the built-in operators
+            (+, -, *, /), by the function they replace.
+    """
+
+    name = ""
+    functions: Mapping[Callable[..., Any], Callable[..., Any]] = MappingProxyType({})
+
+    @abstractmethod
+    def number(self, text: str) -> Any:
+        """
+        Convert a numeric literal.
+
+        Args:
+            text: The literal as written in the expression.
+
+        Returns:
+            Its value in the backend's number type.
+
+        Raises:
+            InvalidTokenError: If the literal has no value in this type.
+        """
+
+    @abstractmethod
+    def convert(self, value: Any) -> Any:
+        """
+        Convert a variable value to the backend's number type.
+
+        Args:
+            value: The bound value.
+
+        Returns:
+            The value in the backend's number type.
+        """
+
+    def specialize(self, program: CompiledExpression) -> CompiledExpression:
+        """
+        Rewrite a float program to compute with this backend.
+
+        Args:
+            program: A program from compile_expression().
+
+        Returns:
+            An equivalent program whose constants and built-in operators use
+            the backend's number type.
+
+        Raises:
+            InvalidTokenError: If a literal has no value in this type.
+        """
+        functions = self.functions
+        code = []
+        for opcode, arg, token in program.code:
+            if opcode == PUSH:
+                arg = self.number(token)
+            elif opcode == BINARY or opcode == UNARY:
+                arg = functions.get(arg, arg)
+            elif opcode == APPLY:
+                arg = (functions.get(arg[0], arg[0]),) + arg[1:]
+            code.append((opcode, arg, token))
+        return CompiledExpression(
+            program.source, tuple(code), program.max_depth, program.variables
+        )
+
+    def __repr__(self) -> str:
+        """Return a representation naming the backend."""
+        return f"{type(self).__name__}()"
+
+
+class FloatBackend(NumericBackend):
+    """Binary floating point, the default: programs run unchanged."""
+
+    name = "float"
+
+    def number(self, text: str) -> float:
+        """Convert a numeric literal to float."""
+        return float(text)
+
+    def convert(self, value: Any) -> Any:
+        """Return the value unchanged."""
+        return value
+
+    def specialize(self, program: CompiledExpression) -> CompiledExpression:
+        """Return the program unchanged."""
+        return program
+
+
+class DecimalBackend(NumericBackend):
+    """
+    Decimal arithmetic with a configurable context.
+
+    Literals are converted exactly; every operation rounds its result with
+    the backend's context (precision, rounding mode and traps), regardless
+    of the context of the calling thread. Division by zero raises the
+    calculator's ZeroDivisionError as with floats; other conditions the
+    context traps, such as Infinity minus Infinity, raise the decimal
+    module's signal.
+
+    Examples:
+        >>> import decimal
+        >>> from upn_calculator import UPNCalculator
+        >>> calc = UPNCalculator(numeric=DecimalBackend())
+        >>> calc.evaluate("0.1 0.2 +")
+        Decimal('0.3')
+        >>> money = DecimalBackend(decimal.Context(prec=4))
+        >>> UPNCalculator(numeric=money).evaluate("2 3 /")
+        Decimal('0.6667')
+    """
+
+    name = "decimal"
+
+    def __init__(self, context: Optional[decimal.Context] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            context: Context for all operations; defaults to a copy of the
+                current thread's context at construction time.
+        """
+        self.context = decimal.getcontext().copy() if context is None else context
+        context = self.context
+
+        def decimal_divide(a: Decimal, b: Decimal) -> Decimal:
+            if b == 0:
+                raise ZeroDivisionError("Division by zero")
+            return context.divide(a, b)
+
+        self.functions: Dict[Callable[..., Any], Callable[..., Any]] = {
+            operator.add: context.add,
+            operator.sub: context.subtract,
+            operator.mul: context.multiply,
+            divide: decimal_divide,
+        }
+
+    def number(self, text: str) -> Decimal:
+        """Convert a numeric literal to Decimal exactly."""
+        return Decimal(text)
+
+    def convert(self, value: Any) -> Decimal:
+        """
+        Convert a value to Decimal.
+
+        Floats are converted through their shortest repr, so 0.1 becomes
+        Decimal('0.1') rather than its exact binary value.
+        """
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, float):
+            return Decimal(repr(value))
+        return Decimal(value)
+
+    def __repr__(self) -> str:
+        """Return a representation showing the context."""
+        return f"DecimalBackend({self.context!r})"
+
+
+class FractionBackend(NumericBackend):
+    """
+    Exact rational arithmetic with fractions.Fraction.
+
+    Results are never rounded, so numerators and denominators can grow with
+    every operation. Infinity and NaN have no rational value and are
+    rejected.
+
+    Examples:
+        >>> from upn_calculator import UPNCalculator
+        >>> UPNCalculator(numeric=FractionBackend()).evaluate("1 3 / 1 6 / +")
+        Fraction(1, 2)
+    """
+
+    name = "fraction"
+
+    def number(self, text: str) -> Fraction:
+        """Convert a numeric literal to Fraction exactly."""
+        try:
+            return Fraction(text)
+        except ValueError:
+            raise InvalidTokenError(f"Token '{text}' has no rational value") from None
+
+    def convert(self, value: Any) -> Fraction:
+        """
+        Convert a value to Fraction.
+
+        Floats are converted through their shortest repr, so 0.1 becomes
+        Fraction(1, 10) rather than its exact binary value.
+
+        Raises:
+            ValueError: If the value is infinite or NaN.
+        """
+        if isinstance(value, Fraction):
+            return value
+        if isinstance(value, float):
+            return Fraction(repr(value))
+        return Fraction(value)
+
+
+# The default backend.
+FLOAT = FloatBackend()
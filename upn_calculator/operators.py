@@ -1,8 +1,201 @@
-"""Operator definitions and application functions."""
+"""Operator definitions, the operator registry and application functions."""
 
-from .errors import ZeroDivisionError
+import operator
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
-OPERATORS = {"+", "-", "*", "/"}
+from .errors import InsufficientOperandsError, ZeroDivisionError
+
+
+@dataclass(frozen=True, slots=True)
+class Operator:
+    """
+    An operator that can appear as a token in UPN expressions.
+
+    Attributes:
+        symbol: The token text of the operator (e.g., "+" or "sqrt").
+        arity: Number of operands popped from the stack, or None for a
+            variadic operator that takes every operand on the stack (at
+            least one).
+        function: Called with the operands in stack order (bottom first).
+        outputs: Number of values pushed back. With 1 the function returns
+            the value; otherwise it returns a sequence of `outputs` values
+            (e.g., dup returns two).
+        kernel: Optional vectorized implementation used by evaluate_batch()
+            on NumPy arrays: called like `function`, but with whole columns
+            (or scalars) as operands.
+    """
+
+    symbol: str
+    arity: Optional[int]
+    function: Callable[..., Any]
+    outputs: int = 1
+    kernel: Optional[Callable[..., Any]] = None
+
+    def __post_init__(self):
+        """Validate the operator's shape."""
+        if not self.symbol or len(self.symbol.split()) != 1:
+            raise ValueError(f"Invalid operator symbol: {self.symbol!r}")
+        if self.arity is not None and self.arity < 0:
+            raise ValueError("arity must not be negative")
+        if self.outputs < 0:
+            raise ValueError("outputs must not be negative")
+
+    def operand_count(self, depth: int) -> int:
+        """
+        Get the number of operands taken from a stack of the given depth.
+
+        Args:
+            depth: Number of values on the stack.
+
+        Returns:
+            The arity, or `depth` for a variadic operator.
+
+        Raises:
+            InsufficientOperandsError: If the stack has too few values.
+        """
+        arity = self.arity
+        if arity is None:
+            if depth:
+                return depth
+            required = "at least 1 operand"
+        elif depth >= arity:
+            return arity
+        else:
+            required = f"{arity} operand{'' if arity == 1 else 's'}"
+        msg = f"Operator '{self.symbol}' requires {required} but stack has {depth}"
+        raise InsufficientOperandsError(msg)
+
+
+def divide(a: float, b: float) -> float:
+    """
+    Divide a by b with the calculator's division-by-zero semantics.
+
+    Args:
+        a: Dividend.
+        b: Divisor.
+
+    Returns:
+        The quotient a / b.
+
+    Raises:
+        ZeroDivisionError: If b is zero.
+    """
+    if b == 0:
+        raise ZeroDivisionError("Division by zero")
+    return a / b
+
+
+def _numpy_kernel(name: str) -> Callable[..., Any]:
+    """Create a kernel calling a NumPy ufunc, importing NumPy on first use."""
+
+    def kernel(*operands):
+        import numpy
+
+        return getattr(numpy, name)(*operands)
+
+    kernel.__name__ = kernel.__qualname__ = f"numpy.{name}"
+    return kernel
+
+
+class OperatorRegistry(Mapping):
+    """
+    A table of operators by symbol.
+
+    Lookups go straight to a dict, so dispatch costs the same however many
+    operators are registered. Register custom operators before compiling
+    expressions that use them: compiled programs already resolved their
+    operators, and cached programs are not invalidated.
+
+    Examples:
+        >>> import math
+        >>> registry = OPERATORS.copy()
+        >>> sqrt = registry.register(Operator("sqrt", 1, math.sqrt))
+        >>> "sqrt" in registry, "sqrt" in OPERATORS
+        (True, False)
+    """
+
+    def __init__(self, operators: Iterable[Operator] = ()):
+        """
+        Initialize the registry.
+
+        Args:
+            operators: Operators to register.
+        """
+        # The lookup table used by the scanner; read-only outside register().
+        self.table: Dict[str, Operator] = {}
+        for op in operators:
+            self.register(op)
+
+    def register(self, op: Operator) -> Operator:
+        """
+        Add an operator, replacing any operator with the same symbol.
+
+        Args:
+            op: The operator to add.
+
+        Returns:
+            The registered operator.
+
+        Raises:
+            ValueError: If the symbol is a numeric literal.
+        """
+        try:
+            float(op.symbol)
+        except ValueError:
+            pass
+        else:
+            raise ValueError(f"Invalid operator symbol: {op.symbol!r}")
+        self.table[op.symbol] = op
+        return op
+
+    def unregister(self, symbol: str) -> None:
+        """
+        Remove an operator.
+
+        Args:
+            symbol: The symbol of the operator.
+
+        Raises:
+            KeyError: If no operator has this symbol.
+        """
+        del self.table[symbol]
+
+    def copy(self) -> "OperatorRegistry":
+        """Return a new registry with the same operators."""
+        return OperatorRegistry(self.table.values())
+
+    def __getitem__(self, symbol: str) -> Operator:
+        """Return the operator with the given symbol."""
+        return self.table[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the registered symbols."""
+        return iter(self.table)
+
+    def __len__(self) -> int:
+        """Return the number of registered operators."""
+        return len(self.table)
+
+    def __contains__(self, symbol: object) -> bool:
+        """Check whether a symbol is registered."""
+        return symbol in self.table
+
+    def __repr__(self) -> str:
+        """Return a representation listing the symbols."""
+        return f"OperatorRegistry({list(self.table)!r})"
+
+
+# The default registry, used unless a calculator is given its own.
+OPERATORS = OperatorRegistry(
+    [
+        Operator("+", 2, operator.add, kernel=_numpy_kernel("add")),
+        Operator("-", 2, operator.sub, kernel=_numpy_kernel("subtract")),
+        Operator("*", 2, operator.mul, kernel=_numpy_kernel("multiply")),
+        Operator("/", 2, divide, kernel=_numpy_kernel("divide")),
+    ]
+)
 
 
 def apply_operator(a: float, b: float, op: str) -> float:
@@ -14,34 +207,26 @@ def apply_operator(a: float, b: float, op: str) -> float:
     Args:
         a: First operand (popped second from stack).
         b: Second operand (popped first from stack).
-        op: Operator string (+, -, *, /).
+        op: Operator string (+, -, *, / or a registered binary operator).
 
     Returns:
         The result of the operation.
 
     Raises:
         ZeroDivisionError: If trying to divide by zero.
-        ValueError: If operator is not recognized.
+        ValueError: If operator is not recognized or not binary.
 
     Examples:
-        >>> apply_operator(2, 3, "+")
+        >>> apply_operator(2.0, 3.0, "+")
         5.0
-        >>> apply_operator(10, 3, "-")
+        >>> apply_operator(10.0, 3.0, "-")
         7.0
-        >>> apply_operator(2, 3, "*")
+        >>> apply_operator(2.0, 3.0, "*")
         6.0
-        >>> apply_operator(10, 2, "/")
+        >>> apply_operator(10.0, 2.0, "/")
         5.0
     """
-    if op == "+":
-        return a + b
-    elif op == "-":
-        return a - b
-    elif op == "*":
-        return a * b
-    elif op == "/":
-        if b == 0:
-            raise ZeroDivisionError("Division by zero")
-        return a / b
-    else:
+    found = OPERATORS.table.get(op)
+    if found is None or found.arity != 2 or found.outputs != 1:
         raise ValueError(f"Unknown operator: {op}")
+    return found.function(a, b)
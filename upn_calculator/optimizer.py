@@ -0,0 +1,183 @@
+"""Constant folding and peephole optimization of compiled UPN programs."""
+
+import math
+import operator
+from typing import Any, Callable, List, Optional, Tuple
+
+from .compiler import (
+    BINARY,
+    LOAD,
+    PUSH,
+    UNARY,
+    CompiledExpression,
+    Instruction,
+    operator_call,
+)
+from .errors import ZeroDivisionError
+from .operators import divide
+
+# Returned by _fold() for operations that must be left to run time.
+_NOT_FOLDED = object()
+
+
+def _is_positive_zero(value: Optional[float]) -> bool:
+    """Check for +0.0 (not -0.0)."""
+    return value == 0 and math.copysign(1.0, value) > 0
+
+
+def _is_negative_zero(value: Optional[float]) -> bool:
+    """Check for -0.0 (not +0.0)."""
+    return value == 0 and math.copysign(1.0, value) < 0
+
+
+def _is_identity(function: Any, a: Optional[float], b: Optional[float]) -> int:
+    """
+    Check whether applying a built-in binary operator to a and b is an identity.
+
+    Only rewrites that are bit-identical for every operand (including -0.0,
+    infinities and NaN) qualify. In particular "x 0 +" does not, because
+    -0.0 + 0.0 is +0.0; "x -0 +" and "x 0 -" do.
+
+    Returns:
+        1 if the result is always operand a, 2 if it is always operand b,
+        0 otherwise.
+    """
+    if b is not None:
+        if (function is operator.mul or function is divide) and b == 1:
+            return 1
+        if function is operator.sub and _is_positive_zero(b):
+            return 1
+        if function is operator.add and _is_negative_zero(b):
+            return 1
+    if a is not None:
+        if function is operator.mul and a == 1:
+            return 2
+        if function is operator.add and _is_negative_zero(a):
+            return 2
+    return 0
+
+
+def _fold(function: Callable[..., Any], operands: List[float]) -> Any:
+    """
+    Apply an operator to constants at compile time.
+
+    Returns:
+        The result, or _NOT_FOLDED if the operator fails with anything but
+        a division by zero; that error is then left to happen at run time.
+
+    Raises:
+        ZeroDivisionError: If the operator divides by zero.
+    """
+    try:
+        return function(*operands)
+    except ZeroDivisionError:
+        raise
+    except Exception:
+        return _NOT_FOLDED
+
+
+def _stack_effect(opcode: int, arg: Any) -> int:
+    """Return the change in stack depth caused by an instruction."""
+    if opcode == PUSH or opcode == LOAD:
+        return 1
+    if opcode == BINARY:
+        return -1
+    if opcode == UNARY:
+        return 0
+    _, count, outputs = arg
+    return outputs - count
+
+
+def _max_depth(code: List[Instruction]) -> int:
+    """Compute the maximum stack depth of straight-line code."""
+    depth = max_depth = 0
+    for opcode, arg, _ in code:
+        depth += _stack_effect(opcode, arg)
+        max_depth = max(max_depth, depth)
+    return max_depth
+
+
+def optimize(program: CompiledExpression) -> Tuple[CompiledExpression, int]:
+    """
+    Fold constant operations and remove exact identities from a program.
+
+    Constant operations are evaluated with the operator functions that
+    apply_operator() and the program itself use at run time, so the
+    optimized program produces bit-identical results. A division whose
+    divisor is the constant zero always fails and therefore raises here,
+    at compile time. Custom operators are assumed to be pure functions of
+    their operands.
+
+    Args:
+        program: A compiled program.
+
+    Returns:
+        The optimized program and the number of operations removed.
+
+    Raises:
+        ZeroDivisionError: If the program always divides by zero.
+
+    Examples:
+        >>> from upn_calculator import compile_expression
+        >>> optimized, removed = optimize(
+        ...     compile_expression("2 3 + x * 1 *", variables=["x"])
+        ... )
+        >>> [token for _, _, token in optimized.code], removed
+        (['5.0', 'x', '*'], 2)
+    """
+    code: List[Instruction] = []
+    # One entry per value on the stack: the index in `code` where the
+    # instructions producing it start (None if they also produce other
+    # values, so they cannot be removed), and its value if it is a constant.
+    # A constant is always a single PUSH at its start index.
+    entries: List[Tuple[Optional[int], Any]] = []
+    removed = 0
+
+    for instruction in program.code:
+        opcode, arg, token = instruction
+        if opcode == PUSH or opcode == LOAD:
+            entries.append((len(code), arg if opcode == PUSH else None))
+            code.append(instruction)
+            continue
+        function, count, outputs = operator_call(opcode, arg)
+        operands = entries[len(entries) - count :]
+        del entries[len(entries) - count :]
+        if opcode == BINARY:
+            (a_start, a), (b_start, b) = operands
+            if b is not None and b == 0 and function is divide:
+                raise ZeroDivisionError("Division by zero")
+        if all(value is not None for _, value in operands):
+            value = _fold(function, [value for _, value in operands])
+            if value is not _NOT_FOLDED:
+                for start, _ in reversed(operands):
+                    del code[start]
+                for result in [value] if outputs == 1 else value:
+                    entries.append((len(code), result))
+                    code.append((PUSH, result, repr(result)))
+                removed += 1
+                continue
+        if opcode == BINARY:
+            keep = _is_identity(function, a, b)
+            if keep == 1:
+                del code[b_start]
+                entries.append((a_start, a))
+                removed += 1
+                continue
+            if keep == 2:
+                del code[a_start]
+                entries.append((a_start if b_start is not None else None, b))
+                removed += 1
+                continue
+        code.append(instruction)
+        if outputs == 1:
+            start = operands[0][0] if operands else len(code) - 1
+            entries.append((start, None))
+        else:
+            entries.extend((None, None) for _ in range(outputs))
+
+    if not removed:
+        return program, 0
+    optimized = CompiledExpression(
+        program.source, tuple(code), _max_depth(code), program.variables
+    )
+    return optimized, removed
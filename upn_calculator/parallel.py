@@ -0,0 +1,167 @@
+"""Multi-process batch evaluation of many independent expressions."""
+
+import os
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
+
+from .calculator import UPNCalculator
+from .errors import UPNCalculatorError
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+Result = Union[float, UPNCalculatorError]
+
+DEFAULT_CHUNK_SIZE = 1024
+
+# The private calculator of a worker process, created by _init_worker().
+_worker_calculator: Optional[UPNCalculator] = None
+
+
+def _init_worker() -> None:
+    """Create the worker's own calculator."""
+    global _worker_calculator
+    _worker_calculator = UPNCalculator()
+
+
+def evaluate_chunk(
+    expressions: List[str], calc: Optional[UPNCalculator] = None
+) -> List[Result]:
+    """
+    Evaluate a list of expressions, returning errors instead of raising them.
+
+    Args:
+        expressions: The expressions to evaluate.
+        calc: Calculator to use; defaults to the worker's private calculator.
+
+    Returns:
+        One float or UPNCalculatorError per expression, in input order.
+
+    Examples:
+        >>> evaluate_chunk(["2 3 +", "1 0 /"])
+        [5.0, ZeroDivisionError('Division by zero')]
+    """
+    if calc is None:
+        calc = _worker_calculator or UPNCalculator()
+    evaluate = calc.evaluate
+    results: List[Result] = []
+    append = results.append
+    for expression in expressions:
+        try:
+            append(evaluate(expression))
+        except UPNCalculatorError as exc:
+            append(exc)
+    return results
+
+
+def _chunked(expressions: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Split an iterable into lists of at most chunk_size items."""
+    iterator = iter(expressions)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+class ParallelEvaluator:
+    """
+    A reusable pool of worker processes that evaluate expressions.
+
+    Each worker owns a private UPNCalculator (and therefore its own cache).
+    Use it as a context manager to shut the pool down when done.
+
+    Examples:
+        >>> with ParallelEvaluator(workers=2) as pool:
+        ...     pool.evaluate(["2 3 +", "4 5 *"])
+        [5.0, 20.0]
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Initialize the evaluator.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count).
+                With 1 worker, expressions are evaluated in this process.
+            chunk_size: Number of expressions sent to a worker per task.
+
+        Raises:
+            ValueError: If workers or chunk_size is smaller than 1.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor: Optional["ProcessPoolExecutor"] = None
+        self._calculator: Optional[UPNCalculator] = None
+        if workers == 1:
+            self._calculator = UPNCalculator()
+        else:
+            # Imported here: it pulls in multiprocessing, which single-process
+            # callers and short-lived CLI runs should not pay for.
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(workers, initializer=_init_worker)
+
+    def evaluate(self, expressions: Iterable[str]) -> List[Result]:
+        """
+        Evaluate expressions across the worker processes.
+
+        Args:
+            expressions: The expressions to evaluate.
+
+        Returns:
+            One float or UPNCalculatorError per expression, in input order.
+        """
+        if self._executor is None:
+            return evaluate_chunk(list(expressions), self._calculator)
+        results: List[Result] = []
+        chunks = _chunked(expressions, self.chunk_size)
+        for chunk_results in self._executor.map(evaluate_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ParallelEvaluator":
+        """Return the evaluator for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Shut down the worker processes."""
+        self.close()
+
+
+def evaluate_many(
+    expressions: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Result]:
+    """
+    Evaluate many expressions in parallel worker processes.
+
+    Per-item errors are returned, not raised, so one bad expression cannot
+    abort the whole job.
+
+    Args:
+        expressions: The expressions to evaluate.
+        workers: Number of worker processes (defaults to the CPU count).
+        chunk_size: Number of expressions sent to a worker per task.
+
+    Returns:
+        One float or UPNCalculatorError per expression, in input order.
+
+    Examples:
+        >>> evaluate_many(["2 3 +", "2 xyz +"], workers=1)
+        [5.0, InvalidTokenError("Unknown token: 'xyz'")]
+    """
+    with ParallelEvaluator(workers, chunk_size) as pool:
+        return pool.evaluate(expressions)
@@ -1,6 +1,50 @@
 """Token parsing and validation functions for UPN expressions."""
 
-from typing import List
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from .operators import OPERATORS, OperatorRegistry
+
+# Token kinds produced by scan().
+NUMBER = "number"
+OPERATOR = "operator"
+WORD = "word"
+
+# The literal syntax accepted by float(): optional sign, digits with optional
+# underscores, fraction, exponent, or inf/infinity/nan in any case.
+_DIGITS = r"\d+(?:_\d+)*"
+_NUMBER_PATTERN = re.compile(
+    rf"[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})"
+    rf"(?:[eE][+-]?{_DIGITS})?"
+    r"|[iI][nN][fF](?:[iI][nN][iI][tT][yY])?|[nN][aA][nN])"
+)
+_match_number = _NUMBER_PATTERN.fullmatch
+# The literals float() accepts that are not made of digits, in lower case.
+_SPECIAL_NUMBERS = frozenset({"inf", "infinity", "nan"})
+
+# Memo of recently seen non-operator token texts: the float value of a number,
+# or None for a word. Formulas reuse the same literals heavily, so this skips
+# the syntax check for most tokens; it is cleared when it grows too large.
+_LITERALS: Dict[str, Optional[float]] = {}
+_LITERALS_LIMIT = 4096
+
+
+class Token(NamedTuple):
+    """
+    A classified token of a UPN expression.
+
+    Attributes:
+        kind: NUMBER, OPERATOR or WORD (anything else, e.g. a variable name).
+        text: The token as written in the expression.
+        offset: Position of the token's first character in the expression.
+        value: The float value for NUMBER, the Operator for OPERATOR, and
+            None for WORD.
+    """
+
+    kind: str
+    text: str
+    offset: int
+    value: Any
 
 
 def is_number(token: str) -> bool:
@@ -27,22 +71,19 @@ def is_number(token: str) -> bool:
         >>> is_number("xyz")
         False
     """
-    try:
-        float(token)
-        return True
-    except ValueError:
-        return False
+    return _is_number_text(token)
 
 
 def is_operator(token: str) -> bool:
     """
-    Check if a token is a valid operator.
+    Check if a token is a registered operator.
 
     Args:
         token: The token to check.
 
     Returns:
-        True if the token is an operator in {+, -, *, /}, False otherwise.
+        True if the token is an operator of the default registry (by
+        default +, -, * and /), False otherwise.
 
     Examples:
         >>> is_operator("+")
@@ -58,7 +99,7 @@ def is_operator(token: str) -> bool:
         >>> is_operator("sin")
         False
     """
-    return token in {"+", "-", "*", "/"}
+    return token in OPERATORS.table
 
 
 def tokenize(expression: str) -> List[str]:
@@ -80,3 +121,102 @@ def tokenize(expression: str) -> List[str]:
         ['2.5', '1.5', '+']
     """
     return expression.split()
+
+
+def _is_number_text(text: str) -> bool:
+    """
+    Check float() syntax, trying cheap string tests before the regex.
+
+    Only literals with digit separators, like 1_000, need the regex.
+    """
+    if text.isdecimal():
+        return True
+    body = text[1:] if text[:1] in "+-" else text
+    if body.replace(".", "", 1).isdecimal():
+        return True
+    mantissa, separator, exponent = body.partition("e")
+    if not separator:
+        mantissa, _, exponent = body.partition("E")
+    if exponent[:1] in "+-":
+        exponent = exponent[1:]
+    if exponent.isdecimal() and mantissa.replace(".", "", 1).isdecimal():
+        return True
+    if "_" not in body:
+        return body.lower() in _SPECIAL_NUMBERS
+    return _match_number(text) is not None
+
+
+def classify(
+    text: str, offset: int = 0, operators: Optional[OperatorRegistry] = None
+) -> Token:
+    """
+    Classify a single token without using exceptions for control flow.
+
+    Operators are resolved to their Operator and numbers are converted to
+    float exactly once.
+
+    Args:
+        text: The token text (without surrounding whitespace).
+        offset: Position of the token in its expression.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        The classified Token.
+
+    Examples:
+        >>> classify("2.5")
+        Token(kind='number', text='2.5', offset=0, value=2.5)
+        >>> classify("x", 4).kind
+        'word'
+    """
+    op = (OPERATORS if operators is None else operators).table.get(text)
+    if op is not None:
+        return Token(OPERATOR, text, offset, op)
+    if _is_number_text(text):
+        return Token(NUMBER, text, offset, float(text))
+    return Token(WORD, text, offset, None)
+
+
+def scan(
+    expression: str, operators: Optional[OperatorRegistry] = None
+) -> Iterator[Token]:
+    """
+    Split and classify an expression in a single pass.
+
+    This is classify() applied to every whitespace-separated token, inlined
+    because it is the hot path of compilation.
+
+    Args:
+        expression: The UPN expression string.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Yields:
+        A Token for each whitespace-separated token, with its source offset.
+
+    Examples:
+        >>> [(t.kind, t.offset) for t in scan("2  3 +")]
+        [('number', 0), ('number', 3), ('operator', 5)]
+    """
+    find = expression.find
+    get_operator = (OPERATORS if operators is None else operators).table.get
+    literals = _LITERALS
+    new = tuple.__new__
+    offset = 0
+    for text in expression.split():
+        offset = find(text, offset)
+        op = get_operator(text)
+        if op is not None:
+            yield new(Token, (OPERATOR, text, offset, op))
+            offset += len(text)
+            continue
+        value = literals.get(text, text)
+        if value is text:
+            value = float(text) if _is_number_text(text) else None
+            if len(literals) >= _LITERALS_LIMIT:
+                literals.clear()
+            literals[text] = value
+        if value is None:
+            yield new(Token, (WORD, text, offset, None))
+        else:
+            yield new(Token, (NUMBER, text, offset, value))
+        offset += len(text)
@@ -0,0 +1,373 @@
+"""Shared evaluation of many related expressions as one deduplicated DAG."""
+
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from .compiler import (
+    APPLY,
+    BINARY,
+    LOAD,
+    PUSH,
+    UNARY,
+    compile_expression,
+    operator_call,
+)
+from .errors import UnboundVariableError, UPNCalculatorError, ZeroDivisionError
+from .operators import OperatorRegistry
+from .parallel import Result
+
+_NO_VALUES: Mapping[str, float] = MappingProxyType({})
+
+# Opcode of the nodes that select one result of a multi-output operator.
+PICK = -1
+
+# A step computes one node at run time: (node, opcode, argument, left, right).
+# BINARY uses both operand nodes, UNARY only left, and LOAD neither; APPLY
+# keeps a tuple of its operand nodes in left, and PICK has the result index
+# as argument and the operator's node in left.
+Step = Tuple[int, int, Any, Any, int]
+
+
+def _apply(function, *operands: Any) -> Any:
+    """Apply an operator, passing on the first error of its operands."""
+    for operand in operands:
+        if isinstance(operand, UPNCalculatorError):
+            return operand
+    try:
+        return function(*operands)
+    except ZeroDivisionError as exc:
+        return exc
+
+
+def _compute_checked(step: Step, nodes: List[Any], values: Mapping[str, float]) -> Any:
+    """Compute one step, returning errors instead of raising them."""
+    _, opcode, arg, left, right = step
+    if opcode == BINARY:
+        return _apply(arg, nodes[left], nodes[right])
+    if opcode == LOAD:
+        if arg in values:
+            return values[arg]
+        return UnboundVariableError(f"Variable '{arg}' is not bound")
+    if opcode == UNARY:
+        return _apply(arg, nodes[left])
+    if opcode == APPLY:
+        return _apply(arg[0], *[nodes[operand] for operand in left])
+    result = nodes[left]
+    return result if isinstance(result, UPNCalculatorError) else result[arg]
+
+
+class ExpressionPlan:
+    """
+    Many expressions compiled into one DAG with shared subexpressions.
+
+    Every distinct subexpression - a constant, a variable, or an operator
+    applied to distinct subexpressions - becomes a single node, so a
+    core such as "a b + c *" that appears in hundreds of formulas is
+    computed once per run. Subexpressions made only of constants are
+    computed once, when the plan is built.
+
+    Operand order is significant: "a b +" and "b a +" are different nodes.
+
+    Examples:
+        >>> plan = ExpressionPlan(["a b + 2 *", "a b + 3 *"], variables=["a", "b"])
+        >>> plan.run({"a": 1.0, "b": 2.0})
+        [6.0, 9.0]
+        >>> plan.instructions, plan.nodes
+        (10, 7)
+    """
+
+    def __init__(
+        self,
+        expressions: Iterable[str] = (),
+        variables: Iterable[str] = (),
+        operators: Optional[OperatorRegistry] = None,
+    ):
+        """
+        Parse the expressions and merge them into one plan.
+
+        Expressions that fail to compile keep their error as their result.
+
+        Args:
+            expressions: The expressions to evaluate together.
+            variables: Names that may appear as operands in any expression.
+            operators: Operator registry; defaults to OPERATORS.
+
+        Raises:
+            ValueError: If a variable name is not a valid identifier.
+        """
+        self.expressions: List[str] = []
+        self.variables = tuple(variables)
+        self.operators = operators
+        self.instructions = 0
+        self._index: Dict[Hashable, int] = {}
+        self._constant: List[bool] = []
+        self._template: List[Any] = []
+        self._steps: List[Step] = []
+        self._roots: List[Any] = []
+        self._has_errors = False
+        # Per node, the variables it depends on; per variable, the positions
+        # in _steps of every step that depends on it, in execution order.
+        self._reads: List[FrozenSet[str]] = []
+        self._readers: Dict[str, List[int]] = {}
+        for expression in expressions:
+            self.add(expression)
+
+    def add(self, expression: str, variables: Optional[Iterable[str]] = None) -> int:
+        """
+        Merge one more expression into the plan.
+
+        Args:
+            expression: The expression to add.
+            variables: Names that may appear as operands; defaults to the
+                variables of the plan.
+
+        Returns:
+            The position of the expression's result in run().
+
+        Raises:
+            ValueError: If a variable name is not a valid identifier.
+        """
+        self.expressions.append(expression)
+        try:
+            program = compile_expression(
+                expression,
+                self.variables if variables is None else variables,
+                self.operators,
+            )
+        except UPNCalculatorError as exc:
+            self._roots.append(exc)
+            return len(self._roots) - 1
+        self.instructions += len(program.code)
+        stack: List[int] = []
+        for opcode, arg, _ in program.code:
+            operands: Tuple[int, ...] = ()
+            if opcode == PUSH:
+                key: Hashable = (PUSH, arg.hex())
+            elif opcode == LOAD:
+                key = (LOAD, arg)
+            else:
+                count = operator_call(opcode, arg)[1]
+                operands = tuple(stack[len(stack) - count :])
+                del stack[len(stack) - count :]
+                key = (opcode, arg, operands)
+            node = self._node(key, opcode, arg, operands)
+            if opcode == APPLY and arg[2] != 1:
+                stack.extend(
+                    self._node((PICK, index, node), PICK, index, (node,))
+                    for index in range(arg[2])
+                )
+            else:
+                stack.append(node)
+        self._roots.append(stack[0])
+        return len(self._roots) - 1
+
+    def _node(
+        self, key: Hashable, opcode: int, arg: Any, operands: Tuple[int, ...]
+    ) -> int:
+        """Find the node for a key, creating it if it does not exist yet."""
+        node = self._index.get(key)
+        if node is None:
+            node = self._index[key] = self._add_node(opcode, arg, operands)
+        return node
+
+    def _add_node(self, opcode: int, arg: Any, operands: Tuple[int, ...]) -> int:
+        """Create a node, computing it right away if it is constant."""
+        node = len(self._template)
+        if opcode == BINARY:
+            left, right = operands
+        elif opcode == APPLY:
+            left, right = operands, -1
+        else:
+            left, right = operands[0] if operands else -1, -1
+        step = (node, opcode, arg, left, right)
+        reads: FrozenSet[str] = frozenset()
+        if opcode == PUSH:
+            value, is_constant = arg, True
+        elif opcode != LOAD and all(self._constant[i] for i in operands):
+            value = _compute_checked(step, self._template, _NO_VALUES)
+            is_constant = True
+            if isinstance(value, UPNCalculatorError):
+                self._has_errors = True
+        else:
+            if opcode == LOAD:
+                reads = frozenset((arg,))
+            else:
+                reads = reads.union(*(self._reads[i] for i in operands))
+            for name in reads:
+                self._readers.setdefault(name, []).append(len(self._steps))
+            self._steps.append(step)
+            value, is_constant = None, False
+        self._template.append(value)
+        self._constant.append(is_constant)
+        self._reads.append(reads)
+        return node
+
+    @property
+    def nodes(self) -> int:
+        """Number of distinct subexpressions in the plan."""
+        return len(self._template)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Instructions of all expressions per distinct node (1.0 = no sharing)."""
+        return self.instructions / self.nodes if self.nodes else 1.0
+
+    def run(self, values: Optional[Mapping[str, float]] = None) -> List[Result]:
+        """
+        Evaluate all expressions, computing each distinct node once.
+
+        Per-expression errors are returned, not raised: an expression that
+        divides by zero or reads an unbound variable gets the same error
+        UPNCalculator.evaluate() would raise for it.
+
+        Args:
+            values: Variable bindings for the expressions.
+
+        Returns:
+            One float or UPNCalculatorError per expression, in input order.
+        """
+        return self.results(self.compute(values))
+
+    def compute(self, values: Optional[Mapping[str, float]] = None) -> List[Any]:
+        """
+        Compute the value of every node.
+
+        Args:
+            values: Variable bindings for the expressions.
+
+        Returns:
+            The node values (floats or errors), for results() and update().
+        """
+        if values is None:
+            values = _NO_VALUES
+        if self._has_errors:
+            return self._run_checked(values, range(len(self._steps)))
+        nodes = self._template.copy()
+        try:
+            for node, opcode, arg, left, right in self._steps:
+                if opcode == BINARY:
+                    nodes[node] = arg(nodes[left], nodes[right])
+                elif opcode == LOAD:
+                    nodes[node] = values[arg]
+                elif opcode == UNARY:
+                    nodes[node] = arg(nodes[left])
+                elif opcode == APPLY:
+                    nodes[node] = arg[0](*[nodes[operand] for operand in left])
+                else:
+                    nodes[node] = nodes[left][arg]
+        except (KeyError, ZeroDivisionError):
+            return self._run_checked(values, range(len(self._steps)))
+        return nodes
+
+    def update(
+        self,
+        nodes: List[Any],
+        values: Mapping[str, float],
+        changed: Iterable[str] = (),
+    ) -> int:
+        """
+        Bring node values computed earlier up to date, in place.
+
+        Only the steps that depend on a changed variable are recomputed,
+        plus the nodes of expressions added since `nodes` was computed.
+
+        Args:
+            nodes: Node values from compute() or an earlier update().
+            values: The current variable bindings.
+            changed: Names whose values changed since `nodes` was computed.
+
+        Returns:
+            The number of recomputed steps.
+        """
+        known = len(nodes)
+        nodes.extend(self._template[known:])
+        dirty = set()
+        for name in changed:
+            dirty.update(self._readers.get(name, ()))
+        first_new = len(self._steps)
+        while first_new and self._steps[first_new - 1][0] >= known:
+            first_new -= 1
+        positions = sorted(position for position in dirty if position < first_new)
+        positions.extend(range(first_new, len(self._steps)))
+        self._run_checked(values, positions, nodes)
+        return len(positions)
+
+    def results(self, nodes: List[Any]) -> List[Result]:
+        """
+        Pick the result of every expression from computed node values.
+
+        Args:
+            nodes: Node values from compute() or update().
+
+        Returns:
+            One float or UPNCalculatorError per expression, in input order.
+        """
+        return [
+            root if isinstance(root, UPNCalculatorError) else nodes[root]
+            for root in self._roots
+        ]
+
+    def result(self, nodes: List[Any], index: int) -> Result:
+        """
+        Pick the result of one expression from computed node values.
+
+        Args:
+            nodes: Node values from compute() or update().
+            index: The position returned by add().
+
+        Returns:
+            The result as a float, or the UPNCalculatorError it produced.
+        """
+        root = self._roots[index]
+        return root if isinstance(root, UPNCalculatorError) else nodes[root]
+
+    def _run_checked(
+        self,
+        values: Mapping[str, float],
+        positions: Iterable[int],
+        nodes: Optional[List[Any]] = None,
+    ) -> List[Any]:
+        """Compute the given steps, storing errors as values that propagate."""
+        if nodes is None:
+            nodes = self._template.copy()
+        steps = self._steps
+        for position in positions:
+            step = steps[position]
+            nodes[step[0]] = _compute_checked(step, nodes, values)
+        return nodes
+
+
+def evaluate_shared(
+    expressions: Iterable[str],
+    values: Optional[Mapping[str, float]] = None,
+    variables: Iterable[str] = (),
+) -> List[Result]:
+    """
+    Evaluate many related expressions, computing shared parts only once.
+
+    Args:
+        expressions: The expressions to evaluate.
+        values: Variable bindings for the expressions.
+        variables: Names that may appear as operands. Defaults to the names
+            bound in `values`.
+
+    Returns:
+        One float or UPNCalculatorError per expression, in input order.
+
+    Examples:
+        >>> evaluate_shared(["2 3 + 4 *", "2 3 + 0 /"])
+        [20.0, ZeroDivisionError('Division by zero')]
+    """
+    if not variables and values:
+        variables = values.keys()
+    return ExpressionPlan(expressions, variables).run(values)
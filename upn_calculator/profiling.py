@@ -0,0 +1,371 @@
+"""Opt-in profiling of expression evaluation.
+
+Profiling lives in its own engine class: a calculator only pays for it when
+it is created with a Profiler, and the default UPNEngine is not touched.
+"""
+
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from .cache import ExpressionCache
+from .compiler import APPLY, BINARY, UNARY, CompiledExpression, compile_tokens
+from .engine import UPNEngine
+from .errors import UPNCalculatorError
+from .operators import OperatorRegistry
+from .parser import classify
+from .status import Outcome
+
+if TYPE_CHECKING:
+    from .numeric import NumericBackend
+
+# Evaluation phases in the order they happen. Tokenizing, classifying and
+# compiling only happen when the compiled program is not cached yet.
+PHASES = ("tokenize", "classify", "compile", "execute")
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Profiler:
+    """
+    Counters and timings collected by a profiling calculator.
+
+    All times are wall-clock seconds from time.perf_counter(). Counters only
+    grow until reset(); updates are thread-safe.
+
+    Examples:
+        >>> from upn_calculator import UPNCalculator
+        >>> profiler = Profiler()
+        >>> calc = UPNCalculator(profiler=profiler)
+        >>> calc.evaluate("2 3 + 4 *")
+        20.0
+        >>> stats = profiler.as_dict()
+        >>> stats["operators"]["+"]["count"], stats["max_stack_depth"]
+        (1, 2)
+    """
+
+    def __init__(self):
+        """Initialize a profiler with all counters at zero."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        with self._lock:
+            self.evaluations = 0
+            self.max_stack_depth = 0
+            # Per phase and per operator symbol: [count, seconds].
+            self._phases: Dict[str, List[float]] = {phase: [0, 0.0] for phase in PHASES}
+            self._operators: Dict[str, List[float]] = {}
+            self._errors: Dict[str, int] = {}
+
+    def record_phase(self, phase: str, seconds: float) -> None:
+        """
+        Add the duration of one evaluation phase.
+
+        Args:
+            phase: One of PHASES.
+            seconds: The time the phase took.
+        """
+        with self._lock:
+            entry = self._phases[phase]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def record_operator(self, symbol: str, seconds: float) -> None:
+        """
+        Add one application of an operator.
+
+        Args:
+            symbol: The operator's symbol.
+            seconds: The time its function took.
+        """
+        with self._lock:
+            entry = self._operators.get(symbol)
+            if entry is None:
+                entry = self._operators[symbol] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def record_evaluation(self, max_depth: int) -> None:
+        """
+        Count an evaluation that reached the execute phase.
+
+        Args:
+            max_depth: The stack depth of its program.
+        """
+        with self._lock:
+            self.evaluations += 1
+            if max_depth > self.max_stack_depth:
+                self.max_stack_depth = max_depth
+
+    def record_error(self, error: UPNCalculatorError) -> None:
+        """
+        Count an error raised by an evaluation.
+
+        Args:
+            error: The error; it is counted by its class name.
+        """
+        name = type(error).__name__
+        with self._lock:
+            self._errors[name] = self._errors.get(name, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of all counters.
+
+        Returns:
+            A dict with "evaluations", "max_stack_depth", "phases" and
+            "operators" ({name: {"count": n, "seconds": t}}) and "errors"
+            ({error class name: count}).
+        """
+        with self._lock:
+            return {
+                "evaluations": self.evaluations,
+                "max_stack_depth": self.max_stack_depth,
+                "phases": {
+                    phase: {"count": count, "seconds": seconds}
+                    for phase, (count, seconds) in self._phases.items()
+                },
+                "operators": {
+                    symbol: {"count": count, "seconds": seconds}
+                    for symbol, (count, seconds) in self._operators.items()
+                },
+                "errors": dict(self._errors),
+            }
+
+    def to_prometheus(self, prefix: str = "upn") -> str:
+        """
+        Render all counters in the Prometheus text exposition format.
+
+        Args:
+            prefix: Prefix of the metric names.
+
+        Returns:
+            The metrics, one sample per line, ending with a newline.
+        """
+        stats = self.as_dict()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: Iterable) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{labels} {value!r}")
+
+        def labelled(label: str, values: Mapping[str, Any]) -> List:
+            return [
+                (f'{{{label}="{_label(key)}"}}', value) for key, value in values.items()
+            ]
+
+        phases, operators = stats["phases"], stats["operators"]
+        metric(
+            "evaluations_total",
+            "counter",
+            "Evaluations that reached the execute phase.",
+            [("", stats["evaluations"])],
+        )
+        metric(
+            "phase_calls_total",
+            "counter",
+            "Runs of each evaluation phase.",
+            labelled("phase", {k: v["count"] for k, v in phases.items()}),
+        )
+        metric(
+            "phase_seconds_total",
+            "counter",
+            "Time spent in each evaluation phase.",
+            labelled("phase", {k: v["seconds"] for k, v in phases.items()}),
+        )
+        metric(
+            "operator_calls_total",
+            "counter",
+            "Applications of each operator.",
+            labelled("operator", {k: v["count"] for k, v in operators.items()}),
+        )
+        metric(
+            "operator_seconds_total",
+            "counter",
+            "Time spent in each operator's function.",
+            labelled("operator", {k: v["seconds"] for k, v in operators.items()}),
+        )
+        metric(
+            "max_stack_depth",
+            "gauge",
+            "Deepest operand stack of an evaluated program.",
+            [("", stats["max_stack_depth"])],
+        )
+        metric(
+            "errors_total",
+            "counter",
+            "Evaluation errors by error class.",
+            labelled("type", stats["errors"]),
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _timed(
+    function: Callable[..., Any], symbol: str, profiler: Profiler
+) -> Callable[..., Any]:
+    """Wrap an operator function so that each call is recorded."""
+    clock = time.perf_counter
+    record = profiler.record_operator
+
+    def timed(*operands):
+        start = clock()
+        try:
+            return function(*operands)
+        finally:
+            record(symbol, clock() - start)
+
+    return timed
+
+
+class ProfilingEngine(UPNEngine):
+    """
+    An evaluation engine that reports what it does to a Profiler.
+
+    It behaves like UPNEngine, but compiles on a path that times each phase
+    and caches programs whose operator functions record their calls. Its
+    cache is always private, so instrumented programs never reach other
+    engines. UPNCalculator(profiler=...) creates one.
+    """
+
+    __slots__ = ("profiler",)
+
+    def __init__(
+        self,
+        profiler: Profiler,
+        cache: Optional[ExpressionCache] = None,
+        operators: Optional[OperatorRegistry] = None,
+        numeric: Optional["NumericBackend"] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            profiler: Receives the timings and counters.
+            cache: Cache for instrumented programs; defaults to a new
+                private cache.
+            operators: Operator registry; defaults to OPERATORS.
+            numeric: Numeric backend; defaults to float arithmetic.
+        """
+        super().__init__(
+            ExpressionCache() if cache is None else cache, operators, numeric
+        )
+        self.profiler = profiler
+
+    def _build(self, expression: str, names: FrozenSet[str]) -> CompiledExpression:
+        """Compile an expression on a cache miss, timing each phase."""
+        profiler = self.profiler
+        clock = time.perf_counter
+        operators = self.operators
+
+        start = clock()
+        texts = expression.split()
+        tokenized = clock()
+        profiler.record_phase("tokenize", tokenized - start)
+
+        offset = 0
+        tokens = []
+        for text in texts:
+            offset = expression.find(text, offset)
+            tokens.append(classify(text, offset, operators))
+            offset += len(text)
+        classified = clock()
+        profiler.record_phase("classify", classified - tokenized)
+
+        program = compile_tokens(expression, tokens, names, operators)
+        if self.numeric is not None:
+            program = self.numeric.specialize(program)
+        program = self._instrument(program)
+        profiler.record_phase("compile", clock() - classified)
+        return program
+
+    def _instrument(self, program: CompiledExpression) -> CompiledExpression:
+        """Wrap every operator function of a program in a recorder."""
+        code = []
+        for opcode, arg, token in program.code:
+            if opcode == BINARY or opcode == UNARY:
+                arg = _timed(arg, token, self.profiler)
+            elif opcode == APPLY:
+                arg = (_timed(arg[0], token, self.profiler),) + arg[1:]
+            code.append((opcode, arg, token))
+        return CompiledExpression(
+            program.source, tuple(code), program.max_depth, program.variables
+        )
+
+    def evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> float:
+        """
+        Evaluate an expression, recording timings, counters and errors.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings; every bound name may appear as an
+                operand.
+
+        Returns:
+            The result of the evaluation.
+
+        Raises:
+            UPNCalculatorError: Any error UPNEngine.evaluate() raises; it is
+                counted before it propagates.
+            ValueError: If a bound name is not a valid identifier.
+        """
+        profiler = self.profiler
+        try:
+            program = self.compile(expression, values or ())
+            if values and self.numeric is not None:
+                values = self._convert(program, values)
+            profiler.record_evaluation(program.max_depth)
+            start = time.perf_counter()
+            try:
+                return program.run(values)
+            finally:
+                profiler.record_phase("execute", time.perf_counter() - start)
+        except UPNCalculatorError as exc:
+            profiler.record_error(exc)
+            raise
+
+    def _try_compile(
+        self, expression: str, names: FrozenSet[str], key: object
+    ) -> Union[CompiledExpression, Outcome]:
+        """Compile for try_evaluate(), counting malformed expressions."""
+        program = super()._try_compile(expression, names, key)
+        if type(program) is Outcome:
+            self.profiler.record_error(program.error())
+        return program
+
+    def _try_run(
+        self,
+        program: CompiledExpression,
+        expression: str,
+        values: Optional[Mapping[str, float]],
+    ) -> Outcome:
+        """Run a program for try_evaluate(), recording what evaluate() does."""
+        profiler = self.profiler
+        profiler.record_evaluation(program.max_depth)
+        start = time.perf_counter()
+        try:
+            outcome = super()._try_run(program, expression, values)
+        finally:
+            profiler.record_phase("execute", time.perf_counter() - start)
+        if outcome.status:
+            profiler.record_error(outcome.error())
+        return outcome
@@ -0,0 +1,283 @@
+"""Asyncio evaluation service with request micro-batching.
+
+The service speaks a line protocol over TCP or a Unix socket: each request is
+one expression per line, and each response is one line, in request order:
+
+    OK <result>
+    ERR <ErrorType> <message>
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .parallel import Result, evaluate_chunk
+
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_PENDING = 10_000
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into batches evaluated off the event loop.
+
+    Requests that arrive within `window` seconds of the first request of a
+    batch are evaluated together, in one executor call; a batch is also sent
+    as soon as it reaches `max_batch` requests. At most `max_pending`
+    requests may be queued or running: further callers wait for capacity,
+    which slows down readers instead of growing memory without bound.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        executor: Optional[Executor] = None,
+        evaluate: Callable[[List[str]], List[Result]] = evaluate_chunk,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            window: Seconds to wait for more requests before sending a batch.
+            max_batch: Maximum number of requests per batch.
+            max_pending: Maximum number of requests queued or running.
+            executor: Executor for batches; None uses the loop's default
+                thread pool. A ProcessPoolExecutor spreads batches over cores.
+            evaluate: Function evaluating a list of expressions, returning a
+                float or an error per expression (must be picklable for a
+                process pool).
+
+        Raises:
+            ValueError: If a limit is out of range.
+        """
+        if window < 0:
+            raise ValueError("window must not be negative")
+        if max_batch < 1 or max_pending < 1:
+            raise ValueError("max_batch and max_pending must be at least 1")
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.executor = executor
+        self._evaluate = evaluate
+        self._slots = asyncio.Semaphore(max_pending)
+        self._batch: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def enqueue(self, expression: str) -> asyncio.Future:
+        """
+        Queue an expression, waiting while the service is at capacity.
+
+        Args:
+            expression: The UPN expression.
+
+        Returns:
+            A future resolved with the result (a float or an error).
+        """
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((expression, future))
+        if len(self._batch) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return future
+
+    async def submit(self, expression: str) -> Result:
+        """
+        Evaluate an expression as part of a batch.
+
+        Args:
+            expression: The UPN expression.
+
+        Returns:
+            The result as a float, or the UPNCalculatorError it produced.
+        """
+        return await (await self.enqueue(expression))
+
+    def _flush(self) -> None:
+        """Send the current batch to the executor."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Evaluate a batch in the executor and resolve its futures."""
+        loop = asyncio.get_running_loop()
+        expressions = [expression for expression, _ in batch]
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self._evaluate, expressions
+            )
+        except Exception as exc:  # the executor itself failed
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+            self._slots.release()
+
+
+def format_response(result) -> str:
+    """
+    Format a result as a protocol response line.
+
+    Args:
+        result: A float, or the error produced by the expression.
+
+    Returns:
+        "OK <result>" or "ERR <ErrorType> <message>", with a newline.
+
+    Examples:
+        >>> format_response(5.0)
+        'OK 5.0\\n'
+    """
+    if isinstance(result, BaseException):
+        message = str(result).replace("\n", " ")
+        return f"ERR {type(result).__name__} {message}\n"
+    return f"OK {result!r}\n"
+
+
+async def _write_responses(
+    responses: asyncio.Queue, writer: asyncio.StreamWriter
+) -> None:
+    """
+    Write responses of one connection in request order.
+
+    Every write waits for the transport to drain, so a client that does not
+    read stalls its own connection instead of growing the write buffer.
+    After a failed write the remaining responses are discarded, and the
+    error is raised once the connection has no more requests.
+    """
+    error = None
+    while True:
+        future = await responses.get()
+        if future is None:
+            break
+        result = await future
+        if error is None:
+            try:
+                writer.write(format_response(result).encode())
+                await writer.drain()
+            except OSError as exc:
+                error = exc
+    if error is not None:
+        raise error
+
+
+def _client_handler(batcher: MicroBatcher):
+    """Create the connection callback for a batcher."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Requests are only read while fewer than max_pending responses of
+        # the connection wait to be written; the slots of the batcher are
+        # freed when a result is ready, so they do not limit this.
+        responses: asyncio.Queue = asyncio.Queue(batcher.max_pending)
+        sender = asyncio.create_task(_write_responses(responses, writer))
+        try:
+            while line := await reader.readline():
+                expression = line.decode("utf-8", errors="replace")
+                await responses.put(await batcher.enqueue(expression))
+        finally:
+            await responses.put(None)
+            try:
+                await sender
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+    return handle
+
+
+async def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    path: Optional[str] = None,
+    batcher: Optional[MicroBatcher] = None,
+) -> asyncio.Server:
+    """
+    Start the evaluation service.
+
+    Args:
+        host: Address to bind the TCP socket to.
+        port: TCP port (0 picks a free port).
+        path: Bind a Unix socket at this path instead of TCP.
+        batcher: Batcher to use; defaults to MicroBatcher() with default knobs.
+
+    Returns:
+        The running asyncio server.
+
+    Raises:
+        OSError: If the socket cannot be bound.
+    """
+    handler = _client_handler(batcher or MicroBatcher())
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path=path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run the service until cancelled."""
+    batcher = MicroBatcher(
+        window=args.window_ms / 1000,
+        max_batch=args.max_batch,
+        max_pending=args.max_pending,
+    )
+    server = await start_server(args.host, args.port, args.unix, batcher)
+    for sock in server.sockets:
+        print(f"upn server listening on {sock.getsockname()}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the evaluation service from the command line.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m upn_calculator.server",
+        description="Serve UPN evaluation over a line protocol.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="TCP bind address")
+    parser.add_argument("--port", type=int, default=7171, help="TCP port")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    parser.add_argument(
+        "--window-ms",
+        type=float,
+        default=DEFAULT_WINDOW * 1000,
+        help="batching window in milliseconds",
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="requests per batch"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help="queued requests before readers are paused (backpressure)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
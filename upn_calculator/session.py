@@ -0,0 +1,351 @@
+"""Interactive sessions on a persistent stack with undo, redo and checkpoints."""
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .engine import UPNEngine
+from .errors import EmptyStackError, InvalidTokenError
+from .operators import OPERATORS
+
+
+class PersistentStack:
+    """
+    An immutable stack whose versions share their common part.
+
+    push() and pop() return a new stack in O(1) and leave the original
+    unchanged; both keep pointing to the same cells below the top, so
+    keeping any number of versions costs one cell per push.
+
+    Examples:
+        >>> empty = PersistentStack()
+        >>> one = empty.push(1.0)
+        >>> two = one.push(2.0)
+        >>> value, rest = two.pop()
+        >>> value, rest.to_list(), two.to_list(), len(empty)
+        (2.0, [1.0], [1.0, 2.0], 0)
+    """
+
+    __slots__ = ("_cell", "_size")
+
+    def __init__(self, values: Iterable[Any] = ()):
+        """
+        Initialize a stack.
+
+        Args:
+            values: Initial values, bottom first.
+        """
+        cell = None
+        size = 0
+        for value in values:
+            cell = (value, cell)
+            size += 1
+        self._cell: Optional[Tuple[Any, Any]] = cell
+        self._size = size
+
+    @classmethod
+    def _from_cell(
+        cls, cell: Optional[Tuple[Any, Any]], size: int
+    ) -> "PersistentStack":
+        """Create a stack on an existing chain of (value, below) cells."""
+        stack = cls.__new__(cls)
+        stack._cell = cell
+        stack._size = size
+        return stack
+
+    def push(self, value: Any) -> "PersistentStack":
+        """Return a stack with `value` on top of this one."""
+        return self._from_cell((value, self._cell), self._size + 1)
+
+    def pop(self) -> Tuple[Any, "PersistentStack"]:
+        """
+        Remove the top value.
+
+        Returns:
+            The top value and the stack below it.
+
+        Raises:
+            EmptyStackError: If the stack is empty.
+        """
+        if self._cell is None:
+            raise EmptyStackError("Cannot pop from an empty stack")
+        value, below = self._cell
+        return value, self._from_cell(below, self._size - 1)
+
+    def peek(self) -> Any:
+        """
+        Get the top value.
+
+        Raises:
+            EmptyStackError: If the stack is empty.
+        """
+        if self._cell is None:
+            raise EmptyStackError("Cannot peek an empty stack")
+        return self._cell[0]
+
+    def to_list(self) -> List[Any]:
+        """Return the values as a list, bottom first."""
+        values = list(self)
+        values.reverse()
+        return values
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the values, top first."""
+        cell = self._cell
+        while cell is not None:
+            value, cell = cell
+            yield value
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return self._size
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the values of two stacks."""
+        if not isinstance(other, PersistentStack):
+            return NotImplemented
+        if self._size != other._size:
+            return False
+        a, b = self._cell, other._cell
+        while a is not b:
+            if a[0] != b[0]:
+                return False
+            a, b = a[1], b[1]
+        return True
+
+    def __repr__(self) -> str:
+        """Return a representation listing the values, bottom first."""
+        return f"PersistentStack({self.to_list()!r})"
+
+
+_EMPTY = PersistentStack()
+
+
+class UPNSession:
+    """
+    A stateful calculator session with unlimited undo and redo.
+
+    It offers the stack API of UPNCalculator (push, pop, peek, get_stack,
+    clear_stack and evaluate), plus apply() for single operators, on a
+    PersistentStack. Every change records the previous stack version in
+    the undo history; since versions share their cells, a change costs
+    O(1) time and memory however deep the stack is. Named checkpoints keep
+    a version for restore(). Changes that fail leave the stack as it was.
+
+    Examples:
+        >>> session = UPNSession()
+        >>> session.push(2.0)
+        >>> session.push(3.0)
+        >>> session.apply("*")
+        6.0
+        >>> session.undo()
+        True
+        >>> session.get_stack()
+        [2.0, 3.0]
+        >>> session.redo()
+        True
+        >>> session.peek()
+        6.0
+    """
+
+    def __init__(self, engine: Optional[UPNEngine] = None):
+        """
+        Initialize a session with an empty stack and no history.
+
+        Args:
+            engine: Engine for evaluate(); its operator registry and
+                numeric backend are also used by apply(). Defaults to a new
+                UPNEngine.
+        """
+        self.engine = UPNEngine() if engine is None else engine
+        self._stack = _EMPTY
+        self._undo: List[PersistentStack] = []
+        self._redo: List[PersistentStack] = []
+        self._checkpoints: Dict[str, PersistentStack] = {}
+
+    @property
+    def stack(self) -> PersistentStack:
+        """The current stack version; an O(1) snapshot that never changes."""
+        return self._stack
+
+    def _change(self, stack: PersistentStack) -> None:
+        """Make `stack` the current version, recording the previous one."""
+        self._undo.append(self._stack)
+        self._redo.clear()
+        self._stack = stack
+
+    def push(self, value: float) -> None:
+        """
+        Push a value onto the stack.
+
+        Args:
+            value: The value to push.
+        """
+        self._change(self._stack.push(value))
+
+    def pop(self) -> float:
+        """
+        Pop a value from the stack.
+
+        Returns:
+            The popped value.
+
+        Raises:
+            EmptyStackError: If the stack is empty.
+        """
+        value, stack = self._stack.pop()
+        self._change(stack)
+        return value
+
+    def peek(self) -> float:
+        """
+        Get the top value of the stack without removing it.
+
+        Raises:
+            EmptyStackError: If the stack is empty.
+        """
+        return self._stack.peek()
+
+    def get_stack(self) -> List[float]:
+        """
+        Get a copy of the current stack.
+
+        Returns:
+            A list representing the current stack (top at end).
+        """
+        return self._stack.to_list()
+
+    def clear_stack(self) -> None:
+        """Clear the stack."""
+        self._change(_EMPTY)
+
+    def evaluate(
+        self, expression: str, values: Optional[Mapping[str, float]] = None
+    ) -> float:
+        """
+        Evaluate an expression, replacing the stack with its result.
+
+        As with UPNCalculator.evaluate(), the stack afterwards holds only
+        the result; if the evaluation fails, the stack is left unchanged.
+
+        Args:
+            expression: A UPN expression string (e.g., "2 3 +").
+            values: Variable bindings.
+
+        Returns:
+            The result of the evaluation.
+
+        Raises:
+            UPNCalculatorError: Any error UPNCalculator.evaluate() raises.
+        """
+        result = self.engine.evaluate(expression, values)
+        self._change(_EMPTY.push(result))
+        return result
+
+    def apply(self, symbol: str) -> Any:
+        """
+        Apply an operator to the values on top of the stack.
+
+        Args:
+            symbol: The operator's symbol (e.g., "+").
+
+        Returns:
+            The new top value, or None if the stack is empty afterwards.
+
+        Raises:
+            InvalidTokenError: If the symbol is not a registered operator.
+            InsufficientOperandsError: If the stack has fewer values than
+                the operator's arity.
+            ZeroDivisionError: If a division by zero occurs.
+        """
+        engine = self.engine
+        registry = OPERATORS if engine.operators is None else engine.operators
+        op = registry.table.get(symbol)
+        if op is None:
+            raise InvalidTokenError(f"Unknown operator: '{symbol}'")
+        stack = self._stack
+        count = op.operand_count(len(stack))
+        operands = []
+        for _ in range(count):
+            value, stack = stack.pop()
+            operands.append(value)
+        operands.reverse()
+        function = op.function
+        if engine.numeric is not None:
+            function = engine.numeric.functions.get(function, function)
+        if op.outputs == 1:
+            stack = stack.push(function(*operands))
+        else:
+            for result in function(*operands):
+                stack = stack.push(result)
+        self._change(stack)
+        return stack.peek() if len(stack) else None
+
+    @property
+    def can_undo(self) -> bool:
+        """Whether there is a change to undo."""
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        """Whether there is an undone change to redo."""
+        return bool(self._redo)
+
+    def undo(self) -> bool:
+        """
+        Go back to the stack before the last change.
+
+        Returns:
+            True, or False if there was nothing to undo.
+        """
+        if not self._undo:
+            return False
+        self._redo.append(self._stack)
+        self._stack = self._undo.pop()
+        return True
+
+    def redo(self) -> bool:
+        """
+        Repeat the last undone change.
+
+        Any other change clears the redo history.
+
+        Returns:
+            True, or False if there was nothing to redo.
+        """
+        if not self._redo:
+            return False
+        self._undo.append(self._stack)
+        self._stack = self._redo.pop()
+        return True
+
+    def checkpoint(self, name: str) -> None:
+        """
+        Save the current stack under a name, replacing an older checkpoint.
+
+        Args:
+            name: The checkpoint's name.
+        """
+        self._checkpoints[name] = self._stack
+
+    def restore(self, name: str) -> None:
+        """
+        Return to a checkpoint; this is a change that can be undone.
+
+        Args:
+            name: The checkpoint's name.
+
+        Raises:
+            KeyError: If there is no checkpoint with that name.
+        """
+        if name not in self._checkpoints:
+            raise KeyError(f"Unknown checkpoint: {name!r}")
+        self._change(self._checkpoints[name])
+
+    @property
+    def checkpoints(self) -> List[str]:
+        """The names of the checkpoints, oldest first."""
+        return list(self._checkpoints)
+
+    @property
+    def history(self) -> Tuple[int, int]:
+        """The number of changes that can be undone and redone."""
+        return len(self._undo), len(self._redo)
@@ -0,0 +1,154 @@
+"""Status codes and results of evaluations that do not raise."""
+
+from enum import IntEnum
+from typing import Any, NamedTuple, Optional
+
+from .errors import (
+    InsufficientOperandsError,
+    InvalidExpressionError,
+    InvalidTokenError,
+    UnboundVariableError,
+    UPNCalculatorError,
+    ZeroDivisionError,
+)
+
+
+class Status(IntEnum):
+    """
+    Outcome of an evaluation as a compact code.
+
+    Every error class of the calculator has its code; ERROR covers other
+    UPNCalculatorErrors, e.g. raised by a custom operator.
+    """
+
+    OK = 0
+    INVALID_TOKEN = 1
+    INSUFFICIENT_OPERANDS = 2
+    INVALID_EXPRESSION = 3
+    ZERO_DIVISION = 4
+    UNBOUND_VARIABLE = 5
+    ERROR = 6
+
+
+# The code of each error class.
+STATUS_CODES = {
+    InvalidTokenError: Status.INVALID_TOKEN,
+    InsufficientOperandsError: Status.INSUFFICIENT_OPERANDS,
+    InvalidExpressionError: Status.INVALID_EXPRESSION,
+    ZeroDivisionError: Status.ZERO_DIVISION,
+    UnboundVariableError: Status.UNBOUND_VARIABLE,
+}
+
+
+def token_offset(expression: str, index: int) -> int:
+    """
+    Get the position of a token in an expression.
+
+    Args:
+        expression: The expression.
+        index: Index of the token among the whitespace-separated tokens.
+
+    Returns:
+        The offset of the token's first character, or the length of the
+        expression if it has fewer tokens.
+    """
+    offset = 0
+    for i, text in enumerate(expression.split()):
+        offset = expression.find(text, offset)
+        if i == index:
+            return offset
+        offset += len(text)
+    return len(expression)
+
+
+def build_error(
+    status: int, expression: str, index: int, detail: Any
+) -> UPNCalculatorError:
+    """
+    Create the error of a failed static check.
+
+    Args:
+        status: INVALID_TOKEN, INSUFFICIENT_OPERANDS or INVALID_EXPRESSION.
+        expression: The expression that was checked.
+        index: Index of the failing token.
+        detail: The stack depth at the failing token (or at the end of the
+            expression); for INSUFFICIENT_OPERANDS, (operator, depth).
+
+    Returns:
+        The error compile_expression() raises for the expression.
+    """
+    if status == Status.INVALID_TOKEN:
+        text = expression.split()[index]
+        return InvalidTokenError(f"Unknown token: '{text}'")
+    if status == Status.INSUFFICIENT_OPERANDS:
+        op, depth = detail
+        try:
+            op.operand_count(depth)
+        except InsufficientOperandsError as exc:
+            return exc
+    msg = f"Invalid expression: stack must have exactly 1 element, but has {detail}"
+    return InvalidExpressionError(msg)
+
+
+class Outcome(NamedTuple):
+    """
+    Result of an evaluation that reports errors instead of raising them.
+
+    The error itself is only created when error() or message is used; a
+    failed evaluation just records where it failed.
+
+    Attributes:
+        value: The result, or None if the evaluation failed.
+        status: The Status code.
+        source: The evaluated expression.
+        index: Index of the failing token for errors found before running
+            the program, else -1.
+        detail: What error() needs to describe the failure: the error
+            itself for errors raised while running, otherwise the stack
+            depth (or operator and depth) at the failing token.
+
+    Examples:
+        >>> from upn_calculator import UPNCalculator
+        >>> outcome = UPNCalculator().try_evaluate("2 +")
+        >>> outcome.ok, outcome.status
+        (False, <Status.INSUFFICIENT_OPERANDS: 2>)
+        >>> outcome.message
+        "Operator '+' requires 2 operands but stack has 1"
+    """
+
+    value: Any
+    status: Status
+    source: str = ""
+    index: int = -1
+    detail: Any = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the evaluation succeeded."""
+        return self.status == 0
+
+    @property
+    def message(self) -> str:
+        """The error message, or an empty string if the evaluation succeeded."""
+        error = self.error()
+        return "" if error is None else str(error)
+
+    @property
+    def offset(self) -> Optional[int]:
+        """Position of the failing token, if the failure has one."""
+        if self.index < 0:
+            return None
+        return token_offset(self.source, self.index)
+
+    def error(self) -> Optional[UPNCalculatorError]:
+        """
+        Get the error the evaluation would have raised.
+
+        Returns:
+            The error, or None if the evaluation succeeded.
+        """
+        if self.status == 0:
+            return None
+        if isinstance(self.detail, UPNCalculatorError):
+            return self.detail
+        return build_error(self.status, self.source, self.index, self.detail)
@@ -0,0 +1,163 @@
+"""Incremental evaluation of UPN programs read from streams or chunk iterables."""
+
+import codecs
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Optional, Union
+
+from .compiler import apply_instruction
+from .errors import InvalidExpressionError, InvalidTokenError
+from .operators import OperatorRegistry
+from .parser import NUMBER, OPERATOR, Token, scan
+
+if TYPE_CHECKING:
+    from .numeric import NumericBackend
+
+Chunk = Union[str, bytes, bytearray, memoryview]
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def iter_chunks(source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Chunk]:
+    """
+    Turn a stream source into an iterator of chunks.
+
+    Args:
+        source: A file object (text or binary, anything with read()), a single
+            str or bytes object, or an iterable of str or bytes chunks.
+        chunk_size: Number of characters or bytes per read() call.
+
+    Yields:
+        The chunks of the source in order.
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        yield source
+        return
+    read = getattr(source, "read", None)
+    if read is None:
+        yield from source
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_tokens(
+    chunks: Iterable[Chunk],
+    encoding: str = "utf-8",
+    operators: Optional[OperatorRegistry] = None,
+) -> Iterator[Token]:
+    """
+    Classify the tokens of a chunked expression without joining the chunks.
+
+    A token that is split across a chunk boundary is carried over and
+    completed by the next chunk. Only the current chunk and the carried
+    partial token are held in memory. Offsets of the returned tokens are
+    relative to the piece of text they were scanned from, not to the stream.
+
+    Args:
+        chunks: The expression in pieces, as str or bytes.
+        encoding: Encoding used to decode bytes chunks.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Yields:
+        One Token per whitespace-separated token of the whole stream.
+
+    Examples:
+        >>> [t.text for t in iter_tokens(["2 3", "0 +"])]
+        ['2', '30', '+']
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ""
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        text = carry + chunk if carry else chunk
+        if not text or text[-1].isspace():
+            carry = ""
+            yield from scan(text, operators)
+            continue
+        parts = text.rsplit(None, 1)
+        carry = parts.pop()
+        if parts:
+            yield from scan(parts[0], operators)
+    tail = carry + decoder.decode(b"", final=True)
+    if tail:
+        yield from scan(tail, operators)
+
+
+def evaluate_stream(
+    source,
+    values: Optional[Mapping[str, float]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    operators: Optional[OperatorRegistry] = None,
+    numeric: Optional["NumericBackend"] = None,
+) -> float:
+    """
+    Evaluate a UPN program incrementally from a stream.
+
+    Tokens are classified and executed as they are read, so only the operand
+    stack stays resident: peak memory does not depend on the length of the
+    program, only on its stack depth.
+
+    Args:
+        source: A file object (text or binary), str or bytes, or an iterable
+            of str or bytes chunks.
+        values: Variable bindings; words found here are pushed as operands.
+        chunk_size: Number of characters or bytes per read() on file objects.
+        encoding: Encoding used to decode bytes.
+        operators: Operator registry; defaults to OPERATORS.
+        numeric: Numeric backend; defaults to float arithmetic.
+
+    Returns:
+        The result of the evaluation as a float, or in the number type of
+        the numeric backend.
+
+    Raises:
+        InvalidTokenError: If an unknown token is encountered.
+        InsufficientOperandsError: If an operator has fewer operands than
+            its arity.
+        InvalidExpressionError: If the final stack size is not 1.
+        ZeroDivisionError: If a division by zero occurs.
+
+    Examples:
+        >>> import io
+        >>> evaluate_stream(io.BytesIO(b"2 3 + 4 *"), chunk_size=3)
+        20.0
+    """
+    if values is None:
+        values = {}
+    number = functions = None
+    if numeric is not None:
+        number, functions = numeric.number, numeric.functions
+        values = {name: numeric.convert(value) for name, value in values.items()}
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    tokens = iter_tokens(iter_chunks(source, chunk_size), encoding, operators)
+    for kind, text, _, value in tokens:
+        if kind == NUMBER:
+            push(value if number is None else number(text))
+        elif kind == OPERATOR:
+            count = value.operand_count(len(stack))
+            function = value.function
+            if functions is not None:
+                function = functions.get(function, function)
+            if count == 2 and value.outputs == 1:
+                b = pop()
+                stack[-1] = function(stack[-1], b)
+            else:
+                apply_instruction(stack, (function, count, value.outputs))
+        elif text in values:
+            push(values[text])
+        else:
+            raise InvalidTokenError(f"Unknown token: '{text}'")
+
+    if len(stack) != 1:
+        msg = (
+            f"Invalid expression: stack must have exactly 1 element, "
+            f"but has {len(stack)}"
+        )
+        raise InvalidExpressionError(msg)
+    return stack[0]
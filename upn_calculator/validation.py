@@ -0,0 +1,169 @@
+"""Static validation of UPN expressions without evaluating them."""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from .compiler import _check_variable_names
+from .errors import UPNCalculatorError
+from .operators import OPERATORS, Operator, OperatorRegistry
+from .status import Status, build_error, token_offset
+
+
+class ValidationResult(NamedTuple):
+    """
+    Outcome of validating one expression.
+
+    Attributes:
+        error: The error compile_expression() would raise for the
+            expression, or None if it is well-formed.
+        offset: Position of the token the error was found at; the length
+            of the expression if the final stack size is wrong. None if the
+            expression is valid.
+        depth: The stack size at the end of the expression, or before the
+            failing token.
+        max_depth: The largest stack size reached up to that point.
+    """
+
+    error: Optional[UPNCalculatorError]
+    offset: Optional[int]
+    depth: int
+    max_depth: int
+
+    @property
+    def valid(self) -> bool:
+        """Whether the expression is well-formed."""
+        return self.error is None
+
+
+# Status codes of _check(), as plain ints for the hot loop.
+_OK = int(Status.OK)
+_INVALID_TOKEN = int(Status.INVALID_TOKEN)
+_INSUFFICIENT_OPERANDS = int(Status.INSUFFICIENT_OPERANDS)
+_INVALID_EXPRESSION = int(Status.INVALID_EXPRESSION)
+
+
+def _check(
+    expression: str, table: Dict[str, Operator], names: FrozenSet[str]
+) -> Tuple[int, int, Any, int]:
+    """
+    Check an expression against a resolved operator table.
+
+    Returns:
+        (status, index, detail, max_depth): the status code, the index of
+        the failing token (the token count for a wrong final stack size),
+        the detail build_error() takes, and the largest stack size reached.
+        For a valid expression, detail is the final stack size, 1.
+    """
+    get_operator = table.get
+    depth = 0
+    max_depth = 0
+    index = 0
+    for text in expression.split():
+        op = get_operator(text)
+        if op is not None:
+            count = op.arity
+            if count is None or depth < count:
+                if count is not None or not depth:
+                    return _INSUFFICIENT_OPERANDS, index, (op, depth), max_depth
+                count = depth
+            depth += op.outputs - count
+        elif text in names:
+            depth += 1
+        else:
+            # float() accepts exactly the literal syntax of the parser and is
+            # the cheapest check. It raises at most once per expression, as
+            # the check stops at the first invalid token.
+            try:
+                float(text)
+            except ValueError:
+                return _INVALID_TOKEN, index, depth, max_depth
+            depth += 1
+        if depth > max_depth:
+            max_depth = depth
+        index += 1
+    if depth != 1:
+        return _INVALID_EXPRESSION, index, depth, max_depth
+    return _OK, -1, depth, max_depth
+
+
+def _validate(
+    expression: str, table: Dict[str, Operator], names: FrozenSet[str]
+) -> ValidationResult:
+    """Validate one expression and build its error, if any."""
+    status, index, detail, max_depth = _check(expression, table, names)
+    if status == _OK:
+        return ValidationResult(None, None, detail, max_depth)
+    error = build_error(status, expression, index, detail)
+    depth = detail[1] if status == _INSUFFICIENT_OPERANDS else detail
+    return ValidationResult(error, token_offset(expression, index), depth, max_depth)
+
+
+def validate(
+    expression: str,
+    variables: Iterable[str] = (),
+    operators: Optional[OperatorRegistry] = None,
+) -> ValidationResult:
+    """
+    Check that an expression is well-formed without computing anything.
+
+    Tokens are classified and the stack depth is tracked, nothing more: no
+    number is converted and no operator is applied, so a well-formed
+    expression is valid even if evaluating it would divide by zero. An
+    expression is valid exactly when compile_expression() accepts it, and
+    an invalid one reports the same error.
+
+    Args:
+        expression: A UPN expression string (e.g., "2 3 +").
+        variables: Names that may appear as operands.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        The ValidationResult.
+
+    Raises:
+        ValueError: If a variable name is not a valid identifier.
+
+    Examples:
+        >>> validate("1 0 /").valid
+        True
+        >>> result = validate("2 3 + x *")
+        >>> result.error
+        InvalidTokenError("Unknown token: 'x'")
+        >>> result.offset, result.depth
+        (6, 1)
+        >>> validate("2 3 4 +").depth
+        2
+    """
+    names = _check_variable_names(variables, operators) if variables else frozenset()
+    table = (OPERATORS if operators is None else operators).table
+    return _validate(expression, table, names)
+
+
+def validate_many(
+    expressions: Iterable[str],
+    variables: Iterable[str] = (),
+    operators: Optional[OperatorRegistry] = None,
+) -> List[ValidationResult]:
+    """
+    Validate many expressions with the same variables and operators.
+
+    Like validate() for each expression, with the variable names and the
+    operator table resolved once.
+
+    Args:
+        expressions: The expressions to check.
+        variables: Names that may appear as operands.
+        operators: Operator registry; defaults to OPERATORS.
+
+    Returns:
+        One ValidationResult per expression, in input order.
+
+    Raises:
+        ValueError: If a variable name is not a valid identifier.
+
+    Examples:
+        >>> [r.valid for r in validate_many(["2 3 +", "2 +", "x 1 -"], ["x"])]
+        [True, False, True]
+    """
+    names = _check_variable_names(variables, operators) if variables else frozenset()
+    table = (OPERATORS if operators is None else operators).table
+    return [_validate(expression, table, names) for expression in expressions]